@@ -0,0 +1,146 @@
+import os
+import threading
+import traceback
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from fontes import MAXIMO_PARALELO, preparar_fonte, sincronizar_fontes
+from perfil_execucao import PerfilExecucao, PERFIL_ATIVO
+
+# Intervalo entre as atualizações automáticas da planilha (0 desativa a atualização em segundo plano)
+INTERVALO_ATUALIZACAO_MINUTOS = float(os.getenv("INTERVALO_ATUALIZACAO_MINUTOS", "15"))
+
+
+class AtualizadorPlanilha:
+    """
+    --> Classe que baixa as planilhas do SharePoint em segundo plano, em intervalos regulares
+    (APScheduler), para que as páginas sempre exibam a última versão disponível sem esperar o download
+    """
+
+    def __init__(self, fontes, intervalo_minutos=INTERVALO_ATUALIZACAO_MINUTOS, ao_concluir=None):
+        """
+        :param fontes: Lista de planilhas retornada por fontes.carregar_fontes
+        :param intervalo_minutos: Intervalo entre as atualizações
+        :param ao_concluir: Função opcional executada (na thread do agendador) após cada atualização bem-sucedida
+        """
+        self.fontes = fontes
+        self.intervalo_minutos = intervalo_minutos
+        self.ao_concluir = ao_concluir
+        self.ultima_atualizacao = None
+        self.ultima_situacao = None
+        self.ultimo_erro = None
+        self.ultimo_perfil = None
+        self._sessao = None
+        self._trava = threading.Lock()
+
+        # O APScheduler só é importado quando a atualização em segundo plano é usada
+        from apscheduler.schedulers.background import BackgroundScheduler
+        self._agendador = BackgroundScheduler(daemon=True)
+        self._tarefa = None
+
+    def atualizar(self):
+        """
+        --> Função executada pelo agendador: baixa a planilha (se mudou) e prepara o cache da nova versão
+        """
+        # Ignora a execução se outra atualização ainda estiver em andamento
+        if not self._trava.acquire(blocking=False):
+            return
+
+        # Importados apenas na thread do agendador (não atrasam a primeira exibição da página)
+        from dotenv import load_dotenv
+        from sharepoint import SessaoSharePoint, configurar_ssl
+
+        # Tempo de cada etapa da atualização (exibido no painel de desempenho do dashboard)
+        perfil = PerfilExecucao(ativo=True, tipo="atualizacao")
+
+        # Com várias planilhas, as versões novas são preparadas ao mesmo tempo em processos separados
+        # (os processos só são criados quando alguma planilha é baixada)
+        executor = (ProcessPoolExecutor(max_workers=min(MAXIMO_PARALELO, len(self.fontes)))
+                    if len(self.fontes) > 1 else None)
+
+        def preparar(fonte, caminho_planilha):
+            with perfil.medir(f"preparação da nova versão (cache + contagens): {fonte['nome']}"):
+                if executor is None:
+                    preparar_fonte(caminho_planilha, fonte["estado"])
+                else:
+                    executor.submit(preparar_fonte, caminho_planilha, fonte["estado"]).result()
+
+        try:
+            # Carregando variáveis de ambiente (credenciais de usuário)
+            load_dotenv()
+            configurar_ssl()
+
+            # A sessão é mantida entre as atualizações: o login só é refeito quando os cookies expiram
+            if self._sessao is None:
+                self._sessao = SessaoSharePoint(os.getenv("USUARIO"), os.getenv("SENHA"))
+            if not self._sessao.autenticado():
+                with perfil.medir("autenticação no SharePoint"):
+                    self._sessao.autenticar()
+            with perfil.medir("sincronização das planilhas (total)"):
+                situacoes = sincronizar_fontes(self.fontes, self._sessao, preparar=preparar)
+
+            # Ex.: cria o instantâneo agregado da versão atual antes da próxima visita ao dashboard
+            if self.ao_concluir is not None:
+                with perfil.medir("instantâneo agregado da versão atual"):
+                    self.ao_concluir()
+
+            if len(situacoes) == 1:
+                situacao = next(iter(situacoes.values()))
+            else:
+                situacao = ", ".join(f"{nome}: {situacoes[nome]}" for nome in sorted(situacoes))
+
+            self.ultima_situacao = situacao
+            self.ultimo_erro = None
+            self.ultima_atualizacao = datetime.now()
+            print(f"[{self.ultima_atualizacao:%d/%m/%Y %H:%M:%S}] Atualização da planilha: {situacao}")
+        except Exception as e:
+            self.ultimo_erro = str(e)
+            traceback.print_exc()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            perfil.finalizar()
+            self.ultimo_perfil = perfil
+            if PERFIL_ATIVO:
+                perfil.salvar_log()
+            self._trava.release()
+
+    def iniciar(self):
+        """
+        --> Função para iniciar o agendador (a primeira atualização é executada imediatamente)
+        """
+        self._tarefa = self._agendador.add_job(
+            self.atualizar,
+            "interval",
+            minutes=self.intervalo_minutos,
+            next_run_time=datetime.now(),
+            max_instances=1,
+            coalesce=True
+        )
+        self._agendador.start()
+
+    def executar_agora(self):
+        """
+        --> Função para antecipar a próxima atualização para agora (sem bloquear quem chamou)
+        """
+        self._tarefa.modify(next_run_time=datetime.now())
+
+    def em_andamento(self):
+        """
+        --> Função para verificar se uma atualização está sendo executada
+        """
+        return self._trava.locked()
+
+    def proxima_execucao(self):
+        """
+        --> Função para obter a data e hora da próxima atualização agendada
+        """
+        return self._tarefa.next_run_time if self._tarefa is not None else None
+
+    def parar(self):
+        """
+        --> Função para encerrar o agendador
+        """
+        self._agendador.shutdown(wait=False)
+        if self._sessao is not None:
+            self._sessao.fechar()
+
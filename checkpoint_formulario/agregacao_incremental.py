@@ -0,0 +1,166 @@
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from collections import Counter
+from cache_planilha import DIRETORIO_CACHE
+from processamento import contar_respostas_tabela
+from normalizacao import VERSAO_NORMALIZACAO, LIMIAR_SIMILARIDADE
+from tendencias import contar_por_dia, juntar_buckets
+
+# Arquivo com o estado das contagens já processadas
+CAMINHO_ESTADO = os.path.join(DIRETORIO_CACHE, "agregado.json")
+
+# Versão das regras de classificação/contagem (estados de versões diferentes são reconstruídos)
+VERSAO_AGREGADO = 6
+
+# Evita que duas sessões atualizem o mesmo estado ao mesmo tempo
+_trava_estado = threading.Lock()
+
+
+def assinatura_linhas(tabela_respostas, inicio, quantidade_linhas):
+    """
+    --> Função para calcular a assinatura de um trecho da tabela de respostas: soma (módulo 2**64) dos hashes de
+    cada linha combinados com a posição dela. A assinatura das linhas já processadas é estendida somando apenas a
+    assinatura das linhas novas, e o resultado não depende de como as linhas foram divididas entre as atualizações
+    :param tabela_respostas: Tabela do Arrow com as respostas
+    :param inicio: Posição da primeira linha considerada
+    :param quantidade_linhas: Quantidade de linhas consideradas
+    :return: Inteiro de 64 bits
+    """
+    df = tabela_respostas.slice(inicio, quantidade_linhas).to_pandas()
+    hashes_linhas = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    hashes_posicoes = pd.util.hash_array(np.arange(inicio, inicio + len(hashes_linhas), dtype=np.int64))
+    return int(np.sum(hashes_linhas ^ hashes_posicoes, dtype=np.uint64))
+
+
+def _somar_assinaturas(assinatura, assinatura_novas):
+    """
+    --> Função para estender a assinatura das linhas processadas com a assinatura das linhas novas
+    :param assinatura: Assinatura das linhas já processadas
+    :param assinatura_novas: Assinatura das linhas novas
+    """
+    return (assinatura + assinatura_novas) % 2 ** 64
+
+
+def _estado_vazio():
+    """
+    --> Função para criar o estado inicial (nenhuma linha processada)
+    """
+    return {
+        "versao": VERSAO_AGREGADO,
+        # Regras de normalização das respostas digitadas usadas nas contagens
+        "normalizacao": [VERSAO_NORMALIZACAO, LIMIAR_SIMILARIDADE],
+        "linhas_processadas": 0,
+        # Versão (hash do conteúdo) da planilha da última atualização e assinatura das linhas processadas
+        "versao_planilha": None,
+        "assinatura": 0,
+        "contagens": {pergunta: Counter() for pergunta in ("idade", "frequencia", "produtividade", "eficiencia")},
+        # Contagens por dia de conclusão ({'AAAA-MM-DD': {'respostas': n, pergunta: {opção: n}}})
+        "dias": {},
+        "sem_data": 0,
+    }
+
+
+def ler_estado(caminho_estado=CAMINHO_ESTADO):
+    """
+    --> Função para ler o estado salvo das contagens
+    :param caminho_estado: Caminho do arquivo de estado
+    :return: Estado salvo ou o estado inicial caso não exista (ou seja de outra versão ou de outras regras de
+    normalização)
+    """
+    try:
+        with open(caminho_estado, encoding="utf-8") as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        return _estado_vazio()
+
+    # Com outras regras as respostas digitadas podem ser classificadas de outra forma
+    regras_normalizacao = [VERSAO_NORMALIZACAO, LIMIAR_SIMILARIDADE]
+    if estado.get("versao") != VERSAO_AGREGADO or estado.get("normalizacao") != regras_normalizacao:
+        return _estado_vazio()
+
+    contagens = {pergunta: Counter(contagem) for pergunta, contagem in estado["contagens"].items()}
+    # O JSON só guarda chaves em texto: as notas de produtividade voltam a ser inteiras
+    contagens["produtividade"] = Counter({int(nota): quantidade
+                                          for nota, quantidade in contagens["produtividade"].items()})
+    estado["contagens"] = contagens
+    for bucket in estado["dias"].values():
+        bucket["produtividade"] = {int(nota): quantidade for nota, quantidade in bucket["produtividade"].items()}
+    return estado
+
+
+def salvar_estado(estado, caminho_estado=CAMINHO_ESTADO):
+    """
+    --> Função para salvar o estado das contagens (gravação atômica)
+    :param estado: Estado das contagens
+    :param caminho_estado: Caminho do arquivo de estado
+    """
+    os.makedirs(os.path.dirname(caminho_estado), exist_ok=True)
+    caminho_temporario = f"{caminho_estado}.{os.getpid()}.tmp"
+    with open(caminho_temporario, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(caminho_temporario, caminho_estado)
+
+
+def atualizar_agregado(tabela_respostas, caminho_estado=CAMINHO_ESTADO, versao=None):
+    """
+    --> Função para atualizar as contagens processando apenas as respostas novas
+    (o Microsoft Forms só adiciona linhas ao final da planilha). Caso alguma resposta
+    já processada tenha sido editada ou excluída, as contagens são refeitas do zero.
+    :param tabela_respostas: Tabela do Arrow com todas as respostas
+    :param caminho_estado: Caminho do arquivo de estado
+    :param versao: Versão da planilha (ver atualizar_estado)
+    :return: Dicionário com um Counter para cada pergunta
+    """
+    return atualizar_estado(tabela_respostas, caminho_estado, versao)["contagens"]
+
+
+def atualizar_estado(tabela_respostas, caminho_estado=CAMINHO_ESTADO, versao=None):
+    """
+    --> Função para atualizar o estado (contagens totais e contagens por dia) processando apenas as respostas
+    novas: somente os dias das respostas novas (normalmente o último) são alterados. A cada nova versão da
+    planilha a assinatura de todas as linhas já processadas é conferida (um hash O(n), como o da própria versão),
+    o que detecta exclusões e edições em qualquer resposta
+    :param tabela_respostas: Tabela do Arrow com todas as respostas
+    :param caminho_estado: Caminho do arquivo de estado
+    :param versao: Versão da planilha (ver versao_planilha). Com a mesma versão da última atualização o estado
+    salvo é usado sem conferência; sem versão a assinatura é sempre conferida
+    :return: Estado atualizado (chaves contagens, dias e sem_data, entre outras)
+    """
+    with _trava_estado:
+        estado = ler_estado(caminho_estado)
+        if versao is not None and estado["versao_planilha"] == versao:
+            return estado
+        linhas_processadas = estado["linhas_processadas"]
+        total_linhas = tabela_respostas.num_rows
+
+        # Reconstrução completa se linhas foram removidas ou se as linhas já processadas mudaram
+        if (linhas_processadas > total_linhas
+                or assinatura_linhas(tabela_respostas, 0, linhas_processadas) != estado["assinatura"]):
+            estado = _estado_vazio()
+            linhas_processadas = 0
+
+        if linhas_processadas < total_linhas:
+            # Soma as contagens das linhas novas às contagens já existentes
+            df_novas = tabela_respostas.slice(linhas_processadas).to_pandas()
+            contagens_novas = contar_respostas_tabela(df_novas)
+            for pergunta, contagem in contagens_novas.items():
+                estado["contagens"][pergunta].update(contagem)
+
+            dias_novos, sem_data = contar_por_dia(df_novas)
+            juntar_buckets(estado["dias"], dias_novos)
+            estado["sem_data"] += sem_data
+
+            # A assinatura é estendida apenas com as linhas novas
+            estado["assinatura"] = _somar_assinaturas(
+                estado["assinatura"], assinatura_linhas(tabela_respostas, linhas_processadas,
+                                                        total_linhas - linhas_processadas))
+            estado["linhas_processadas"] = total_linhas
+
+        if linhas_processadas < total_linhas or estado["versao_planilha"] != versao:
+            estado["versao_planilha"] = versao
+            salvar_estado(estado, caminho_estado)
+
+        return estado
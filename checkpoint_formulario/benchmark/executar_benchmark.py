@@ -0,0 +1,213 @@
+"""
+Benchmark das etapas do dashboard (leitura, separação das respostas, classificação/contagem e
+montagem das tabelas e gráficos) com tempo de execução e pico de memória de cada etapa.
+
+Uso:
+    python gerar_planilha_sintetica.py --linhas 1000 100000
+    python executar_benchmark.py dados/planilha_1000.xlsx dados/planilha_100000.xlsx --saida resultados.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+# O cache do benchmark fica sempre em uma pasta temporária própria: um DIRETORIO_CACHE já configurado (ex.: o do
+# dashboard na mesma máquina) é substituído, e nada do cache do dashboard é lido ou apagado
+DIRETORIO_CACHE_BENCHMARK = tempfile.mkdtemp(prefix="benchmark_planilha_cache_")
+os.environ["DIRETORIO_CACHE"] = DIRETORIO_CACHE_BENCHMARK
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache_planilha  # noqa: E402
+from leitura_planilha import iterar_respostas_planilha  # noqa: E402
+from processamento import (processar_multipla_escolha, classificar_respostas, contar_respostas,  # noqa: E402
+                           contar_respostas_tabela, montar_tabelas, calcular_metricas, frequencias_validas,
+                           eficiencias_validas, separar_multipla_escolha)
+from normalizacao import NormalizadorOpcoes  # noqa: E402
+from respostas_compactas import RespostasCompactas  # noqa: E402
+from indice_bitmap import IndiceBitmap  # noqa: E402
+from explorador_respostas import ExploradorRespostas, ORDEM_DECRESCENTE  # noqa: E402
+from tabulacao_cruzada import tabela_contingencia, produtividade_por_grupo, teste_qui_quadrado  # noqa: E402
+from graficos import criar_grafico, tipos_grafico  # noqa: E402
+
+# Parâmetros dos gráficos de cada seção (coluna, título e título do eixo x)
+secoes_graficos = [
+    ('idade', 'Faixa Etária', "Distribuição por Faixa Etária", "Faixa Etária"),
+    ('frequencia', 'Frequência', "Distribuição por Frequência de Trabalho Remoto", "Frequência de Trabalho Remoto"),
+    ('produtividade', 'Produtividade', "Distribuição de Produtividade", "Classificação"),
+    ('eficiencia', 'Eficiência', "Distribuição por Eficiência de Trabalho Remoto", "Eficiência"),
+]
+
+
+def listas_respostas(tabela_respostas):
+    """
+    --> Função para converter cada coluna da tabela de respostas em uma lista, descartando as células vazias
+    (entrada das etapas que usam listas e Counter)
+    :param tabela_respostas: Tabela do Arrow com as colunas idade, frequencia, produtividade e eficiencia
+    """
+    valores_idade, valores_frequencia, valores_produtividade, valores_eficiencia = (
+        [valor for valor in tabela_respostas.column(coluna).to_pylist() if valor is not None]
+        for coluna in ("idade", "frequencia", "produtividade", "eficiencia")
+    )
+    return valores_idade, valores_frequencia, valores_produtividade, valores_eficiencia
+
+
+def medir(funcao, medir_memoria=True):
+    """
+    --> Função para medir o tempo de execução e o pico de memória de uma etapa
+    :param funcao: Função sem parâmetros que executa a etapa
+    :param medir_memoria: Executa a etapa uma segunda vez com o tracemalloc ativo para medir a memória
+    :return: Tupla (resultado, tempo em segundos, pico de memória em bytes ou None)
+    """
+    inicio = time.perf_counter()
+    resultado = funcao()
+    tempo = time.perf_counter() - inicio
+
+    # O tracemalloc deixa a execução mais lenta, então a memória é medida em uma execução separada
+    pico_memoria = None
+    if medir_memoria:
+        tracemalloc.start()
+        funcao()
+        _, pico_memoria = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return resultado, tempo, pico_memoria
+
+
+def executar_benchmark(caminho_planilha, medir_memoria=True):
+    """
+    --> Função para executar todas as etapas do dashboard sobre uma planilha
+    :param caminho_planilha: Caminho da planilha
+    :param medir_memoria: Mede também o pico de memória de cada etapa
+    :return: Lista de dicionários com o resultado de cada etapa
+    """
+    etapas = []
+
+    def registrar(nome, funcao, memoria=medir_memoria):
+        resultado, tempo, pico_memoria = medir(funcao, memoria)
+        etapas.append({"etapa": nome, "tempo_s": round(tempo, 4), "pico_memoria_mb":
+                       None if pico_memoria is None else round(pico_memoria / 1024 / 1024, 2)})
+        return resultado
+
+    # Leitura: planilha em fluxo (openpyxl), conversão para Parquet (cache frio) e leitura do cache
+    # Remove somente a cópia Parquet desta planilha criada pelo benchmark
+    def limpar_cache():
+        caminho_parquet = cache_planilha.caminho_cache_parquet(caminho_planilha, DIRETORIO_CACHE_BENCHMARK)
+        cache_planilha._hashes_calculados.clear()
+        if os.path.exists(caminho_parquet):
+            os.remove(caminho_parquet)
+
+    registrar("leitura openpyxl (iterar_respostas_planilha)",
+              lambda: sum(1 for _ in iterar_respostas_planilha(caminho_planilha)))
+
+    def carregar_cache_frio():
+        limpar_cache()
+        return cache_planilha.carregar_tabela_respostas(caminho_planilha, DIRETORIO_CACHE_BENCHMARK)
+
+    registrar("cache parquet frio (carregar_tabela_respostas)", carregar_cache_frio)
+    tabela_respostas = registrar("cache parquet quente (carregar_tabela_respostas)",
+                                 lambda: cache_planilha.carregar_tabela_respostas(caminho_planilha,
+                                                                                  DIRETORIO_CACHE_BENCHMARK))
+    valores_idade, valores_frequencia, valores_produtividade, valores_eficiencia = registrar(
+        "listas por coluna (listas_respostas)", lambda: listas_respostas(tabela_respostas))
+
+    # Separação das opções de múltipla escolha
+    registrar("processar_multipla_escolha", lambda: processar_multipla_escolha(valores_eficiencia))
+
+    # Classificação e contagem: versão com listas/Counter e versão vetorizada
+    def classificar_e_contar():
+        frequencias_classificadas, eficiencias_classificadas = classificar_respostas(valores_frequencia,
+                                                                                     valores_eficiencia)
+        return contar_respostas(valores_idade, frequencias_classificadas, valores_produtividade,
+                                eficiencias_classificadas)
+
+    registrar("classificação + Counter (listas)", classificar_e_contar)
+    df_respostas = tabela_respostas.to_pandas()
+
+    # Normalização das respostas digitadas: comparação das respostas distintas fora da lista com o cache vazio
+    def normalizar_sem_cache():
+        with tempfile.TemporaryDirectory() as diretorio:
+            opcoes_eficiencia = separar_multipla_escolha(df_respostas['eficiencia'])
+            for valores, opcoes_validas in ((df_respostas['frequencia'], frequencias_validas),
+                                            (opcoes_eficiencia, eficiencias_validas)):
+                distintos = valores.dropna().unique()
+                NormalizadorOpcoes(opcoes_validas, diretorio_cache=diretorio).normalizar(
+                    [valor for valor in distintos if valor not in opcoes_validas])
+
+    registrar("normalização das respostas digitadas (cache frio)", normalizar_sem_cache)
+    contagens = registrar("classificação + contagem vetorizada", lambda: contar_respostas_tabela(df_respostas))
+    respostas = registrar("compactação (RespostasCompactas)", lambda: RespostasCompactas.de_tabela(df_respostas))
+
+    # Cruzamento exibido por padrão no dashboard (idade x frequência)
+    def cruzar_respostas():
+        produtividade_por_grupo(respostas, ['idade', 'frequencia'])
+        teste_qui_quadrado(tabela_contingencia(respostas, ['idade', 'frequencia'], 'produtividade'))
+        return tabela_contingencia(respostas, ['idade', 'frequencia'], 'eficiencia')
+
+    registrar("cruzamento (contingência + médias + qui-quadrado)", cruzar_respostas)
+
+    # Filtros da sidebar: bitmaps criados uma vez por versão e combinação de filtros resolvida com AND
+    indice = registrar("bitmaps dos filtros (IndiceBitmap)", lambda: IndiceBitmap.de_respostas(respostas))
+    filtros = {'idade': ['25-34 anos'], 'frequencia': ['Trabalho 100% remoto'], 'eficiencia': ['Maior autonomia']}
+    registrar("filtro + contagens (AND dos bitmaps)", lambda: indice.contagens(indice.selecionar(filtros)))
+
+    # Dados brutos: explorador criado uma vez por versão; cada interação envia apenas uma página
+    explorador = registrar("explorador dos dados brutos (ExploradorRespostas)",
+                           lambda: ExploradorRespostas(tabela_respostas))
+    linhas = registrar("dados brutos: busca + ordenação",
+                       lambda: explorador.selecionar('eficiencia', "autonomia", ORDEM_DECRESCENTE))
+    registrar("dados brutos: página de 50 linhas", lambda: explorador.pagina(linhas, 1000, 50))
+
+    # Tabelas, métricas e gráficos
+    def montar_tabelas_e_metricas():
+        tabelas_montadas = montar_tabelas(contagens)
+        calcular_metricas(tabelas_montadas, contagens)
+        return tabelas_montadas
+
+    tabelas = registrar("DataFrames + métricas", montar_tabelas_e_metricas)
+    registrar("gráficos (4 seções x 4 tipos)", lambda: [
+        criar_grafico(tabelas[chave], coluna, tipo, titulo, titulo_eixo_x)
+        for chave, coluna, titulo, titulo_eixo_x in secoes_graficos for tipo in tipos_grafico
+    ])
+
+    limpar_cache()
+    return etapas
+
+
+def exibir_resultados(caminho_planilha, etapas):
+    """
+    --> Função para exibir os resultados de uma planilha em forma de tabela
+    :param caminho_planilha: Caminho da planilha
+    :param etapas: Lista retornada por executar_benchmark
+    """
+    print(f"\n--- {os.path.basename(caminho_planilha)} ---")
+    print(f"{'Etapa':<52}{'Tempo (s)':>12}{'Pico de memória (MB)':>24}")
+    for etapa in etapas:
+        memoria = "-" if etapa["pico_memoria_mb"] is None else f"{etapa['pico_memoria_mb']:.2f}"
+        print(f"{etapa['etapa']:<52}{etapa['tempo_s']:>12.4f}{memoria:>24}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do dashboard de trabalho remoto")
+    parser.add_argument("planilhas", nargs="+", help="Planilhas geradas por gerar_planilha_sintetica.py")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória (mais rápido)")
+    parser.add_argument("--saida", help="Arquivo JSON onde os resultados serão salvos")
+    argumentos = parser.parse_args()
+
+    resultados = {}
+    try:
+        for caminho in argumentos.planilhas:
+            resultados[caminho] = executar_benchmark(caminho, medir_memoria=not argumentos.sem_memoria)
+            exibir_resultados(caminho, resultados[caminho])
+    finally:
+        # A pasta temporária foi criada pelo próprio benchmark
+        shutil.rmtree(DIRETORIO_CACHE_BENCHMARK, ignore_errors=True)
+
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em: {argumentos.saida}")
@@ -0,0 +1,99 @@
+"""
+Gerador de planilhas sintéticas no mesmo formato da planilha exportada pelo Microsoft Forms.
+
+Uso:
+    python gerar_planilha_sintetica.py --linhas 1000 100000 1000000 --pasta dados
+"""
+import os
+import sys
+import argparse
+import numpy as np
+import openpyxl
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processamento import frequencias_validas, eficiencias_validas, ordem_faixas  # noqa: E402
+
+# Cabeçalho das colunas A a J (G: idade, H: frequência, I: produtividade, J: eficiência)
+cabecalho = [
+    "ID", "Hora de início", "Hora de conclusão", "Email", "Nome", "Hora da última modificação",
+    "Qual a sua faixa etária?",
+    "Com que frequência você trabalha remotamente?",
+    "Em uma escala de 1 a 5, como você avalia sua produtividade trabalhando remotamente?",
+    "Quais aspectos do trabalho remoto mais contribuem para a sua eficiência?",
+]
+
+# Distribuições aproximadas das respostas reais
+pesos_faixas = [0.30, 0.32, 0.18, 0.11, 0.06, 0.03]
+pesos_frequencia = [0.22, 0.38, 0.20, 0.15, 0.05]  # o último peso é o de respostas livres ("Outra")
+pesos_produtividade = [0.05, 0.10, 0.25, 0.35, 0.25]
+
+# Respostas livres usadas nas opções "Outra" (com erros de digitação e espaços extras)
+frequencias_livres = ["Trabalho remoto 2x por semana", "trabalho 100% remoto", "Freelancer", " Híbrido "]
+eficiencias_livres = ["Menos reuniões", "Ausencia de deslocamento", "Horarios flexiveis ", "Silêncio em casa"]
+
+
+def gerar_planilha(caminho_planilha, quantidade_respostas, semente=42):
+    """
+    --> Função para gerar uma planilha sintética com respostas do formulário (gravação em fluxo)
+    :param caminho_planilha: Caminho da planilha que será criada
+    :param quantidade_respostas: Quantidade de respostas (linhas além do cabeçalho)
+    :param semente: Semente do gerador de números aleatórios (valor padrão: 42)
+    """
+    gerador = np.random.default_rng(semente)
+
+    # Sorteia todas as respostas de uma vez (vetorizado) e grava linha a linha
+    idades = gerador.choice(len(ordem_faixas), size=quantidade_respostas, p=pesos_faixas)
+    frequencias = gerador.choice(len(frequencias_validas) + 1, size=quantidade_respostas, p=pesos_frequencia)
+    notas = gerador.choice(5, size=quantidade_respostas, p=pesos_produtividade) + 1
+    intervalos = gerador.exponential(scale=600, size=quantidade_respostas)
+    duracoes = gerador.integers(60, 900, size=quantidade_respostas)
+
+    # Eficiência: cada opção é marcada com probabilidade própria e "Outra" em 8% das respostas
+    marcacoes = gerador.random((quantidade_respostas, len(eficiencias_validas))) < [0.55, 0.35, 0.40, 0.60, 0.50, 0.30]
+    outras = gerador.random(quantidade_respostas) < 0.08
+    indices_livres = gerador.integers(0, len(eficiencias_livres), size=quantidade_respostas)
+
+    objeto_workbook = openpyxl.Workbook(write_only=True)
+    objeto_planilha = objeto_workbook.create_sheet("Sheet1")
+    objeto_planilha.append(cabecalho)
+
+    inicio = datetime(2025, 3, 10, 8, 0, 0)
+    for indice in range(quantidade_respostas):
+        inicio += timedelta(seconds=float(intervalos[indice]))
+        conclusao = inicio + timedelta(seconds=int(duracoes[indice]))
+
+        if frequencias[indice] < len(frequencias_validas):
+            frequencia = frequencias_validas[frequencias[indice]]
+        else:
+            frequencia = frequencias_livres[indice % len(frequencias_livres)]
+
+        # O Forms grava as opções de múltipla escolha separadas (e terminadas) por ';'
+        opcoes = [opcao for opcao, marcada in zip(eficiencias_validas, marcacoes[indice]) if marcada]
+        if outras[indice] or not opcoes:
+            opcoes.append(eficiencias_livres[indices_livres[indice]])
+        eficiencia = ";".join(opcoes) + ";"
+
+        objeto_planilha.append([
+            indice + 1, inicio, conclusao, "anonymous", None, None,
+            ordem_faixas[idades[indice]], frequencia, int(notas[indice]), eficiencia,
+        ])
+
+    objeto_workbook.save(caminho_planilha)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera planilhas sintéticas do formulário de trabalho remoto")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="Quantidades de respostas (uma planilha para cada valor)")
+    parser.add_argument("--pasta", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados"),
+                        help="Pasta onde as planilhas serão salvas")
+    parser.add_argument("--semente", type=int, default=42, help="Semente do gerador de números aleatórios")
+    argumentos = parser.parse_args()
+
+    os.makedirs(argumentos.pasta, exist_ok=True)
+    for quantidade in argumentos.linhas:
+        caminho = os.path.join(argumentos.pasta, f"planilha_{quantidade}.xlsx")
+        gerar_planilha(caminho, quantidade, argumentos.semente)
+        print(f"Planilha com {quantidade} respostas salva em: {caminho}")
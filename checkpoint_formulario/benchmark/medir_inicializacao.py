@@ -0,0 +1,158 @@
+"""
+Benchmark da inicialização a frio do dashboard: tempo de importação dos módulos, tempo até o servidor
+do Streamlit responder e tempo até a primeira exibição completa da página (cada medição em um processo novo).
+
+Uso:
+    python medir_inicializacao.py --repeticoes 5 --saida inicializacao.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+diretorio_dashboard = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+script_dashboard = os.path.join(diretorio_dashboard, "planilha_streamlit.py")
+
+# A atualização em segundo plano é desativada para não depender do SharePoint durante a medição
+ambiente = {**os.environ, "INTERVALO_ATUALIZACAO_MINUTOS": os.getenv("INTERVALO_ATUALIZACAO_MINUTOS", "0")}
+
+# Executado em um processo novo: tempo até a primeira execução completa da página (AppTest)
+codigo_primeira_exibicao = f"""
+import time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+teste = AppTest.from_file({script_dashboard!r}, default_timeout=300).run()
+if teste.exception:
+    raise SystemExit(str(teste.exception))
+print(time.perf_counter() - inicio)
+"""
+
+
+def medir_importacao(modulo="planilha_streamlit", quantidade_modulos=15):
+    """
+    --> Função para medir o tempo de importação de um módulo em um processo novo (python -X importtime)
+    :param modulo: Módulo importado (valor padrão: planilha_streamlit)
+    :param quantidade_modulos: Quantidade de dependências mais lentas retornadas (valor padrão: 15)
+    :return: Tupla (tempo total em segundos, lista de (módulo, tempo acumulado em segundos))
+    """
+    resultado = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                               cwd=diretorio_dashboard, env=ambiente, capture_output=True, text=True, check=True)
+
+    # Cada linha do stderr: "import time: <próprio> | <acumulado> | <módulo>" (em microssegundos)
+    tempos = {}
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        nome_limpo = nome.strip()
+        # Apenas os pacotes de primeiro nível importados diretamente (indentação de até dois espaços)
+        if len(nome) - len(nome.lstrip()) <= 3:
+            tempos[nome_limpo] = int(acumulado) / 1_000_000
+
+    mais_lentos = sorted(((nome, tempo) for nome, tempo in tempos.items() if nome != modulo),
+                         key=lambda item: item[1], reverse=True)[:quantidade_modulos]
+    return tempos.get(modulo), mais_lentos
+
+
+def porta_livre():
+    """
+    --> Função para obter uma porta TCP livre para o servidor do Streamlit
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def medir_servidor(tempo_limite=120):
+    """
+    --> Função para medir o tempo entre o "streamlit run" e a primeira resposta do endpoint de saúde
+    :param tempo_limite: Tempo máximo de espera em segundos (valor padrão: 120)
+    :return: Tempo em segundos
+    """
+    porta = porta_livre()
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script_dashboard, "--server.headless", "true",
+         "--server.port", str(porta), "--browser.gatherUsageStats", "false"],
+        cwd=diretorio_dashboard, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        while time.perf_counter() - inicio < tempo_limite:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1) as resposta:
+                    if resposta.status == 200:
+                        return time.perf_counter() - inicio
+            except OSError:
+                time.sleep(0.05)
+        raise TimeoutError("O servidor do Streamlit não respondeu dentro do tempo limite")
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+def medir_primeira_exibicao():
+    """
+    --> Função para medir, em um processo novo, o tempo até a página ser executada por completo
+    (importações, leitura da planilha em cache, tabelas e gráficos)
+    :return: Tempo em segundos
+    """
+    resultado = subprocess.run([sys.executable, "-c", codigo_primeira_exibicao], cwd=diretorio_dashboard,
+                               env=ambiente, capture_output=True, text=True, check=True)
+    return float(resultado.stdout.strip().splitlines()[-1])
+
+
+def resumir(tempos):
+    """
+    --> Função para resumir as repetições de uma medição (mediana, mínimo e máximo)
+    :param tempos: Lista de tempos em segundos
+    """
+    return {"mediana_s": round(statistics.median(tempos), 4), "minimo_s": round(min(tempos), 4),
+            "maximo_s": round(max(tempos), 4)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da inicialização a frio do dashboard")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Quantidade de processos medidos por etapa")
+    parser.add_argument("--sem-servidor", action="store_true", help="Não mede o tempo até o servidor responder")
+    parser.add_argument("--saida", help="Arquivo JSON onde os resultados serão salvos")
+    argumentos = parser.parse_args()
+
+    if not os.path.exists(os.path.join(diretorio_dashboard, "planilha.xlsx")):
+        print("Aviso: planilha.xlsx não encontrada, a página será interrompida antes dos gráficos.")
+
+    resultados = {}
+
+    tempos_importacao = []
+    for _ in range(argumentos.repeticoes):
+        tempo_total, mais_lentos = medir_importacao()
+        tempos_importacao.append(tempo_total)
+    resultados["importacao"] = {**resumir(tempos_importacao), "modulos_mais_lentos": mais_lentos}
+
+    if not argumentos.sem_servidor:
+        resultados["servidor"] = resumir([medir_servidor() for _ in range(argumentos.repeticoes)])
+
+    # A primeira execução também gera o cache colunar da planilha; as demais medem a inicialização a frio
+    medir_primeira_exibicao()
+    resultados["primeira_exibicao"] = resumir([medir_primeira_exibicao() for _ in range(argumentos.repeticoes)])
+
+    print(f"{'Etapa':<40}{'Mediana (s)':>14}{'Mínimo (s)':>14}{'Máximo (s)':>14}")
+    for nome, etapa in (("importação de planilha_streamlit", "importacao"),
+                        ("streamlit run até /_stcore/health", "servidor"),
+                        ("primeira exibição completa (AppTest)", "primeira_exibicao")):
+        if etapa in resultados:
+            r = resultados[etapa]
+            print(f"{nome:<40}{r['mediana_s']:>14.4f}{r['minimo_s']:>14.4f}{r['maximo_s']:>14.4f}")
+
+    print("\nDependências mais lentas na importação:")
+    for nome, tempo in mais_lentos:
+        print(f"  {nome:<40}{tempo:>10.4f} s")
+
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados salvos em: {argumentos.saida}")
@@ -0,0 +1,167 @@
+import os
+import hashlib
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Diretório onde ficam as cópias colunares (Parquet) da planilha
+DIRETORIO_CACHE = os.getenv("DIRETORIO_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+# Tamanho máximo ocupado pelo cache antes de remover as versões mais antigas
+LIMITE_CACHE_BYTES = int(os.getenv("LIMITE_CACHE_MB", "200")) * 1024 * 1024
+
+# Versão do formato gravado (deve ser incrementada sempre que o esquema mudar)
+VERSAO_ESQUEMA = 2
+
+# Esquema da tabela de respostas (uma linha por respondente)
+ESQUEMA_RESPOSTAS = pa.schema([
+    ("idade", pa.string()),
+    ("frequencia", pa.string()),
+    ("produtividade", pa.int64()),
+    ("eficiencia", pa.string()),
+    ("conclusao", pa.timestamp("s")),
+])
+
+# Quantidade de linhas convertidas por lote (mantém a memória limitada durante a conversão)
+TAMANHO_LOTE = 50_000
+
+# Hashes já calculados neste processo, indexados por (caminho, data de modificação, tamanho)
+_hashes_calculados = {}
+
+
+def calcular_hash_arquivo(caminho_arquivo, tamanho_bloco=1024 * 1024):
+    """
+    --> Função para calcular o hash SHA-256 do conteúdo de um arquivo
+    :param caminho_arquivo: Caminho do arquivo
+    :param tamanho_bloco: Quantidade de bytes lidos por vez (valor padrão: 1 MB)
+    """
+    sha256 = hashlib.sha256()
+    with open(caminho_arquivo, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def versao_planilha(caminho_planilha):
+    """
+    --> Função para obter a versão (hash do conteúdo) da planilha, reaproveitando o hash
+    enquanto o arquivo não for modificado
+    :param caminho_planilha: Caminho da planilha
+    """
+    info = os.stat(caminho_planilha)
+    chave = (os.path.abspath(caminho_planilha), info.st_mtime_ns, info.st_size)
+    if chave not in _hashes_calculados:
+        _hashes_calculados[chave] = calcular_hash_arquivo(caminho_planilha)
+    return _hashes_calculados[chave]
+
+
+def _texto(valor):
+    """
+    --> Função para converter um valor da planilha em texto (mantendo células vazias como None)
+    :param valor: Valor lido da célula
+    """
+    return None if valor is None else str(valor)
+
+
+def _lote_para_tabela(lote):
+    """
+    --> Função para converter um lote de respostas em uma tabela do Arrow
+    :param lote: Lista de tuplas (idade, frequência, produtividade, eficiência, hora de conclusão)
+    """
+    idades, frequencias, produtividades, eficiencias, conclusoes = zip(*lote) if lote else ([], [], [], [], [])
+    return pa.table({
+        "idade": [_texto(v) for v in idades],
+        "frequencia": [_texto(v) for v in frequencias],
+        "produtividade": list(produtividades),
+        "eficiencia": [_texto(v) for v in eficiencias],
+        "conclusao": list(conclusoes),
+    }, schema=ESQUEMA_RESPOSTAS)
+
+
+def converter_planilha_parquet(caminho_planilha, caminho_parquet):
+    """
+    --> Função para converter a planilha em um arquivo Parquet, gravando em lotes
+    :param caminho_planilha: Caminho da planilha do Excel
+    :param caminho_parquet: Caminho do arquivo Parquet que será criado
+    """
+    # O openpyxl só é necessário quando a versão ainda não está no cache
+    from leitura_planilha import iterar_respostas_planilha
+
+    # Grava em um arquivo temporário e só depois renomeia (leitores nunca veem um arquivo incompleto)
+    caminho_temporario = f"{caminho_parquet}.{os.getpid()}.tmp"
+    try:
+        with pq.ParquetWriter(caminho_temporario, ESQUEMA_RESPOSTAS) as escritor:
+            lote = []
+            for resposta in iterar_respostas_planilha(caminho_planilha):
+                lote.append(resposta)
+                if len(lote) >= TAMANHO_LOTE:
+                    escritor.write_table(_lote_para_tabela(lote))
+                    lote = []
+            # Sempre grava o último lote (mesmo vazio, para o arquivo conter o esquema)
+            escritor.write_table(_lote_para_tabela(lote))
+        os.replace(caminho_temporario, caminho_parquet)
+    finally:
+        if os.path.exists(caminho_temporario):
+            os.remove(caminho_temporario)
+
+
+def remover_versoes_antigas(diretorio_cache=DIRETORIO_CACHE, limite_bytes=LIMITE_CACHE_BYTES, manter=None):
+    """
+    --> Função para remover as cópias menos usadas recentemente até o cache respeitar o limite de tamanho
+    :param diretorio_cache: Diretório do cache
+    :param limite_bytes: Tamanho máximo do cache em bytes
+    :param manter: Caminho de um arquivo que nunca deve ser removido (versão atual)
+    """
+    arquivos = [os.path.join(diretorio_cache, nome) for nome in os.listdir(diretorio_cache)
+                if nome.endswith(".parquet")]
+
+    # Ordena do acesso mais antigo para o mais recente
+    arquivos.sort(key=lambda caminho: os.stat(caminho).st_mtime)
+    tamanho_total = sum(os.path.getsize(caminho) for caminho in arquivos)
+
+    for caminho in arquivos:
+        if tamanho_total <= limite_bytes:
+            break
+        if manter is not None and os.path.abspath(caminho) == os.path.abspath(manter):
+            continue
+        tamanho_total -= os.path.getsize(caminho)
+        os.remove(caminho)
+
+
+def caminho_cache_parquet(caminho_planilha, diretorio_cache=DIRETORIO_CACHE):
+    """
+    --> Função para obter o caminho da cópia colunar (Parquet) da versão atual da planilha
+    :param caminho_planilha: Caminho da planilha do Excel
+    :param diretorio_cache: Diretório do cache (valor padrão: DIRETORIO_CACHE)
+    """
+    return os.path.join(diretorio_cache, f"{versao_planilha(caminho_planilha)}-v{VERSAO_ESQUEMA}.parquet")
+
+
+def tabela_em_cache(caminho_planilha, diretorio_cache=DIRETORIO_CACHE):
+    """
+    --> Função para verificar se a versão atual da planilha já foi convertida para Parquet
+    :param caminho_planilha: Caminho da planilha do Excel
+    :param diretorio_cache: Diretório do cache (valor padrão: DIRETORIO_CACHE)
+    """
+    return os.path.exists(caminho_cache_parquet(caminho_planilha, diretorio_cache))
+
+
+def carregar_tabela_respostas(caminho_planilha, diretorio_cache=DIRETORIO_CACHE, limite_bytes=LIMITE_CACHE_BYTES):
+    """
+    --> Função para carregar a tabela de respostas a partir da cópia colunar da planilha,
+    convertendo a planilha apenas quando o seu conteúdo (hash) ainda não estiver no cache
+    :param caminho_planilha: Caminho da planilha do Excel
+    :param diretorio_cache: Diretório do cache (valor padrão: DIRETORIO_CACHE)
+    :param limite_bytes: Tamanho máximo do cache em bytes (valor padrão: LIMITE_CACHE_BYTES)
+    :return: Tabela do Arrow com as colunas idade, frequencia, produtividade, eficiencia e conclusao
+    """
+    os.makedirs(diretorio_cache, exist_ok=True)
+    caminho_parquet = caminho_cache_parquet(caminho_planilha, diretorio_cache)
+
+    if os.path.exists(caminho_parquet):
+        # Atualiza a data de modificação para marcar o arquivo como usado recentemente
+        os.utime(caminho_parquet)
+    else:
+        converter_planilha_parquet(caminho_planilha, caminho_parquet)
+        remover_versoes_antigas(diretorio_cache, limite_bytes, manter=caminho_parquet)
+
+    return pq.read_table(caminho_parquet)
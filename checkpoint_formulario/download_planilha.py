@@ -1,81 +1,77 @@
 import os
-import ssl
-import urllib3
 import traceback
-import openpyxl
-from shareplum import Site
-from shareplum import Office365
-from shareplum.site import Version
 from dotenv import load_dotenv
+from sharepoint import INALTERADO, SessaoSharePoint, configurar_ssl, ler_metadados_locais, salvar_metadados_locais
+from leitura_planilha import contar_linhas_preenchidas
+from fontes import carregar_fontes, sincronizar_fontes
 
 # Carregando variáveis de ambiente (credenciais)
 load_dotenv()
 
 # Configurações para certificação SSL (Firewall da FIAP)
-urllib3.disable_warnings()  # Desabilita avisos sobre certificação SSL
-ssl._create_default_https_context = ssl._create_unverified_context  # Contexto da certificação SSL para não verificar certificados
-
-# URL para Planilha do Excel com a planilha atualizada pelo Microsoft Forms
-sharepoint_url = "https://fiapcom-my.sharepoint.com"
-site_url = "https://fiapcom-my.sharepoint.com/personal/rm554497_fiap_com_br"
-
-# Caminho do Arquivo
-caminho_arquivo = "Documents/Impacto do Trabalho Remoto na Eficiência do Trabalhador.xlsx"
-arquivo_destino = "planilha.xlsx"
+configurar_ssl()
 
 # Credenciais do Microsoft 365
 usuario = os.getenv("USUARIO")
 senha = os.getenv("SENHA")
 
-caminho_planilha = f"{os.path.dirname(__file__)}\\planilha.xlsx"
-
-# Realizando a autenticação e realizando o download do arquivo
-try:
-    # Autenticação no Microsoft 365
-    authcookie = Office365(sharepoint_url, username=usuario, password=senha).GetCookies()
-    site = Site(site_url, version=Version.v365, authcookie=authcookie)
-
-    # Acessando a pasta do Sharepoint
-    folder = site.Folder("Documents")
-
-    # Baixar arquivo
-    file_content = folder.get_file(caminho_arquivo.split('/')[-1])
+# Planilhas configuradas (uma por onda da pesquisa; sem fontes.json, apenas planilha.xlsx)
+fontes = carregar_fontes()
 
-    # Salvar planilha com os dados do formulário
-    with open(arquivo_destino, "wb") as f:
-        f.write(file_content)
+# Situação de cada planilha após a sincronização (vazio caso o download falhe)
+situacoes = {}
 
-    print(f"Arquivo baixado com sucesso! Caminho: {caminho_planilha}")
+# Realizando a autenticação e realizando o download dos arquivos (somente os que mudaram no SharePoint)
+try:
+    # Sessão no Microsoft 365 (a autenticação é feita na primeira requisição)
+    sessao = SessaoSharePoint(usuario, senha)
+
+    # Baixar os arquivos (ao mesmo tempo)
+    situacoes = sincronizar_fontes(fontes, sessao)
+    sessao.fechar()
+
+    for fonte in fontes:
+        if situacoes[fonte["nome"]] == INALTERADO:
+            print(f"[{fonte['nome']}] Arquivo inalterado desde o último download. Caminho: {fonte['arquivo']}")
+        else:
+            print(f"[{fonte['nome']}] Arquivo baixado com sucesso! Caminho: {fonte['arquivo']}")
 # Caso ocorra algum erro no download
 except Exception as e:
     print(f"Erro ao baixar o arquivo: {str(e)}")
     traceback.print_exc()
 
-# Abrindo planilha com os dados
-objeto_workbook = openpyxl.load_workbook(caminho_planilha)
-objeto_planilha = objeto_workbook.active
-
 
-def pegar_maximo_linhas(*, objeto):
+def pegar_maximo_linhas(*, caminho):
     """
-    --> Função para capturar o valor máximo de linhas da planilha
-    :param objeto: Objeto de planilha que deve ser avaliado
+    --> Função para capturar o valor máximo de linhas com conteúdo da planilha
+    :param caminho: Caminho da planilha que deve ser avaliada
     """
-    linhas = 0
-    for maximo_linha, linha in enumerate(objeto, 1):
-        if not all(col.value is None for col in linha):
-            linhas += 1
-    return linhas
-
-
-# Pegando o máximo de linhas com conteúdo existentes na planilha
-maximo_linhas = pegar_maximo_linhas(objeto=objeto_planilha)
-
-# Iterando sobre todos os valores da coluna das idades (coluna G) e armazenando em uma lista
-# valores_idade = []
-# for celula in objeto_planilha["G"]:
-#     valores_idade.append(celula.value)
-# valores_idade.pop(0)
-
-# Fechando o workbook da Planilha
-objeto_workbook.close()
+    return contar_linhas_preenchidas(caminho)
+
+
+for fonte in fontes:
+    caminho_planilha = fonte["arquivo"]
+    if not os.path.exists(caminho_planilha):
+        continue
+
+    # Planilha inalterada: a quantidade de respostas já foi contada e salva no download anterior
+    metadados = ler_metadados_locais(caminho_planilha)
+    if situacoes.get(fonte["nome"]) == INALTERADO and metadados is not None and "respostas" in metadados:
+        print(f"[{fonte['nome']}] Quantidade de respostas na planilha: {metadados['respostas']}")
+        continue
+
+    # Pegando o máximo de linhas com conteúdo existentes na planilha (a primeira linha é o cabeçalho)
+    maximo_linhas = pegar_maximo_linhas(caminho=caminho_planilha)
+    quantidade_respostas = max(maximo_linhas - 1, 0)
+    print(f"[{fonte['nome']}] Quantidade de respostas na planilha: {quantidade_respostas}")
+
+    # Validando a quantidade de respostas (o Microsoft Forms apenas adiciona linhas)
+    if quantidade_respostas == 0:
+        print(f"[{fonte['nome']}] Aviso: a planilha não possui respostas.")
+
+    if metadados is not None:
+        respostas_anteriores = metadados.get("respostas")
+        if respostas_anteriores is not None and quantidade_respostas < respostas_anteriores:
+            print(f"[{fonte['nome']}] Aviso: a quantidade de respostas diminuiu de {respostas_anteriores} para "
+                  f"{quantidade_respostas} (respostas excluídas no Microsoft Forms?)")
+        salvar_metadados_locais(caminho_planilha, {**metadados, "respostas": quantidade_respostas})
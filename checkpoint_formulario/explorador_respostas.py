@@ -0,0 +1,97 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Colunas da tabela de respostas e o nome exibido de cada uma
+colunas_explorador = {
+    'idade': "Faixa Etária",
+    'frequencia': "Frequência",
+    'produtividade': "Produtividade",
+    'eficiencia': "Eficiência",
+    'conclusao': "Conclusão",
+    'fonte': "Onda",
+}
+
+# Ordenações disponíveis
+ORDEM_ORIGINAL = "Ordem das respostas"
+ORDEM_CRESCENTE = "Crescente"
+ORDEM_DECRESCENTE = "Decrescente"
+ordens_explorador = [ORDEM_ORIGINAL, ORDEM_CRESCENTE, ORDEM_DECRESCENTE]
+
+
+class ExploradorRespostas:
+    """
+    --> Classe que pagina, ordena e busca as respostas da tabela colunar sem montar listas do Python. Cada coluna é
+    codificada uma única vez (dicionário dos valores distintos + um código por linha) e as ordenações crescente e
+    decrescente de cada coluna são calculadas na criação, então cada página é apenas uma fatia dos índices.
+    """
+
+    def __init__(self, tabela):
+        """
+        :param tabela: Tabela do Arrow retornada por fontes.carregar_tabela_fontes
+        """
+        # Com um único bloco por coluna, o take de uma página não percorre os blocos das várias planilhas
+        self.tabela = tabela.combine_chunks()
+        self.quantidade = tabela.num_rows
+        self.colunas = [coluna for coluna in colunas_explorador if coluna in tabela.column_names]
+        self.dicionarios = {}
+        self.codigos = {}
+        self.ordens = {}
+
+        for coluna in self.colunas:
+            codificada = pc.dictionary_encode(self.tabela.column(coluna).chunk(0))
+            dicionario = codificada.dictionary
+            # Células vazias recebem o código len(dicionario) (ficam no final das duas ordenações)
+            codigos = codificada.indices.fill_null(len(dicionario)).to_numpy().astype(np.int32)
+
+            # Posição de cada valor distinto na ordem crescente
+            posicoes = np.empty(len(dicionario) + 1, dtype=np.int32)
+            posicoes[pc.sort_indices(dicionario).to_numpy()] = np.arange(len(dicionario), dtype=np.int32)
+            posicoes[-1] = len(dicionario)
+            crescente = posicoes[codigos]
+            decrescente = np.where(codigos == len(dicionario), len(dicionario), len(dicionario) - 1 - crescente)
+
+            self.dicionarios[coluna] = dicionario
+            self.codigos[coluna] = codigos
+            self.ordens[(coluna, ORDEM_CRESCENTE)] = np.argsort(crescente, kind="stable")
+            self.ordens[(coluna, ORDEM_DECRESCENTE)] = np.argsort(decrescente, kind="stable")
+
+    def selecionar(self, coluna, busca="", ordem=ORDEM_ORIGINAL, mascara=None):
+        """
+        --> Função para obter as linhas exibidas de uma coluna (somente células preenchidas), na ordem escolhida.
+        A busca é feita nos valores distintos (poucos) e convertida em um filtro das linhas pelos códigos
+        :param coluna: Coluna explorada (ex.: 'idade')
+        :param busca: Texto procurado na coluna (sem diferenciar maiúsculas e minúsculas)
+        :param ordem: Um dos valores de ordens_explorador
+        :param mascara: Array booleano com os respondentes selecionados pelos filtros (valor padrão: todos)
+        :return: Array com os índices das linhas
+        """
+        dicionario = self.dicionarios[coluna]
+        valores_aceitos = np.ones(len(dicionario) + 1, dtype=bool)
+        valores_aceitos[-1] = False
+        if busca:
+            texto = dicionario if pa.types.is_string(dicionario.type) else pc.cast(dicionario, pa.string())
+            valores_aceitos[:-1] = pc.match_substring(texto, busca, ignore_case=True).to_numpy(zero_copy_only=False)
+
+        selecionadas = valores_aceitos[self.codigos[coluna]]
+        if mascara is not None:
+            selecionadas &= mascara
+
+        if ordem == ORDEM_ORIGINAL:
+            return np.flatnonzero(selecionadas)
+        linhas = self.ordens[(coluna, ordem)]
+        return linhas[selecionadas[linhas]]
+
+    def pagina(self, linhas, inicio, tamanho, colunas=None):
+        """
+        --> Função para montar o DataFrame de uma página (somente as linhas exibidas são convertidas)
+        :param linhas: Array retornado por selecionar
+        :param inicio: Posição da primeira linha da página
+        :param tamanho: Quantidade de linhas por página
+        :param colunas: Colunas exibidas (valor padrão: todas)
+        """
+        colunas = colunas or self.colunas
+        indices = linhas[inicio:inicio + tamanho]
+        df = self.tabela.select(colunas).take(pa.array(indices)).to_pandas(integer_object_nulls=True)
+        df.insert(0, "Resposta", indices + 1)
+        return df.rename(columns=colunas_explorador)
@@ -0,0 +1,181 @@
+"""
+Fontes de dados do dashboard: uma planilha do Microsoft Forms para cada onda da pesquisa.
+
+Sem arquivo de configuração, o dashboard usa uma única planilha (planilha.xlsx). Para várias ondas,
+crie o arquivo fontes.json (ou aponte a variável FONTES_PLANILHAS para outro arquivo) com uma lista:
+
+    [
+        {"nome": "Onda 1", "caminho": "Documents/Impacto do Trabalho Remoto - Onda 1.xlsx"},
+        {"nome": "Onda 2", "caminho": "Documents/Impacto do Trabalho Remoto - Onda 2.xlsx",
+         "url_site": "https://fiapcom-my.sharepoint.com/personal/outro_usuario"}
+    ]
+
+"caminho" é o caminho do arquivo no SharePoint e "url_site" é opcional (valor padrão: SHAREPOINT_SITE_URL).
+"""
+import os
+import re
+import json
+import unicodedata
+import pyarrow as pa
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from cache_planilha import DIRETORIO_CACHE, carregar_tabela_respostas, tabela_em_cache, versao_planilha
+from agregacao_incremental import CAMINHO_ESTADO, atualizar_agregado, atualizar_estado
+
+diretorio_dashboard = os.path.dirname(os.path.abspath(__file__))
+
+# Arquivo de configuração com a lista de planilhas (uma por onda da pesquisa)
+CAMINHO_FONTES = os.getenv("FONTES_PLANILHAS", os.path.join(diretorio_dashboard, "fontes.json"))
+
+# Quantidade máxima de downloads e de conversões simultâneos
+MAXIMO_PARALELO = int(os.getenv("MAXIMO_PARALELO", str(min(8, os.cpu_count() or 1))))
+
+# Nome da fonte quando não há arquivo de configuração
+FONTE_PADRAO = "Pesquisa"
+
+
+def _identificador(nome):
+    """
+    --> Função para gerar um identificador seguro para nomes de arquivo a partir do nome da fonte
+    :param nome: Nome da fonte (ex.: "Onda 1 - Março")
+    """
+    texto = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "_", texto.lower()).strip("_") or "fonte"
+
+
+def carregar_fontes(caminho_configuracao=CAMINHO_FONTES):
+    """
+    --> Função para carregar a lista de planilhas (fontes) do arquivo de configuração
+    :param caminho_configuracao: Caminho do arquivo JSON (valor padrão: CAMINHO_FONTES)
+    :return: Lista de dicionários com nome, caminho no SharePoint, url_site, arquivo local e arquivo de estado
+    """
+    if not os.path.exists(caminho_configuracao):
+        # Modo de uma única planilha (mesmos arquivos usados antes da configuração de várias fontes)
+        return [{"nome": FONTE_PADRAO, "caminho": None, "url_site": None,
+                 "arquivo": os.path.join(diretorio_dashboard, "planilha.xlsx"), "estado": CAMINHO_ESTADO}]
+
+    with open(caminho_configuracao, encoding="utf-8") as f:
+        configuracao = json.load(f)
+
+    fontes = []
+    for item in configuracao:
+        identificador = _identificador(item["nome"])
+        fontes.append({
+            "nome": item["nome"],
+            "caminho": item.get("caminho"),
+            "url_site": item.get("url_site"),
+            "arquivo": item.get("arquivo") or os.path.join(diretorio_dashboard, f"planilha_{identificador}.xlsx"),
+            "estado": os.path.join(DIRETORIO_CACHE, f"agregado_{identificador}.json"),
+        })
+
+    identificadores = [_identificador(fonte["nome"]) for fonte in fontes]
+    if len(set(identificadores)) != len(identificadores):
+        raise ValueError(f"Nomes de fontes repetidos em {caminho_configuracao}")
+    return fontes
+
+
+def sincronizar_fontes(fontes, sessao, preparar=None, maximo_paralelo=MAXIMO_PARALELO):
+    """
+    --> Função para baixar ao mesmo tempo as planilhas que mudaram no SharePoint
+    (o tempo total acompanha o download mais lento, e não a soma de todos)
+    :param fontes: Lista retornada por carregar_fontes
+    :param sessao: Objeto SessaoSharePoint (compartilhado entre os downloads)
+    :param preparar: Função opcional (fonte, caminho do arquivo baixado) chamada antes de cada planilha ser substituída
+    :param maximo_paralelo: Quantidade máxima de downloads simultâneos
+    :return: Dicionário {nome da fonte: BAIXADO ou INALTERADO}
+    """
+    from sharepoint import caminho_arquivo, sincronizar_planilha
+
+    def sincronizar(fonte):
+        preparar_fonte = None if preparar is None else lambda caminho: preparar(fonte, caminho)
+        return sincronizar_planilha(fonte["arquivo"], sessao, fonte["caminho"] or caminho_arquivo,
+                                    preparar=preparar_fonte, url_site=fonte["url_site"])
+
+    situacoes, erros = {}, []
+    with ThreadPoolExecutor(max_workers=max(1, min(maximo_paralelo, len(fontes)))) as executor:
+        futuros = {executor.submit(sincronizar, fonte): fonte["nome"] for fonte in fontes}
+        for futuro in as_completed(futuros):
+            try:
+                situacoes[futuros[futuro]] = futuro.result()
+            except Exception as e:
+                erros.append(f"{futuros[futuro]}: {e}")
+
+    # As planilhas que foram baixadas com sucesso já substituíram as anteriores
+    if erros:
+        raise RuntimeError("Erro ao baixar as planilhas: " + "; ".join(erros))
+    return situacoes
+
+
+def preparar_fonte(caminho_planilha, caminho_estado):
+    """
+    --> Função (executada em um processo separado) para converter a planilha para Parquet e atualizar
+    as contagens da fonte
+    :param caminho_planilha: Caminho da planilha
+    :param caminho_estado: Arquivo de estado das contagens da fonte
+    """
+    atualizar_agregado(carregar_tabela_respostas(caminho_planilha), caminho_estado, versao_planilha(caminho_planilha))
+
+
+def estados_fontes(fontes, maximo_paralelo=MAXIMO_PARALELO):
+    """
+    --> Função para obter o estado agregado (contagens totais e por dia) de cada fonte. As planilhas que ainda
+    não estão no cache são lidas ao mesmo tempo em processos separados (a leitura do .xlsx não é limitada pelo GIL)
+    :param fontes: Lista retornada por carregar_fontes (apenas as fontes com planilha local)
+    :param maximo_paralelo: Quantidade máxima de processos
+    :return: Dicionário {nome da fonte: estado retornado por atualizar_estado}
+    """
+    pendentes = [fonte for fonte in fontes if not tabela_em_cache(fonte["arquivo"])]
+    if len(pendentes) > 1:
+        with ProcessPoolExecutor(max_workers=min(maximo_paralelo, len(pendentes))) as executor:
+            list(executor.map(preparar_fonte, [fonte["arquivo"] for fonte in pendentes],
+                              [fonte["estado"] for fonte in pendentes]))
+
+    # Com o cache pronto, a atualização abaixo só lê o Parquet e o estado já salvo
+    return {fonte["nome"]: atualizar_estado(carregar_tabela_respostas(fonte["arquivo"]), fonte["estado"],
+                                            versao_planilha(fonte["arquivo"]))
+            for fonte in fontes}
+
+
+def agregar_fontes(fontes, maximo_paralelo=MAXIMO_PARALELO):
+    """
+    --> Função para obter as contagens de cada fonte
+    :param fontes: Lista retornada por carregar_fontes (apenas as fontes com planilha local)
+    :param maximo_paralelo: Quantidade máxima de processos
+    :return: Dicionário {nome da fonte: contagens}
+    """
+    return {nome: estado["contagens"] for nome, estado in estados_fontes(fontes, maximo_paralelo).items()}
+
+
+def somar_contagens(contagens_fontes, nomes=None):
+    """
+    --> Função para juntar as contagens de várias fontes em um único agregado
+    :param contagens_fontes: Dicionário retornado por agregar_fontes
+    :param nomes: Fontes consideradas (valor padrão: todas)
+    """
+    total = {pergunta: Counter() for pergunta in ("idade", "frequencia", "produtividade", "eficiencia")}
+    for nome, contagens in contagens_fontes.items():
+        if nomes is None or nome in nomes:
+            for pergunta, contagem in contagens.items():
+                total[pergunta].update(contagem)
+    return total
+
+
+def versao_fontes(fontes):
+    """
+    --> Função para obter a versão do conjunto de planilhas (hash do conteúdo de cada uma)
+    :param fontes: Lista de planilhas com o arquivo local disponível
+    """
+    return "|".join(versao_planilha(fonte["arquivo"]) for fonte in fontes)
+
+
+def carregar_tabela_fontes(fontes):
+    """
+    --> Função para juntar as respostas de todas as fontes em uma única tabela, com a coluna "fonte"
+    :param fontes: Lista retornada por carregar_fontes (apenas as fontes com planilha local)
+    :return: Tabela do Arrow com as colunas idade, frequencia, produtividade, eficiencia, conclusao e fonte
+    """
+    tabelas = []
+    for fonte in fontes:
+        tabela = carregar_tabela_respostas(fonte["arquivo"])
+        tabelas.append(tabela.append_column("fonte", pa.array([fonte["nome"]] * tabela.num_rows, pa.string())))
+    return pa.concat_tables(tabelas)
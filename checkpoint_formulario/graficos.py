@@ -0,0 +1,170 @@
+import plotly.express as px
+import pandas as pd
+
+# Tipos de gráfico disponíveis em cada seção do dashboard
+tipos_grafico = ["Gráfico de Barras", "Gráfico de Pizza", "Treemap", "Funil"]
+
+
+def criar_grafico(df, coluna, tipo_grafico, titulo, titulo_eixo_x, titulo_treemap=None):
+    """
+    --> Função para criar o gráfico (Plotly) de distribuição de uma seção do dashboard
+    :param df: DataFrame com a coluna das opções e a coluna Quantidade
+    :param coluna: Coluna com as opções (ex.: 'Faixa Etária')
+    :param tipo_grafico: Um dos valores de tipos_grafico
+    :param titulo: Título do gráfico
+    :param titulo_eixo_x: Título do eixo x do gráfico de barras
+    :param titulo_treemap: Título do treemap (valor padrão: o mesmo título do gráfico)
+    """
+    if tipo_grafico == "Gráfico de Barras":
+        fig = px.bar(
+            df,
+            x=coluna,
+            y='Quantidade',
+            text='Quantidade',
+            color=coluna,
+            title=titulo,
+            height=400
+        )
+        fig.update_layout(xaxis_title=titulo_eixo_x, yaxis_title="Quantidade")
+
+    elif tipo_grafico == "Gráfico de Pizza":
+        fig = px.pie(
+            df,
+            values='Quantidade',
+            names=coluna,
+            title=f"{titulo} (%)",
+            height=400
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+
+    elif tipo_grafico == "Treemap":
+        fig = px.treemap(
+            df,
+            path=[coluna],
+            values='Quantidade',
+            title=titulo_treemap or titulo,
+            height=400
+        )
+        fig.update_traces(textinfo='label+percent entry')
+
+    else:  # Funil
+        fig = px.funnel(
+            df,
+            x='Quantidade',
+            y=coluna,
+            title=titulo,
+            height=400
+        )
+
+    return fig
+
+
+def criar_grafico_comparacao(df, coluna, titulo, titulo_eixo_x):
+    """
+    --> Função para criar o gráfico de barras agrupadas que compara as ondas da pesquisa
+    :param df: DataFrame retornado por montar_tabela_comparacao
+    :param coluna: Coluna com as opções (ex.: 'Faixa Etária')
+    :param titulo: Título do gráfico
+    :param titulo_eixo_x: Título do eixo x
+    """
+    fig = px.bar(
+        df,
+        x=coluna,
+        y='Percentual',
+        color='Onda',
+        barmode='group',
+        text='Percentual',
+        hover_data=['Quantidade'],
+        title=titulo,
+        height=450
+    )
+    fig.update_traces(texttemplate='%{text:.1f}%')
+    fig.update_layout(xaxis_title=titulo_eixo_x, yaxis_title="Percentual das respostas (%)")
+    return fig
+
+
+def criar_mapa_calor(df, linhas, colunas, valor, titulo, rotulo_valor):
+    """
+    --> Função para criar o mapa de calor de um valor (ex.: média de produtividade) por duas perguntas
+    :param df: DataFrame com uma linha por combinação (ex.: retornado por produtividade_por_grupo)
+    :param linhas: Coluna exibida nas linhas (ex.: 'Faixa Etária')
+    :param colunas: Coluna exibida nas colunas (ex.: 'Frequência')
+    :param valor: Coluna com o valor de cada célula (ex.: 'Média')
+    :param titulo: Título do gráfico
+    :param rotulo_valor: Título da escala de cores
+    """
+    # Mantém a ordem lógica das opções (o pivot ordenaria em ordem alfabética)
+    tabela = df.pivot(index=linhas, columns=colunas, values=valor).reindex(
+        index=pd.unique(df[linhas]), columns=pd.unique(df[colunas]))
+    fig = px.imshow(
+        tabela,
+        text_auto='.2f',
+        color_continuous_scale='RdYlGn',
+        aspect='auto',
+        labels={'color': rotulo_valor},
+        title=titulo,
+        height=450
+    )
+    fig.update_xaxes(type='category')
+    fig.update_yaxes(type='category')
+    return fig
+
+
+def criar_grafico_medias(df, coluna, titulo, titulo_eixo_x):
+    """
+    --> Função para criar o gráfico de barras da média de produtividade por grupo (com o intervalo de confiança)
+    :param df: DataFrame retornado por produtividade_por_grupo (com uma única pergunta)
+    :param coluna: Coluna com os grupos (ex.: 'Faixa Etária')
+    :param titulo: Título do gráfico
+    :param titulo_eixo_x: Título do eixo x
+    """
+    fig = px.bar(
+        df.astype({coluna: str}),
+        x=coluna,
+        y='Média',
+        error_y='Margem IC 95%',
+        color=coluna,
+        hover_data=['Respondentes'],
+        title=titulo,
+        height=450
+    )
+    fig.update_layout(xaxis_title=titulo_eixo_x, yaxis_title="Média de produtividade (1 a 5)", showlegend=False)
+    return fig
+
+
+def criar_grafico_respostas_periodo(df, titulo):
+    """
+    --> Função para criar o gráfico da quantidade de respostas recebidas em cada período (com a média móvel)
+    :param df: DataFrame retornado por SeriesTemporais.respostas_por_periodo
+    :param titulo: Título do gráfico
+    """
+    fig = px.bar(
+        df,
+        x='Período',
+        y='Respostas',
+        title=titulo,
+        height=400
+    )
+    fig.add_scatter(x=df['Período'], y=df['Média Móvel'], mode='lines', name='Média Móvel')
+    fig.update_layout(xaxis_title="Período", yaxis_title="Respostas recebidas", showlegend=False)
+    return fig
+
+
+def criar_grafico_tendencia(df, coluna, titulo):
+    """
+    --> Função para criar o gráfico de área empilhada com o percentual de cada opção ao longo do tempo
+    :param df: DataFrame retornado por SeriesTemporais.distribuicao
+    :param coluna: Coluna com as opções (ex.: 'Faixa Etária')
+    :param titulo: Título do gráfico
+    """
+    fig = px.area(
+        df.astype({coluna: str}),
+        x='Período',
+        y='Percentual',
+        color=coluna,
+        hover_data=['Quantidade'],
+        title=titulo,
+        height=450
+    )
+    fig.update_layout(xaxis_title="Período", yaxis_title="Percentual das respostas (%)", yaxis_range=[0, 100])
+    return fig
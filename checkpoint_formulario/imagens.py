@@ -0,0 +1,99 @@
+import os
+import hashlib
+import tempfile
+from cache_planilha import DIRETORIO_CACHE
+
+# Pasta com as imagens originais dos cabeçalhos do dashboard
+DIRETORIO_ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# Largura (em pixels) das imagens exibidas: a largura de uma coluna do dashboard no layout "wide"
+LARGURA_IMAGENS = int(os.getenv("LARGURA_IMAGENS", "800"))
+
+# Qualidade da compressão WebP (0 a 100)
+QUALIDADE_WEBP = int(os.getenv("QUALIDADE_WEBP", "80"))
+
+
+def hash_arquivo(caminho_imagem):
+    """
+    --> Função para calcular o hash SHA-256 do conteúdo de uma imagem (identifica a versão da original no nome da
+    versão otimizada, independente do cache das planilhas)
+    :param caminho_imagem: Caminho da imagem
+    """
+    sha256 = hashlib.sha256()
+    with open(caminho_imagem, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def _caminho_variante(caminho_imagem, largura, qualidade, diretorio_cache):
+    """
+    --> Função para obter o caminho da versão otimizada de uma imagem (muda quando o conteúdo da original muda)
+    :param caminho_imagem: Caminho da imagem original
+    :param largura: Largura máxima da versão otimizada
+    :param qualidade: Qualidade da compressão WebP
+    :param diretorio_cache: Diretório do cache
+    """
+    nome = os.path.splitext(os.path.basename(caminho_imagem))[0]
+    versao = hash_arquivo(caminho_imagem)[:16]
+    return os.path.join(diretorio_cache, "imagens", f"{nome}-{largura}w-q{qualidade}-{versao}.webp")
+
+
+def otimizar_imagem(caminho_imagem, largura=LARGURA_IMAGENS, qualidade=QUALIDADE_WEBP, diretorio_cache=DIRETORIO_CACHE):
+    """
+    --> Função para obter a imagem reduzida para a largura de exibição e comprimida em WebP. A versão
+    otimizada é gravada no cache (pelo hash da original) e só é gerada novamente quando a original muda
+    :param caminho_imagem: Caminho da imagem original
+    :param largura: Largura máxima em pixels (imagens menores não são ampliadas)
+    :param qualidade: Qualidade da compressão WebP (0 a 100)
+    :param diretorio_cache: Diretório do cache (valor padrão: DIRETORIO_CACHE)
+    :return: Bytes da imagem WebP
+    """
+    caminho_variante = _caminho_variante(caminho_imagem, largura, qualidade, diretorio_cache)
+    if os.path.exists(caminho_variante):
+        with open(caminho_variante, "rb") as f:
+            return f.read()
+
+    # O Pillow só é importado quando alguma imagem ainda não está no cache
+    from PIL import Image
+
+    with Image.open(caminho_imagem) as imagem:
+        if imagem.mode not in ("RGB", "RGBA"):
+            imagem = imagem.convert("RGBA")
+        # Mantém a proporção, não amplia imagens menores e, nos JPEGs, já decodifica em escala reduzida
+        imagem.thumbnail((largura, imagem.height), Image.LANCZOS)
+
+        # Grava em um arquivo temporário e substitui no final (outra sessão nunca lê um arquivo incompleto)
+        os.makedirs(os.path.dirname(caminho_variante), exist_ok=True)
+        descritor, caminho_temporario = tempfile.mkstemp(dir=os.path.dirname(caminho_variante), suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as f:
+                imagem.save(f, format="WEBP", quality=qualidade)
+            os.replace(caminho_temporario, caminho_variante)
+        finally:
+            if os.path.exists(caminho_temporario):
+                os.remove(caminho_temporario)
+
+    _remover_variantes_antigas(caminho_variante)
+    with open(caminho_variante, "rb") as f:
+        return f.read()
+
+
+def _remover_variantes_antigas(caminho_variante):
+    """
+    --> Função para remover as versões otimizadas anteriores da mesma imagem e tamanho (original alterada)
+    :param caminho_variante: Caminho da versão otimizada atual
+    """
+    diretorio, nome_variante = os.path.split(caminho_variante)
+    prefixo = nome_variante.rsplit("-", 1)[0] + "-"
+    for nome in os.listdir(diretorio):
+        if nome.startswith(prefixo) and nome.endswith(".webp") and nome != nome_variante:
+            os.remove(os.path.join(diretorio, nome))
+
+
+def caminho_asset(nome):
+    """
+    --> Função para obter o caminho de uma imagem da pasta assets (funciona no Windows e no Linux)
+    :param nome: Nome do arquivo (ex.: 'idades.png')
+    """
+    return os.path.join(DIRETORIO_ASSETS, nome)
@@ -0,0 +1,131 @@
+import numpy as np
+from collections import Counter
+from respostas_compactas import CODIGO_AUSENTE, categorias_frequencia, categorias_eficiencia
+
+# Perguntas com índice e o nome exibido nos filtros
+perguntas_filtro = {
+    'idade': "Faixa etária",
+    'frequencia': "Frequência de trabalho remoto",
+    'produtividade': "Produtividade",
+    'eficiencia': "Aspectos da eficiência",
+}
+
+
+def _empacotar(mapas):
+    """
+    --> Função para empacotar mapas booleanos (uma linha por categoria) em palavras de 64 bits
+    :param mapas: Array booleano (categorias x respondentes)
+    :return: Array uint64 (categorias x palavras); os bits após o último respondente ficam desligados
+    """
+    empacotados = np.packbits(mapas, axis=1, bitorder='little')
+    sobra = -empacotados.shape[1] % 8
+    if sobra:
+        empacotados = np.pad(empacotados, ((0, 0), (0, sobra)))
+    return np.ascontiguousarray(empacotados).view(np.uint64)
+
+
+class IndiceBitmap:
+    """
+    --> Classe com um bitmap (1 bit por respondente) para cada opção de cada pergunta, criado uma única vez por
+    versão da planilha. Qualquer combinação de filtros vira OR entre as opções de uma pergunta e AND entre as
+    perguntas, e as contagens de cada opção são a quantidade de bits ligados em (bitmap AND seleção).
+    """
+
+    def __init__(self, quantidade, mapas, categorias):
+        """
+        :param quantidade: Quantidade de respondentes
+        :param mapas: Dicionário {pergunta: array uint64 (categorias x palavras)}
+        :param categorias: Dicionário {pergunta: lista de categorias, na ordem das linhas de mapas}
+        """
+        self.quantidade = quantidade
+        self.mapas = mapas
+        self.categorias = categorias
+
+    @classmethod
+    def de_respostas(cls, respostas):
+        """
+        --> Função para criar os bitmaps a partir das respostas compactadas (somente opções com respostas)
+        :param respostas: Objeto RespostasCompactas
+        """
+        colunas = {
+            'idade': (respostas.idade, respostas.categorias_idade),
+            'frequencia': (respostas.frequencia, categorias_frequencia),
+            'produtividade': (respostas.produtividade, list(range(CODIGO_AUSENTE))),
+        }
+
+        mapas, categorias = {}, {}
+        for pergunta, (codigos, categorias_coluna) in colunas.items():
+            presentes = np.flatnonzero(np.bincount(codigos, minlength=256)[:len(categorias_coluna)])
+            mapas[pergunta] = _empacotar(codigos[None, :] == presentes[:, None])
+            categorias[pergunta] = [categorias_coluna[codigo] for codigo in presentes]
+
+        # Eficiência: um bitmap por bit da máscara (o respondente pode estar em várias opções)
+        marcados = (respostas.eficiencia[None, :] >> np.arange(len(categorias_eficiencia), dtype=np.uint8)[:, None]) & 1
+        presentes = np.flatnonzero(marcados.any(axis=1))
+        mapas['eficiencia'] = _empacotar(marcados[presentes].astype(bool))
+        categorias['eficiencia'] = [categorias_eficiencia[bit] for bit in presentes]
+
+        return cls(len(respostas), mapas, categorias)
+
+    @property
+    def nbytes(self):
+        """
+        --> Memória ocupada pelos bitmaps (em bytes)
+        """
+        return sum(mapa.nbytes for mapa in self.mapas.values())
+
+    def selecionar(self, filtros):
+        """
+        --> Função para obter os respondentes que atendem aos filtros
+        :param filtros: Dicionário {pergunta: opções selecionadas}; perguntas sem opções não filtram
+        :return: Bitmap da seleção (array uint64) ou None quando nenhum filtro está ativo
+        """
+        selecao = None
+        for pergunta, opcoes in filtros.items():
+            if not opcoes:
+                continue
+            linhas = [self.categorias[pergunta].index(opcao) for opcao in opcoes]
+            mapa = np.bitwise_or.reduce(self.mapas[pergunta][linhas], axis=0)
+            selecao = mapa if selecao is None else selecao & mapa
+        return selecao
+
+    def selecionar_linhas(self, inicio, fim):
+        """
+        --> Função para obter um intervalo contínuo de respondentes (ex.: as respostas de uma das planilhas)
+        :param inicio: Posição do primeiro respondente
+        :param fim: Posição seguinte à do último respondente
+        :return: Bitmap da seleção (array uint64)
+        """
+        mapa = np.zeros((1, self.quantidade), dtype=bool)
+        mapa[0, inicio:fim] = True
+        return _empacotar(mapa)[0]
+
+    def quantidade_selecionada(self, selecao):
+        """
+        --> Função para contar os respondentes selecionados
+        :param selecao: Bitmap retornado por selecionar
+        """
+        return self.quantidade if selecao is None else int(np.bitwise_count(selecao).sum())
+
+    def mascara(self, selecao):
+        """
+        --> Função para converter a seleção em um array booleano (um valor por respondente)
+        :param selecao: Bitmap retornado por selecionar
+        """
+        return np.unpackbits(selecao.view(np.uint8), count=self.quantidade, bitorder='little').astype(bool)
+
+    def contagens(self, selecao):
+        """
+        --> Função para contar as respostas de cada pergunta entre os respondentes selecionados
+        (na eficiência cada opção é contada no máximo uma vez por respondente, como em RespostasCompactas).
+        As contagens com e sem filtros do dashboard passam por esta função, então um filtro nunca muda as
+        contagens que ele não restringe
+        :param selecao: Bitmap retornado por selecionar (None conta todos os respondentes)
+        :return: Dicionário com um Counter para cada pergunta (mesmo formato de contar_respostas_tabela)
+        """
+        contagens = {}
+        for pergunta, mapas in self.mapas.items():
+            quantidades = np.bitwise_count(mapas if selecao is None else mapas & selecao).sum(axis=1, dtype=np.int64)
+            contagens[pergunta] = Counter({categoria: int(quantidade) for categoria, quantidade
+                                           in zip(self.categorias[pergunta], quantidades) if quantidade})
+        return contagens
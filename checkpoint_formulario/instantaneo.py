@@ -0,0 +1,169 @@
+import os
+import threading
+from types import MappingProxyType
+from collections import OrderedDict
+from processamento import montar_tabelas, calcular_metricas
+from respostas_compactas import RespostasCompactas
+from indice_bitmap import IndiceBitmap
+from tendencias import SeriesTemporais
+from fontes import estados_fontes, carregar_tabela_fontes
+
+# Memória máxima ocupada pelos instantâneos guardados (a versão mais recente nunca é removida)
+LIMITE_INSTANTANEOS_BYTES = int(os.getenv("LIMITE_INSTANTANEOS_MB", "256")) * 1024 * 1024
+
+
+def _somente_leitura(*arrays):
+    """
+    --> Função para impedir a escrita nos arrays compartilhados entre as sessões
+    :param arrays: Arrays do NumPy
+    """
+    for array in arrays:
+        array.flags.writeable = False
+
+
+class InstantaneoAgregado:
+    """
+    --> Classe com tudo o que o dashboard exibe de uma versão das planilhas (contagens, tabelas, métricas,
+    tabelas por onda, séries diárias, respostas compactadas e bitmaps dos filtros). É criado uma única vez por
+    versão e compartilhado, somente para leitura, por todas as sessões do processo.
+    """
+
+    def __init__(self, versao, fontes):
+        """
+        :param versao: Versão (hash) das planilhas
+        :param fontes: Planilhas consideradas (com o arquivo local disponível)
+        """
+        # Converte ao mesmo tempo as planilhas fora do cache e atualiza o estado incremental de cada fonte
+        estados = estados_fontes(fontes)
+
+        # Base das contagens, do cruzamento das perguntas e dos filtros
+        df_respostas = carregar_tabela_fontes(fontes).to_pandas()
+        self.respostas = RespostasCompactas.de_tabela(df_respostas)
+        self.indice = IndiceBitmap.de_respostas(self.respostas)
+        _somente_leitura(self.respostas.idade, self.respostas.frequencia, self.respostas.produtividade,
+                         self.respostas.eficiencia, *self.indice.mapas.values())
+
+        # Todas as contagens (totais, por onda e filtradas) vêm dos bitmaps; o estado incremental das fontes só
+        # fornece as séries diárias, que dependem da hora de conclusão (fora das respostas compactadas)
+        contagens = self.indice.contagens(None)
+
+        self.versao = versao
+        self.nomes_fontes = tuple(fonte["nome"] for fonte in fontes)
+        self.vazio = not all(contagens.values())
+        self.contagens = MappingProxyType(contagens)
+        self.tabelas = MappingProxyType(montar_tabelas(contagens))
+        self.metricas = MappingProxyType(calcular_metricas(self.tabelas, contagens) if not self.vazio else {})
+
+        # Comparação entre as ondas (somente com mais de uma planilha): as respostas de cada planilha ocupam um
+        # intervalo contínuo da tabela, na ordem das fontes
+        tabelas_fontes = {}
+        if len(fontes) > 1:
+            quantidades = df_respostas['fonte'].value_counts()
+            inicio = 0
+            for nome in self.nomes_fontes:
+                fim = inicio + int(quantidades.get(nome, 0))
+                contagens_fonte = self.indice.contagens(self.indice.selecionar_linhas(inicio, fim))
+                tabelas_fontes[nome] = MappingProxyType(montar_tabelas(contagens_fonte))
+                inicio = fim
+        self.tabelas_fontes = MappingProxyType(tabelas_fontes)
+
+        # Séries diárias das respostas (contagens por dia mantidas pela agregação incremental)
+        self.tendencias = SeriesTemporais([estado["dias"] for estado in estados.values()],
+                                          sum(estado["sem_data"] for estado in estados.values()))
+
+        tabelas = list(self.tabelas.values()) + [df for tabelas_fonte in self.tabelas_fontes.values()
+                                                 for df in tabelas_fonte.values()]
+        self.nbytes = (self.respostas.nbytes + self.indice.nbytes + self.tendencias.nbytes
+                       + sum(int(df.memory_usage(deep=True).sum()) for df in tabelas))
+
+    def tabelas_selecao(self, selecao):
+        """
+        --> Função para obter as contagens, as tabelas e as métricas dos respondentes selecionados (sem filtros,
+        devolve as já calculadas no instantâneo; as duas contagens usam IndiceBitmap.contagens)
+        :param selecao: Bitmap retornado por IndiceBitmap.selecionar (None quando nenhum filtro está ativo)
+        :return: Tupla (contagens, tabelas, métricas); tabelas e métricas ficam vazias sem respondentes
+        """
+        if selecao is None:
+            return self.contagens, self.tabelas, self.metricas
+        contagens = self.indice.contagens(selecao)
+        if not all(contagens.values()):
+            return contagens, {}, {}
+        tabelas = montar_tabelas(contagens)
+        return contagens, tabelas, calcular_metricas(tabelas, contagens)
+
+
+class RepositorioInstantaneos:
+    """
+    --> Classe que guarda os instantâneos de cada versão no processo, com limite de memória: as versões usadas
+    há mais tempo são removidas primeiro. Sessões que pedem uma versão em construção esperam a mesma construção.
+    """
+
+    def __init__(self, limite_bytes=LIMITE_INSTANTANEOS_BYTES, construtor=InstantaneoAgregado):
+        """
+        :param limite_bytes: Memória máxima ocupada pelos instantâneos
+        :param construtor: Classe (ou função) que cria o instantâneo a partir de (versão, fontes)
+        """
+        self.limite_bytes = limite_bytes
+        self.construcoes = 0
+        self._construtor = construtor
+        self._instantaneos = OrderedDict()
+        self._travas_construcao = {}
+        self._trava = threading.Lock()
+
+    def _buscar(self, versao):
+        """
+        --> Função para buscar um instantâneo já criado, marcando-o como usado recentemente (chamar com a trava)
+        :param versao: Versão das planilhas
+        """
+        instantaneo = self._instantaneos.get(versao)
+        if instantaneo is not None:
+            self._instantaneos.move_to_end(versao)
+        return instantaneo
+
+    def obter(self, versao, fontes):
+        """
+        --> Função para obter o instantâneo de uma versão, criando-o uma única vez
+        :param versao: Versão (hash) das planilhas
+        :param fontes: Planilhas consideradas
+        """
+        with self._trava:
+            instantaneo = self._buscar(versao)
+            if instantaneo is not None:
+                return instantaneo
+            trava_construcao = self._travas_construcao.setdefault(versao, threading.Lock())
+
+        with trava_construcao:
+            with self._trava:
+                instantaneo = self._buscar(versao)
+            if instantaneo is not None:
+                return instantaneo
+
+            instantaneo = self._construtor(versao, fontes)
+            with self._trava:
+                self._instantaneos[versao] = instantaneo
+                self._travas_construcao.pop(versao, None)
+                self.construcoes += 1
+                self._remover_antigos()
+            return instantaneo
+
+    def _remover_antigos(self):
+        """
+        --> Função para remover as versões usadas há mais tempo até respeitar o limite de memória (chamar com a
+        trava). Sessões que ainda estão exibindo uma versão removida continuam com a sua referência.
+        """
+        while len(self._instantaneos) > 1 and self.nbytes > self.limite_bytes:
+            self._instantaneos.popitem(last=False)
+
+    @property
+    def nbytes(self):
+        """
+        --> Memória ocupada pelos instantâneos guardados (em bytes)
+        """
+        return sum(instantaneo.nbytes for instantaneo in self._instantaneos.values())
+
+    def versoes(self):
+        """
+        --> Função para listar as versões guardadas (da usada há mais tempo para a mais recente)
+        """
+        with self._trava:
+            return list(self._instantaneos)
@@ -0,0 +1,155 @@
+import re
+import openpyxl
+from datetime import datetime
+from collections import deque
+
+# Colunas da planilha do Microsoft Forms utilizadas no dashboard (C: hora de conclusão; G, H, I e J: perguntas)
+COLUNA_CONCLUSAO = 3
+COLUNA_IDADE = 7
+COLUNA_FREQUENCIA = 8
+COLUNA_PRODUTIVIDADE = 9
+COLUNA_EFICIENCIA = 10
+
+# Trechos que indicam que o primeiro valor da coluna G já é uma faixa etária (e não o cabeçalho)
+INDICADORES_FAIXA_ETARIA = ['ano', '18-', '25-', '35-']
+
+# Tamanho dos blocos lidos do XML da planilha e quantidade de blocos finais guardados na busca da última linha
+TAMANHO_BLOCO_XML = 1024 * 1024
+BLOCOS_FINAIS_XML = 4
+
+# Linha do XML da planilha (<row r="N">...</row>) e célula com valor (<v> preenchido ou texto em <is>)
+_PADRAO_LINHA_XML = re.compile(rb'<row\b[^>]*?\sr="(\d+)"[^>]*?(?:/>|>(.*?)</row>)', re.DOTALL)
+_PADRAO_VALOR_XML = re.compile(rb'<v>[^<]|<is>')
+
+
+def _converter_inteiro(valor):
+    """
+    --> Função para converter o valor da produtividade para inteiro
+    :param valor: Valor lido da célula
+    :return: Valor convertido ou None caso não seja possível converter
+    """
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None  # Ignora valores que não podem ser convertidos (ex.: cabeçalho)
+
+
+def _converter_data(valor):
+    """
+    --> Função para converter a hora de conclusão da resposta para datetime
+    :param valor: Valor lido da célula (datetime ou texto no formato ISO)
+    :return: Valor convertido ou None caso não seja uma data (ex.: cabeçalho)
+    """
+    if isinstance(valor, datetime):
+        return valor
+    try:
+        return datetime.fromisoformat(str(valor).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def iterar_respostas_planilha(caminho_planilha):
+    """
+    --> Função geradora que percorre a planilha uma única vez, em modo somente leitura,
+    devolvendo uma tupla (idade, frequência, produtividade, eficiência, hora de conclusão) por resposta
+    :param caminho_planilha: Caminho para planilha que deseja realizar a leitura
+    """
+    # Modo somente leitura: as linhas são lidas sob demanda do XML, sem criar objetos de célula
+    objeto_workbook = openpyxl.load_workbook(caminho_planilha, read_only=True, data_only=True)
+
+    try:
+        objeto_planilha = objeto_workbook.active
+
+        # Ignora a dimensão gravada no arquivo, que pode estar incorreta, e lê até a última linha
+        objeto_planilha.reset_dimensions()
+
+        # Indica se o primeiro valor preenchido de cada coluna já foi avaliado como cabeçalho
+        cabecalho_idade = cabecalho_frequencia = cabecalho_eficiencia = False
+
+        for linha in objeto_planilha.iter_rows(min_col=COLUNA_CONCLUSAO, max_col=COLUNA_EFICIENCIA, values_only=True):
+            conclusao = linha[0]
+            idade, frequencia, produtividade, eficiencia = linha[COLUNA_IDADE - COLUNA_CONCLUSAO:]
+
+            # Remove o cabeçalho das idades (caso não seja uma faixa etária)
+            if idade is not None and not cabecalho_idade:
+                cabecalho_idade = True
+                if isinstance(idade, str) and not any(d in idade.lower() for d in INDICADORES_FAIXA_ETARIA):
+                    idade = None
+
+            # Remove o cabeçalho das frequências
+            if frequencia is not None and not cabecalho_frequencia:
+                cabecalho_frequencia = True
+                if isinstance(frequencia, str):
+                    frequencia = None
+
+            # Remove o cabeçalho da eficiência
+            if eficiencia is not None and not cabecalho_eficiencia:
+                cabecalho_eficiencia = True
+                if isinstance(eficiencia, str):
+                    eficiencia = None
+
+            # Converte a produtividade para int (o cabeçalho não é convertido e é descartado)
+            if produtividade is not None:
+                produtividade = _converter_inteiro(produtividade)
+
+            # Ignora linhas totalmente vazias
+            if idade is None and frequencia is None and produtividade is None and eficiencia is None:
+                continue
+
+            # O cabeçalho da hora de conclusão é um texto e não é convertido
+            if conclusao is not None:
+                conclusao = _converter_data(conclusao)
+
+            yield idade, frequencia, produtividade, eficiencia, conclusao
+    finally:
+        # Fechando o workbook da Planilha (no modo somente leitura o arquivo fica aberto até o fechamento)
+        objeto_workbook.close()
+
+
+def _ultima_linha_final_xml(objeto_planilha):
+    """
+    --> Função para encontrar a última linha com valor no final do XML da planilha: o arquivo é apenas
+    descompactado em blocos (sem interpretar o XML) e somente os últimos BLOCOS_FINAIS_XML ficam na memória
+    :param objeto_planilha: Planilha aberta em modo somente leitura
+    :return: Número da linha ou None quando o trecho final não tem nenhuma linha com valor
+    """
+    blocos = deque(maxlen=BLOCOS_FINAIS_XML)
+    with objeto_planilha._get_source() as arquivo_xml:
+        for bloco in iter(lambda: arquivo_xml.read(TAMANHO_BLOCO_XML), b""):
+            blocos.append(bloco)
+
+    # A primeira linha do trecho pode estar cortada: o padrão só encontra linhas a partir da tag de abertura
+    for linha in reversed(list(_PADRAO_LINHA_XML.finditer(b"".join(blocos)))):
+        if linha.group(2) and _PADRAO_VALOR_XML.search(linha.group(2)):
+            return int(linha.group(1))
+    return None
+
+
+def contar_linhas_preenchidas(caminho_planilha):
+    """
+    --> Função para obter o número da última linha com conteúdo da planilha (como o Microsoft Forms não deixa
+    linhas vazias no meio, é também a quantidade de linhas com conteúdo). A dimensão gravada no arquivo pode
+    incluir linhas vazias no final (ex.: linhas apenas formatadas), então a última linha é procurada no final do
+    XML da planilha; somente quando o trecho final não tem nenhum valor a planilha é lida inteira
+    :param caminho_planilha: Caminho da planilha
+    """
+    objeto_workbook = openpyxl.load_workbook(caminho_planilha, read_only=True)
+
+    try:
+        objeto_planilha = objeto_workbook.active
+
+        ultima_linha = _ultima_linha_final_xml(objeto_planilha)
+        if ultima_linha is not None:
+            return ultima_linha
+
+        # Sem a dimensão, a leitura termina na última linha gravada no XML (sem completar linhas vazias até o fim
+        # da dimensão); linhas ausentes no meio continuam sendo completadas, então a numeração é preservada
+        objeto_planilha.reset_dimensions()
+
+        ultima_linha = 0
+        for numero_linha, linha in enumerate(objeto_planilha.iter_rows(values_only=True), 1):
+            if any(valor is not None for valor in linha):
+                ultima_linha = numero_linha
+        return ultima_linha
+    finally:
+        objeto_workbook.close()
@@ -0,0 +1,152 @@
+import os
+import re
+import json
+import hashlib
+import warnings
+import threading
+import unicodedata
+from collections import OrderedDict
+from cache_planilha import DIRETORIO_CACHE
+
+# Similaridade mínima (0 a 100) para uma resposta digitada ser considerada uma das opções esperadas. O limiar aceita
+# apenas erros de digitação: "Pior equilíbrio entre vida profissional e pessoal" (94) não vira "Melhor ..."
+LIMIAR_SIMILARIDADE = int(os.getenv("LIMIAR_SIMILARIDADE", "95"))
+
+# Quantidade máxima de respostas distintas guardadas no cache de cada pergunta
+TAMANHO_CACHE_NORMALIZACAO = int(os.getenv("TAMANHO_CACHE_NORMALIZACAO", "10000"))
+
+# Versão do formato do arquivo de cache (arquivos de outra versão são descartados)
+VERSAO_NORMALIZACAO = 2
+
+
+def _texto_comparacao(texto):
+    """
+    --> Função para preparar o texto para a comparação (sem acentos, em minúsculas e com um único espaço entre as
+    palavras)
+    :param texto: Resposta ou opção esperada
+    """
+    sem_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", sem_acentos).strip().casefold()
+
+
+class NormalizadorOpcoes:
+    """
+    --> Classe que associa respostas digitadas com pequenas diferenças (erros de digitação, espaços, maiúsculas,
+    acentos) à opção esperada mais parecida, sem mudar a ordem das palavras. O resultado de cada resposta distinta
+    fica em um cache LRU limitado, gravado em disco, então a comparação só é feita na primeira vez que o texto
+    aparece.
+    """
+
+    def __init__(self, opcoes_validas, limiar=LIMIAR_SIMILARIDADE, tamanho_maximo=TAMANHO_CACHE_NORMALIZACAO,
+                 diretorio_cache=DIRETORIO_CACHE):
+        """
+        :param opcoes_validas: Lista com as opções esperadas
+        :param limiar: Similaridade mínima (0 a 100) para associar a resposta a uma opção
+        :param tamanho_maximo: Quantidade máxima de respostas guardadas no cache
+        :param diretorio_cache: Diretório do cache (valor padrão: DIRETORIO_CACHE)
+        """
+        self.opcoes_validas = list(opcoes_validas)
+        self.limiar = limiar
+        self.tamanho_maximo = tamanho_maximo
+        self._opcoes_comparacao = [_texto_comparacao(opcao) for opcao in self.opcoes_validas]
+        self._trava = threading.Lock()
+
+        # O arquivo muda junto com as opções e o limiar (um cache antigo nunca classifica com outras regras)
+        assinatura = hashlib.sha256(json.dumps([VERSAO_NORMALIZACAO, limiar, self.opcoes_validas]).encode())
+        self.caminho_cache = os.path.join(diretorio_cache, "normalizacao", f"{assinatura.hexdigest()[:16]}.json")
+        self._cache = self._ler_cache()
+
+    def _ler_cache(self):
+        """
+        --> Função para ler o cache salvo (do usado há mais tempo para o mais recente)
+        :return: OrderedDict {resposta: opção esperada ou None}
+        """
+        try:
+            with open(self.caminho_cache, encoding="utf-8") as f:
+                entradas = json.load(f)
+        except (OSError, ValueError):
+            return OrderedDict()
+        return OrderedDict((texto, opcao) for texto, opcao in entradas[-self.tamanho_maximo:]
+                           if opcao is None or opcao in self.opcoes_validas)
+
+    def _salvar_cache(self):
+        """
+        --> Função para salvar o cache (gravação atômica, chamar com a trava)
+        """
+        os.makedirs(os.path.dirname(self.caminho_cache), exist_ok=True)
+        caminho_temporario = f"{self.caminho_cache}.{os.getpid()}.tmp"
+        with open(caminho_temporario, "w", encoding="utf-8") as f:
+            json.dump(list(self._cache.items()), f, ensure_ascii=False)
+        os.replace(caminho_temporario, self.caminho_cache)
+
+    def _comparar(self, texto):
+        """
+        --> Função para encontrar a opção esperada mais parecida com a resposta
+        :param texto: Resposta fora da lista de opções
+        :return: Opção esperada ou None quando nenhuma atinge o limiar
+        """
+        if not isinstance(texto, str):
+            return None
+        texto_comparacao = _texto_comparacao(texto)
+        if texto_comparacao in self._opcoes_comparacao:
+            return self.opcoes_validas[self._opcoes_comparacao.index(texto_comparacao)]
+
+        # O fuzzywuzzy só é importado quando aparece alguma resposta nova fora da lista (sem o python-Levenshtein
+        # ele avisa que usa o SequenceMatcher, suficiente para as poucas respostas distintas)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            from fuzzywuzzy import fuzz
+
+        # A comparação considera a ordem das palavras: "principalmente remoto, mas ocasionalmente presencial"
+        # tem as mesmas palavras da opção oposta e não pode ser associada a ela
+        similaridades = [fuzz.ratio(texto_comparacao, opcao) for opcao in self._opcoes_comparacao]
+        maior = max(similaridades)
+        return self.opcoes_validas[similaridades.index(maior)] if maior >= self.limiar else None
+
+    def normalizar(self, textos):
+        """
+        --> Função para associar cada resposta à opção esperada mais parecida (usa o cache e grava em disco
+        somente quando aparecem respostas novas)
+        :param textos: Respostas distintas fora da lista de opções
+        :return: Lista com a opção esperada de cada resposta (None quando nenhuma é parecida o suficiente)
+        """
+        opcoes = []
+        novas = False
+        with self._trava:
+            for texto in textos:
+                if texto in self._cache:
+                    self._cache.move_to_end(texto)
+                    opcoes.append(self._cache[texto])
+                    continue
+                opcao = self._comparar(texto)
+                opcoes.append(opcao)
+                # Somente textos entram no cache (valores de outros tipos são raros e não vão para o JSON)
+                if isinstance(texto, str):
+                    self._cache[texto] = opcao
+                    novas = True
+                    if len(self._cache) > self.tamanho_maximo:
+                        self._cache.popitem(last=False)
+            if novas:
+                self._salvar_cache()
+        return opcoes
+
+    def __len__(self):
+        return len(self._cache)
+
+
+# Normalizadores já criados neste processo, indexados pelas opções esperadas
+_normalizadores = {}
+_trava_normalizadores = threading.Lock()
+
+
+def obter_normalizador(opcoes_validas):
+    """
+    --> Função para obter o normalizador de uma lista de opções (um por lista no processo)
+    :param opcoes_validas: Lista com as opções esperadas
+    """
+    chave = tuple(opcoes_validas)
+    with _trava_normalizadores:
+        normalizador = _normalizadores.get(chave)
+        if normalizador is None:
+            normalizador = _normalizadores[chave] = NormalizadorOpcoes(opcoes_validas)
+        return normalizador
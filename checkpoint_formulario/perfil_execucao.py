@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from cache_planilha import DIRETORIO_CACHE
+
+# Ativa a medição de tempo das etapas do dashboard (também pode ser ativada pela sidebar)
+PERFIL_ATIVO = os.getenv("PERFIL_DASHBOARD", "0") == "1"
+
+# Captura também o perfil completo das chamadas com o pyinstrument (mais lento)
+PERFIL_PYINSTRUMENT = os.getenv("PERFIL_PYINSTRUMENT", "0") == "1"
+
+# Arquivo onde os tempos de cada execução são gravados (um JSON por linha)
+ARQUIVO_PERFIL = os.getenv("ARQUIVO_PERFIL", os.path.join(DIRETORIO_CACHE, "perfil_execucao.jsonl"))
+
+# Evita que duas sessões gravem no arquivo de log ao mesmo tempo
+_trava_log = threading.Lock()
+
+
+class PerfilExecucao:
+    """
+    --> Classe que mede o tempo de cada etapa de uma execução do dashboard e, opcionalmente,
+    captura o perfil das chamadas com o pyinstrument
+    """
+
+    def __init__(self, ativo=PERFIL_ATIVO, usar_pyinstrument=False, tipo="pagina"):
+        """
+        :param ativo: Mede o tempo das etapas (quando False as medições não fazem nada)
+        :param usar_pyinstrument: Captura também o perfil das chamadas com o pyinstrument
+        :param tipo: Tipo da execução gravada no log ("pagina" ou "fragmento")
+        """
+        self.ativo = ativo
+        self.tipo = tipo
+        self.etapas = []
+        self.inicio = time.perf_counter()
+        self.tempo_total = None
+        self.finalizado = False
+        self._profiler = None
+
+        if ativo and usar_pyinstrument:
+            # O pyinstrument só é importado quando o perfil das chamadas é solicitado
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+            self._profiler.start()
+
+    @contextmanager
+    def medir(self, nome):
+        """
+        --> Função para medir o tempo de uma etapa (usada com o bloco with)
+        :param nome: Nome da etapa
+        """
+        if not self.ativo:
+            yield
+            return
+
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            # A etapa é registrada mesmo quando interrompida (ex.: st.stop ou erro)
+            self.etapas.append({"etapa": nome, "tempo_s": round(time.perf_counter() - inicio, 4)})
+
+    def finalizar(self):
+        """
+        --> Função para encerrar a execução (tempo total e perfil do pyinstrument)
+        """
+        if self.finalizado:
+            return
+        self.finalizado = True
+        self.tempo_total = round(time.perf_counter() - self.inicio, 4)
+        if self._profiler is not None:
+            self._profiler.stop()
+
+    def html_pyinstrument(self):
+        """
+        --> Função para obter o relatório do pyinstrument em HTML (None se não foi capturado)
+        """
+        return self._profiler.output_html() if self._profiler is not None and self.finalizado else None
+
+    def salvar_log(self, caminho_arquivo=ARQUIVO_PERFIL, **informacoes):
+        """
+        --> Função para acrescentar os tempos desta execução ao arquivo de log (JSON Lines)
+        :param caminho_arquivo: Caminho do arquivo de log (valor padrão: ARQUIVO_PERFIL)
+        :param informacoes: Informações adicionais gravadas no registro (ex.: versão da planilha)
+        """
+        if not self.ativo:
+            return
+
+        registro = {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "tipo": self.tipo,
+            "tempo_total_s": self.tempo_total,
+            "etapas": self.etapas,
+            **informacoes,
+        }
+
+        os.makedirs(os.path.dirname(caminho_arquivo), exist_ok=True)
+        with _trava_log, open(caminho_arquivo, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
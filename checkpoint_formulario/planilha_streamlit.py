@@ -1,61 +1,68 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import os
-import ssl
-import urllib3
+import math
+import functools
 import traceback
-import openpyxl
-from collections import Counter
-from shareplum import Site
-from shareplum import Office365
-from shareplum.site import Version
-from dotenv import load_dotenv
-
-caminho_planilha = f"{os.path.dirname(__file__)}\\planilha.xlsx"
+from graficos import (criar_grafico, criar_grafico_comparacao, criar_mapa_calor, criar_grafico_medias,
+                      criar_grafico_respostas_periodo, criar_grafico_tendencia, tipos_grafico)
+from processamento import montar_tabela_comparacao
+from indice_bitmap import perguntas_filtro
+from instantaneo import RepositorioInstantaneos
+from tabulacao_cruzada import (dimensoes, tabela_contingencia, produtividade_por_grupo, teste_qui_quadrado,
+                               percentual_por_linha)
+from fontes import carregar_fontes, carregar_tabela_fontes, versao_fontes
+from imagens import otimizar_imagem, caminho_asset
+from explorador_respostas import ExploradorRespostas, ordens_explorador
+from tendencias import perguntas_tendencia, periodos_tendencia
+from agendador import AtualizadorPlanilha, INTERVALO_ATUALIZACAO_MINUTOS
+from perfil_execucao import PerfilExecucao, PERFIL_ATIVO, PERFIL_PYINSTRUMENT
+
+# Planilhas exibidas no dashboard (uma por onda da pesquisa, configuradas em fontes.json)
+fontes_planilhas = carregar_fontes()
+
+# Opções de quantidade de linhas por página nos dados brutos
+tamanhos_pagina = [25, 50, 100, 500]
+
+# Janela móvel padrão e máxima das tendências em cada período: (padrão, máximo)
+janelas_tendencia = {"Dia": (7, 60), "Semana": (4, 26)}
 
 
 def baixar_planilha():
     """
-    --> Função para baixar a planilha do Microsoft 365 no SharePoint
+    --> Função para baixar as planilhas do Microsoft 365 no SharePoint (somente as que mudaram)
+    :return: BAIXADO, INALTERADO ou None em caso de erro
     """
+    # Importados somente quando a planilha precisa ser baixada (Office365/requests deixam a inicialização lenta)
+    from dotenv import load_dotenv
+    from sharepoint import BAIXADO, INALTERADO, configurar_ssl
+    from fontes import sincronizar_fontes
 
     # Carregando variáveis de ambiente (credenciais de usuário)
     if load_dotenv():
 
         # Configurações do certificado SSL (Firewall da FIAP)
-        urllib3.disable_warnings()  # Desabilita os avisos do certificado SSL
-        ssl._create_default_https_context = ssl._create_unverified_context  # Criando um contexto que não verifica a certificação SSL
-
-        # URL da Planilha do Excel no Sharepoint atualizada pelo Microsoft Forms
-        sharepoint_url = "https://fiapcom-my.sharepoint.com"
-        site_url = "https://fiapcom-my.sharepoint.com/personal/rm554497_fiap_com_br"
-
-        # Caminho do Arquivo dentro do Sharepoint
-        caminho_arquivo = "Documents/Impacto do Trabalho Remoto na Eficiência do Trabalhador.xlsx"
-        arquivo_destino = "planilha.xlsx"
+        configurar_ssl()
 
         # Credenciais do Microsoft 365
         usuario = os.getenv("USUARIO")
         senha = os.getenv("SENHA")
 
         try:
-            # Autenticação no Microsoft 365
-            authcookie = Office365(sharepoint_url, username=usuario, password=senha).GetCookies()
-            site = Site(site_url, version=Version.v365, authcookie=authcookie)
-
-            # Acessando a pasta do Sharepoint
-            folder = site.Folder("Documents")
-
-            # Baixando arquivo (get)
-            file_content = folder.get_file(caminho_arquivo.split('/')[-1])
-
-            # Salvar planilha com os dados do formulário
-            with open(arquivo_destino, "wb") as f:
-                f.write(file_content)
-
-            st.success(f'Arquivo baixado com sucesso! Caminho do arquivo: "{caminho_planilha}"')
-            return arquivo_destino
+            # Sessão autenticada no Microsoft 365 (reaproveitada entre os downloads)
+            sessao = obter_sessao_sharepoint(usuario, senha)
+
+            # Baixa (ao mesmo tempo) apenas as planilhas cujo ETag / data de modificação mudou
+            situacoes = sincronizar_fontes(fontes_planilhas, sessao)
+
+            baixadas = [nome for nome, situacao in situacoes.items() if situacao == BAIXADO]
+            if not baixadas:
+                st.info("A planilha não foi alterada desde o último download.")
+                return INALTERADO
+            if len(fontes_planilhas) == 1:
+                st.success(f'Arquivo baixado com sucesso! Caminho do arquivo: "{fontes_planilhas[0]["arquivo"]}"')
+            else:
+                st.success(f"Planilhas baixadas com sucesso: {', '.join(sorted(baixadas))}")
+            return BAIXADO
         except Exception as e:
             st.error(f"Erro ao baixar o arquivo: {str(e)}")
             traceback.print_exc()
@@ -66,82 +73,446 @@ def baixar_planilha():
         return None
 
 
-# Função para processar respostas de múltipla escolha
-def processar_multipla_escolha(lista_respostas):
-    # Lista para armazenar todas as opções individuais
-    todas_opcoes = []
+@st.cache_resource(show_spinner=False)
+def obter_sessao_sharepoint(usuario, senha):
+    """
+    --> Função para criar, uma única vez por processo (e por usuário), a sessão autenticada no SharePoint
+    :param usuario: Usuário do Microsoft 365
+    :param senha: Senha do Microsoft 365
+    """
+    from sharepoint import SessaoSharePoint
+    return SessaoSharePoint(usuario, senha)
 
-    for resposta in lista_respostas:
-        if isinstance(resposta, str):
-            # Divide a string usando ponto-e-vírgula como separador
-            opcoes = resposta.split(';')
-            # Adiciona cada opção individual à lista
-            todas_opcoes.extend([opcao.strip() for opcao in opcoes if opcao.strip()])
 
-    return todas_opcoes
+@st.cache_resource(show_spinner=False)
+def obter_atualizador():
+    """
+    --> Função para iniciar, uma única vez por processo, a atualização da planilha em segundo plano
+    """
+    atualizador = AtualizadorPlanilha(fontes_planilhas,
+                                      ao_concluir=functools.partial(aquecer_instantaneo, obter_repositorio()))
+    atualizador.iniciar()
+    return atualizador
 
 
-def ler_dados_planilha(caminho_planilha=None):
+def exibir_situacao_atualizacao(atualizador):
+    """
+    --> Função para exibir na sidebar quando os dados foram atualizados e a próxima atualização
+    :param atualizador: Objeto AtualizadorPlanilha em execução
+    """
+    if atualizador.em_andamento():
+        st.sidebar.caption("🔄 Atualização em andamento...")
+    if atualizador.ultima_atualizacao is not None:
+        st.sidebar.caption(f"Última atualização: {atualizador.ultima_atualizacao:%d/%m/%Y %H:%M:%S} "
+                           f"({atualizador.ultima_situacao})")
+    if atualizador.ultimo_erro is not None:
+        st.sidebar.caption(f"⚠️ Erro na última atualização: {atualizador.ultimo_erro}")
+    proxima_execucao = atualizador.proxima_execucao()
+    if proxima_execucao is not None:
+        st.sidebar.caption(f"Próxima atualização: {proxima_execucao:%d/%m/%Y %H:%M:%S}")
+
+
+@st.cache_resource(show_spinner=False)
+def obter_repositorio():
     """
-    --> Função para ler os dados da planilha já baixada
-    :param caminho_planilha: Caminho para planilha que deseja realizar a leitura (valor padrão: None)
+    --> Função para criar, uma única vez por processo, o repositório de instantâneos agregados: cada versão das
+    planilhas é processada uma única vez e o resultado é compartilhado (sem cópias) por todas as sessões
     """
-    if caminho_planilha is None:
-        caminho_planilha = "planilha.xlsx"
+    return RepositorioInstantaneos()
 
-    try:
-        # Abrindo planilha com os dados
-        objeto_workbook = openpyxl.load_workbook(caminho_planilha)
-        objeto_planilha = objeto_workbook.active
-
-        # Iterando sobre todos os valores das colunas e armazenando em listas
-        valores_idade = []
-        for celula in objeto_planilha["G"]:
-            if celula.value is not None:  # Verifica se a célula não está vazia
-                valores_idade.append(celula.value)
-
-        valores_frequencia = []
-        for celula in objeto_planilha["H"]:
-            if celula.value is not None:  # Verifica se a célula não está vazia
-                valores_frequencia.append(celula.value)
-
-        valores_produtividade = []
-        for celula in objeto_planilha["I"]:
-            if celula.value is not None:  # Verifica se a célula não está vazia
-                # Converte para int se for número
-                if isinstance(celula.value, (int, float)):
-                    valores_produtividade.append(int(celula.value))
-                else:
-                    try:
-                        valores_produtividade.append(int(celula.value))
-                    except:
-                        pass  # Ignora valores que não podem ser convertidos
-
-        valores_eficiencia = []
-        for celula in objeto_planilha["J"]:
-            if celula.value is not None:  # Verifica se a célula não está vazia
-                valores_eficiencia.append(celula.value)
-
-        # Remove o cabeçalho
-        if valores_idade and isinstance(valores_idade[0], str) and not any(
-                d in valores_idade[0].lower() for d in ['ano', '18-', '25-', '35-']):
-            valores_idade.pop(0)
-
-        # Remove o cabeçalho das frequências
-        if valores_frequencia and isinstance(valores_frequencia[0], str):
-            valores_frequencia.pop(0)
-
-        # Remove o cabeçalho da eficiência
-        if valores_eficiencia and isinstance(valores_eficiencia[0], str):
-            valores_eficiencia.pop(0)
-
-        # Fechando o workbook da Planilha
-        objeto_workbook.close()
-
-        return valores_idade, valores_frequencia, valores_produtividade, valores_eficiencia
-    except Exception as e:
-        st.error(f"Erro ao ler a planilha: {str(e)}")
-        return [], []
+
+def aquecer_instantaneo(repositorio):
+    """
+    --> Função executada pelo atualizador em segundo plano depois de cada atualização: cria o instantâneo das
+    planilhas disponíveis antes que alguém abra o dashboard
+    :param repositorio: Objeto RepositorioInstantaneos do processo
+    """
+    fontes_disponiveis = [fonte for fonte in fontes_planilhas if os.path.exists(fonte["arquivo"])]
+    if fontes_disponiveis:
+        repositorio.obter(versao_fontes(fontes_disponiveis), fontes_disponiveis)
+
+
+@st.cache_resource(show_spinner=False)
+def obter_imagem(nome):
+    """
+    --> Função para obter, uma única vez por processo, a imagem de um cabeçalho reduzida e comprimida em WebP.
+    As execuções seguintes não leem o disco e todas as sessões enviam os mesmos bytes (mesma URL no navegador)
+    :param nome: Nome do arquivo na pasta assets (ex.: 'idades.png')
+    """
+    return otimizar_imagem(caminho_asset(nome))
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def obter_explorador(versao, fontes):
+    """
+    --> Função para criar, uma única vez por versão das planilhas, o explorador dos dados brutos (compartilhado
+    pelas sessões e criado somente quando alguma sessão marca "Mostrar dados brutos")
+    :param versao: Versão (hash) das planilhas, usada como chave do cache
+    :param fontes: Planilhas consideradas
+    """
+    return ExploradorRespostas(carregar_tabela_fontes(fontes))
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def etapa_selecao_dados(versao, fontes, filtros, coluna, busca, ordem):
+    """
+    --> Linhas exibidas nos dados brutos de uma pergunta (trocar de página não refaz a busca nem a ordenação).
+    O array é compartilhado, somente para leitura, sem cópia: com o cache_data ele seria serializado e copiado
+    a cada execução, com custo proporcional à quantidade de respostas
+    :param versao: Versão (hash) das planilhas, usada como chave do cache
+    :param fontes: Planilhas consideradas
+    :param filtros: Dicionário {pergunta: opções selecionadas}
+    :param coluna: Coluna explorada (ex.: 'idade')
+    :param busca: Texto procurado na coluna
+    :param ordem: Um dos valores de ordens_explorador
+    """
+    mascara = None
+    if any(filtros.values()):
+        indice = obter_repositorio().obter(versao, fontes).indice
+        mascara = indice.mascara(indice.selecionar(filtros))
+    linhas = obter_explorador(versao, fontes).selecionar(coluna, busca, ordem, mascara)
+    linhas.flags.writeable = False
+    return linhas
+
+
+def exibir_dados_brutos(versao, fontes, filtros, coluna):
+    """
+    --> Função para exibir os dados brutos de uma pergunta com paginação, ordenação e busca no servidor:
+    somente as linhas da página atual são enviadas ao navegador
+    :param versao: Versão (hash) das planilhas
+    :param fontes: Planilhas consideradas
+    :param filtros: Dicionário {pergunta: opções selecionadas}
+    :param coluna: Coluna explorada (ex.: 'idade')
+    """
+    busca_col, ordem_col, tamanho_col = st.columns([3, 2, 1])
+    with busca_col:
+        busca = st.text_input("Buscar", key=f"busca_{coluna}").strip()
+    with ordem_col:
+        ordem = st.selectbox("Ordenar", ordens_explorador, key=f"ordem_{coluna}")
+    with tamanho_col:
+        tamanho = st.selectbox("Linhas por página", tamanhos_pagina, key=f"tamanho_pagina_{coluna}")
+
+    linhas = etapa_selecao_dados(versao, fontes, filtros, coluna, busca, ordem)
+    total_paginas = max(1, math.ceil(len(linhas) / tamanho))
+
+    # A busca ou os filtros podem reduzir a quantidade de páginas abaixo da página atual
+    chave_pagina = f"pagina_{coluna}"
+    if st.session_state.get(chave_pagina, 1) > total_paginas:
+        st.session_state[chave_pagina] = total_paginas
+    pagina = st.number_input("Página", min_value=1, max_value=total_paginas, step=1, key=chave_pagina)
+
+    explorador = obter_explorador(versao, fontes)
+    # A coluna da pergunta vem primeiro; a onda só é exibida com mais de uma planilha
+    colunas = [coluna] + [outra for outra in explorador.colunas
+                          if outra != coluna and (outra != 'fonte' or len(fontes) > 1)]
+    st.dataframe(explorador.pagina(linhas, (pagina - 1) * tamanho, tamanho, colunas), use_container_width=True,
+                 hide_index=True)
+    st.caption(f"{len(linhas)} respostas · página {pagina} de {total_paginas}")
+
+
+def exibir_filtros(indice):
+    """
+    --> Função para exibir os filtros da sidebar (opções de uma pergunta são combinadas com OU e perguntas
+    diferentes com E)
+    :param indice: Objeto IndiceBitmap da versão atual
+    :return: Dicionário {pergunta: opções selecionadas}
+    """
+    st.sidebar.subheader("🔎 Filtros")
+    return {pergunta: st.sidebar.multiselect(nome, indice.categorias[pergunta], key=f"filtro_{pergunta}")
+            for pergunta, nome in perguntas_filtro.items()}
+
+
+def secao_medida(nome):
+    """
+    --> Decorador para medir o tempo de uma seção de gráficos no perfil da execução atual.
+    Quando apenas o fragmento é executado novamente, o tempo é gravado em um registro próprio no log
+    :param nome: Nome da seção
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def funcao_medida(*args, **kwargs):
+            perfil = st.session_state.get("perfil_execucao")
+            if perfil is None or not perfil.ativo:
+                return funcao(*args, **kwargs)
+
+            # A página já terminou: esta é uma execução somente do fragmento
+            if perfil.finalizado:
+                perfil_fragmento = PerfilExecucao(ativo=True, tipo="fragmento")
+                try:
+                    with perfil_fragmento.medir(nome):
+                        return funcao(*args, **kwargs)
+                finally:
+                    perfil_fragmento.finalizar()
+                    perfil_fragmento.salvar_log()
+
+            with perfil.medir(nome):
+                return funcao(*args, **kwargs)
+        return funcao_medida
+    return decorador
+
+
+def exibir_perfil(perfil, atualizador):
+    """
+    --> Função para exibir o tempo de cada etapa da execução (e da última atualização em segundo plano)
+    :param perfil: Objeto PerfilExecucao da execução atual (já finalizado)
+    :param atualizador: Objeto AtualizadorPlanilha em execução ou None
+    """
+    with st.sidebar.expander("⏱️ Desempenho da execução", expanded=True):
+        st.caption(f"Tempo total da página: {perfil.tempo_total:.3f} s")
+        st.dataframe(perfil.etapas, use_container_width=True, hide_index=True)
+
+        if atualizador is not None and atualizador.ultimo_perfil is not None:
+            st.caption(f"Última atualização em segundo plano: {atualizador.ultimo_perfil.tempo_total:.3f} s")
+            st.dataframe(atualizador.ultimo_perfil.etapas, use_container_width=True, hide_index=True)
+
+    html_pyinstrument = perfil.html_pyinstrument()
+    if html_pyinstrument is not None:
+        import streamlit.components.v1 as components
+        with st.expander("Perfil das chamadas (pyinstrument)"):
+            components.html(html_pyinstrument, height=600, scrolling=True)
+
+
+# Os gráficos são fragmentos: trocar o tipo de gráfico ou marcar a caixa de dados brutos
+# executa novamente apenas o fragmento, sem refazer o restante da página
+@st.fragment
+@secao_medida("gráficos: idade")
+def grafico_idades(df_idades, exibir_dados_idade):
+    """
+    --> Função para exibir o gráfico da seção de idades
+    :param exibir_dados_idade: Função que exibe os dados brutos das idades (dos respondentes filtrados)
+    """
+    # Tipo de gráfico (com radio buttons)
+    tipo_grafico = st.radio(
+        "Selecione o tipo de gráfico:",
+        tipos_grafico,
+        horizontal=True
+    )
+
+    fig = criar_grafico(df_idades, 'Faixa Etária', tipo_grafico,
+                        "Distribuição por Faixa Etária", "Faixa Etária")
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Distribuições adicionais e análises
+    st.subheader("Análise Expandida")
+
+    # Mostra os dados brutos se solicitado
+    if st.checkbox("Mostrar dados brutos"):
+        st.write("Lista de todas as idades coletadas:")
+        exibir_dados_idade()
+
+
+@st.fragment
+@secao_medida("gráficos: frequência")
+def grafico_frequencia(df_frequencia, exibir_dados_frequencia):
+    """
+    --> Função para exibir o gráfico da seção de frequência de trabalho remoto
+    :param exibir_dados_frequencia: Função que exibe os dados brutos das frequências (dos respondentes filtrados)
+    """
+    # Tipo de gráfico (com radio buttons)
+    tipo_grafico_freq = st.radio(
+        "Selecione o tipo de gráfico:",
+        tipos_grafico,
+        horizontal=True,
+        key="grafico_frequencia"  # Chave única para este componente
+    )
+
+    fig = criar_grafico(df_frequencia, 'Frequência', tipo_grafico_freq,
+                        "Distribuição por Frequência de Trabalho Remoto", "Frequência de Trabalho Remoto")
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Análise adicional
+    st.subheader("Análise Expandida")
+
+    # Mostra os dados brutos se solicitado
+    if st.checkbox("Mostrar dados brutos", key="mostrar_dados_frequencia"):
+        st.write("Lista de todas as frequências coletadas:")
+        exibir_dados_frequencia()
+
+
+@st.fragment
+@secao_medida("gráficos: produtividade")
+def grafico_produtividade(df_produtividade, exibir_dados_produtividade):
+    """
+    --> Função para exibir o gráfico da seção de produtividade
+    :param exibir_dados_produtividade: Função que exibe os dados brutos das notas (dos respondentes filtrados)
+    """
+    st.subheader("Visualização Gráfica")
+    tipo_grafico_prod = st.radio(
+        "Selecione o tipo de gráfico:",
+        tipos_grafico,
+        horizontal=True,
+        key="grafico_produtividade"
+    )
+
+    fig = criar_grafico(df_produtividade, 'Produtividade', tipo_grafico_prod,
+                        "Distribuição de Produtividade", "Classificação")
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Opção para mostrar os dados brutos
+    if st.checkbox("Mostrar dados brutos de Produtividade", key="mostrar_produtividade"):
+        st.write("Lista de classificações de produtividade:")
+        exibir_dados_produtividade()
+
+
+@st.fragment
+@secao_medida("gráficos: eficiência")
+def grafico_eficiencia(df_eficiencia, exibir_dados_eficiencia):
+    """
+    --> Função para exibir o gráfico da seção de eficiência
+    :param exibir_dados_eficiencia: Função que exibe os dados brutos das respostas (dos respondentes filtrados)
+    """
+    # Tipo de gráfico (com radio buttons)
+    tipo_grafico_efic = st.radio(
+        "Selecione o tipo de gráfico:",
+        tipos_grafico,
+        horizontal=True,
+        key="grafico_eficiencia"  # Chave única para este componente
+    )
+
+    fig = criar_grafico(df_eficiencia, 'Eficiência', tipo_grafico_efic,
+                        "Distribuição por Eficiência de Trabalho Remoto", "Eficiência",
+                        titulo_treemap="Distribuição por Eficiência")
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Opção para mostrar os dados brutos
+    if st.checkbox("Mostrar dados brutos de Eficiência", key="mostrar_eficiencia"):
+        st.write("Lista de classificações de eficiencia:")
+        exibir_dados_eficiencia()
+
+
+# Perguntas disponíveis na comparação entre as ondas: (chave das tabelas, coluna, título do eixo x)
+perguntas_comparacao = {
+    "Idade": ('idade', 'Faixa Etária', "Faixa Etária"),
+    "Frequência": ('frequencia', 'Frequência', "Frequência de Trabalho Remoto"),
+    "Produtividade": ('produtividade', 'Produtividade', "Classificação"),
+    "Eficiência": ('eficiencia', 'Eficiência', "Eficiência"),
+}
+
+
+@st.fragment
+@secao_medida("gráficos: comparação entre ondas")
+def grafico_comparacao(tabelas_fontes):
+    """
+    --> Função para exibir o gráfico de comparação entre as ondas da pesquisa
+    :param tabelas_fontes: Dicionário {nome da planilha: tabelas de distribuição}
+    """
+    pergunta = st.radio("Selecione a pergunta:", list(perguntas_comparacao), horizontal=True,
+                        key="pergunta_comparacao")
+    chave, coluna, titulo_eixo_x = perguntas_comparacao[pergunta]
+
+    df_comparacao = montar_tabela_comparacao(tabelas_fontes, chave, coluna)
+    fig = criar_grafico_comparacao(df_comparacao, coluna, f"{pergunta} por Onda da Pesquisa", titulo_eixo_x)
+    st.plotly_chart(fig, use_container_width=True)
+
+    if st.checkbox("Mostrar tabela da comparação", key="mostrar_comparacao"):
+        st.dataframe(df_comparacao, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+@secao_medida("gráficos: cruzamento das respostas")
+def secao_cruzamento(respostas):
+    """
+    --> Função para exibir o cruzamento das perguntas: média de produtividade por grupo, tabela de contingência
+    e teste qui-quadrado (calculados com np.bincount sobre os códigos das respostas)
+    :param respostas: Objeto RespostasCompactas com as respostas selecionadas
+    """
+    dimensoes_grupo = st.multiselect(
+        "Agrupar respondentes por:",
+        ['idade', 'frequencia', 'produtividade'],
+        default=['idade', 'frequencia'],
+        format_func=dimensoes.get,
+        max_selections=2,
+        key="dimensoes_cruzamento"
+    )
+    if not dimensoes_grupo:
+        st.info("Selecione ao menos uma pergunta para agrupar os respondentes.")
+        return
+    nomes_grupo = [dimensoes[dimensao] for dimensao in dimensoes_grupo]
+
+    # Média de produtividade de cada grupo
+    if 'produtividade' not in dimensoes_grupo:
+        df_medias = produtividade_por_grupo(respostas, dimensoes_grupo)
+        titulo = f"Média de Produtividade por {' x '.join(nomes_grupo)}"
+        if len(dimensoes_grupo) == 2:
+            fig = criar_mapa_calor(df_medias, nomes_grupo[0], nomes_grupo[1], 'Média', titulo, "Média")
+        else:
+            fig = criar_grafico_medias(df_medias, nomes_grupo[0], titulo, nomes_grupo[0])
+        st.plotly_chart(fig, use_container_width=True)
+
+        if st.checkbox("Mostrar médias por grupo", key="mostrar_medias_cruzamento"):
+            st.dataframe(df_medias, use_container_width=True, hide_index=True)
+
+    # Tabela de contingência
+    st.subheader("Tabela de Contingência")
+    opcoes_coluna = [dimensao for dimensao in dimensoes if dimensao not in dimensoes_grupo]
+    dimensao_coluna = st.radio("Cruzar com:", opcoes_coluna, format_func=dimensoes.get, horizontal=True,
+                               key="coluna_cruzamento")
+    tabela = tabela_contingencia(respostas, dimensoes_grupo, dimensao_coluna)
+
+    percentuais = st.toggle("Exibir percentuais por linha", value=True, key="percentual_cruzamento")
+    tabela_exibida = percentual_por_linha(tabela) if percentuais else tabela
+    st.dataframe(tabela_exibida.rename(columns=str).reset_index(), use_container_width=True, hide_index=True)
+    if dimensao_coluna == 'eficiencia':
+        st.caption("Na eficiência cada respondente pode marcar várias opções: os valores são contagens de "
+                   "marcações e o teste qui-quadrado não se aplica.")
+        return
+
+    # Teste de independência entre os grupos e a pergunta da coluna
+    resultado = teste_qui_quadrado(tabela)
+    if resultado is None:
+        return
+    teste_col1, teste_col2, teste_col3 = st.columns(3)
+    with teste_col1:
+        st.metric("Qui-quadrado", f"{resultado['qui_quadrado']:.1f}",
+                  help=f"{resultado['graus_liberdade']} graus de liberdade")
+    with teste_col2:
+        st.metric("p-valor", f"{resultado['p_valor']:.4f}")
+    with teste_col3:
+        st.metric("V de Cramér", f"{resultado['v_cramer']:.3f}",
+                  help="Força da associação (0 = nenhuma, 1 = total)")
+    if resultado['percentual_esperado_baixo'] > 20:
+        st.caption(f"⚠️ {resultado['percentual_esperado_baixo']:.0f}% das células têm frequência esperada menor "
+                   "que 5: o resultado do teste pode não ser confiável.")
+
+
+@st.fragment
+@secao_medida("gráficos: tendências")
+def secao_tendencias(tendencias, filtros_ativos):
+    """
+    --> Função para exibir a quantidade de respostas por período e a distribuição móvel de cada pergunta ao longo
+    do tempo (a partir das contagens diárias da agregação incremental)
+    :param tendencias: Objeto SeriesTemporais da versão atual
+    :param filtros_ativos: Indica se há filtros na sidebar (as tendências consideram todas as respostas)
+    """
+    periodo = st.radio("Agrupar por:", list(periodos_tendencia), horizontal=True, key="periodo_tendencias")
+    janela_padrao, janela_maxima = janelas_tendencia[periodo]
+    janela = st.slider(f"Janela móvel ({periodo.lower()}s):", 1, janela_maxima, janela_padrao,
+                       key=f"janela_tendencias_{periodo}")
+
+    df_respostas = tendencias.respostas_por_periodo(periodo, janela)
+    tend_col1, tend_col2, tend_col3 = st.columns(3)
+    with tend_col1:
+        st.metric(f"Respostas no último período ({df_respostas['Período'].iloc[-1]:%d/%m/%Y})",
+                  int(df_respostas['Respostas'].iloc[-1]))
+    with tend_col2:
+        st.metric(f"Média por {periodo.lower()}", f"{df_respostas['Respostas'].mean():.1f}")
+    with tend_col3:
+        st.metric("Primeira resposta", f"{tendencias.respostas.index[0]:%d/%m/%Y}")
+
+    fig = criar_grafico_respostas_periodo(df_respostas, f"Respostas Recebidas por {periodo}")
+    st.plotly_chart(fig, use_container_width=True)
+
+    pergunta = st.radio("Distribuição ao longo do tempo:", list(perguntas_tendencia),
+                        format_func=perguntas_tendencia.get, horizontal=True, key="pergunta_tendencias")
+    coluna = perguntas_tendencia[pergunta]
+    fig = criar_grafico_tendencia(tendencias.distribuicao(pergunta, periodo, janela), coluna,
+                                  f"{coluna} por {periodo} (janela móvel de {janela})")
+    st.plotly_chart(fig, use_container_width=True)
+
+    if tendencias.sem_data:
+        st.caption(f"{tendencias.sem_data} respostas sem a hora de conclusão não aparecem nas tendências.")
+    if filtros_ativos:
+        st.caption("As tendências consideram todas as respostas (os filtros da barra lateral não se aplicam).")
 
 
 def main():
@@ -156,11 +527,37 @@ def main():
         layout="wide"
     )
 
-    # Verificação da existência do caminho da planilha
-    if os.path.exists(caminho_planilha):
+    # Medição de desempenho (ativada pela variável PERFIL_DASHBOARD=1 ou pela opção na sidebar)
+    perfil = PerfilExecucao(ativo=st.session_state.get("perfil_ativo", PERFIL_ATIVO),
+                            usar_pyinstrument=st.session_state.get("perfil_pyinstrument", PERFIL_PYINSTRUMENT))
+    st.session_state["perfil_execucao"] = perfil
+
+    # Atualização da planilha em segundo plano (desativada com INTERVALO_ATUALIZACAO_MINUTOS=0)
+    atualizador = obter_atualizador() if INTERVALO_ATUALIZACAO_MINUTOS > 0 else None
+
+    try:
+        exibir_dashboard(perfil, atualizador)
+    finally:
+        # Também é executado quando a página é interrompida (st.stop)
+        perfil.finalizar()
+        if perfil.ativo:
+            exibir_perfil(perfil, atualizador)
+            perfil.salvar_log(versao=st.session_state.get("versao_planilha"))
+
+
+def exibir_dashboard(perfil, atualizador):
+    """
+    --> Função para exibir o conteúdo do dashboard
+    :param perfil: Objeto PerfilExecucao que mede o tempo de cada etapa
+    :param atualizador: Objeto AtualizadorPlanilha em execução ou None
+    """
+
+    # Verificação da existência das planilhas
+    if all(os.path.exists(fonte["arquivo"]) for fonte in fontes_planilhas) or atualizador is not None:
         pass
     else:
-        baixar_planilha()
+        with perfil.medir("download da planilha"):
+            baixar_planilha()
 
     # Título do dashboard
     st.title("📊 Dashboard Trabalho Remoto")
@@ -168,98 +565,102 @@ def main():
     # Sidebar para opções
     st.sidebar.header("⚙️ Opções")
 
+    # Opções de medição de desempenho (valem a partir da próxima execução da página)
+    if st.sidebar.toggle("⏱️ Medir desempenho", value=PERFIL_ATIVO, key="perfil_ativo"):
+        st.sidebar.checkbox("Capturar perfil das chamadas (pyinstrument)", value=PERFIL_PYINSTRUMENT,
+                            key="perfil_pyinstrument")
+
     # Botão para atualizar os dados (executa função para baixar a planilha novamente
     if st.sidebar.button("🔄 Atualizar Dados"):
-        arquivo = baixar_planilha()
-        if arquivo:
-            st.sidebar.success("Dados atualizados com sucesso!")
-
-    valores_idade, valores_frequencia, valores_produtividade, valores_eficiencia = ler_dados_planilha()
-
-    # Lista com as frequências esperadas (exceto "Outra")
-    frequencias_validas = [
-        'Trabalho 100% remoto',
-        'Trabalho em regime híbrido (parte presencial, parte remoto)',
-        'Trabalho principalmente presencial, mas ocasionalmente remoto',
-        'Trabalho exclusivamente presencial'
-    ]
-
-    def classificar_frequencia(texto):
-        if texto in frequencias_validas:
-            return texto
+        if atualizador is not None:
+            atualizador.executar_agora()
+            st.sidebar.info("Atualização iniciada em segundo plano.")
         else:
-            return 'Outra'
-
-    # Lista com as eficiências esperadas
-    eficiencias_validas = [
-        'Ausência de deslocamento',
-        'Ambiente de trabalho personalizado',
-        'Menos interrupções/distrações',
-        'Horários flexíveis',
-        'Melhor equilíbrio entre vida profissional e pessoal',
-        'Maior autonomia'
-    ]
-
-    def classificar_eficiencia(texto):
-        if texto in eficiencias_validas:
-            return texto
-        else:
-            return 'Nenhuma das opções acima'
-
-    # Aplica a classificação na lista de frequências coletadas
-    valores_frequencia_classificados = [classificar_frequencia(texto) for texto in valores_frequencia]
-    # Na parte onde você processa os dados de eficiência:
-    valores_eficiencia_individuais = processar_multipla_escolha(valores_eficiencia)
-
-    # Agora classifique as opções individuais
-    valores_eficiencia_classificadas = [classificar_eficiencia(texto) for texto in valores_eficiencia_individuais]
-
-    # Contagem das frequências de eficiência
-    contagem_eficiencia = Counter(valores_eficiencia_classificadas)
-
-    if not valores_idade or not valores_frequencia or not valores_eficiencia or not valores_produtividade:
+            from sharepoint import BAIXADO, INALTERADO
+
+            with perfil.medir("download da planilha"):
+                situacao = baixar_planilha()
+            if situacao == BAIXADO:
+                st.sidebar.success("Dados atualizados com sucesso!")
+            elif situacao == INALTERADO:
+                st.sidebar.info("Os dados já estão atualizados.")
+
+    if atualizador is not None:
+        exibir_situacao_atualizacao(atualizador)
+
+    fontes_disponiveis = [fonte for fonte in fontes_planilhas if os.path.exists(fonte["arquivo"])]
+    if not fontes_disponiveis:
+        if atualizador is not None and atualizador.ultima_atualizacao is None and atualizador.ultimo_erro is None:
+            st.info("A planilha está sendo baixada pela primeira vez. Atualize a página em instantes.")
+            st.stop()
         st.warning(
             "Não foi possível ler os dados da planilha. Certifique-se de que o arquivo existe ou use os dados de exemplo.")
         st.stop()
 
-    # Contagem de faixas etárias
-    contagem_idades = Counter(valores_idade)
+    # Com várias planilhas (ondas da pesquisa), o usuário escolhe quais entram no dashboard
+    fontes_selecionadas = fontes_disponiveis
+    if len(fontes_disponiveis) > 1:
+        nomes_disponiveis = [fonte["nome"] for fonte in fontes_disponiveis]
+        nomes_selecionados = st.sidebar.multiselect("🌊 Ondas da pesquisa", nomes_disponiveis,
+                                                    default=nomes_disponiveis)
+        fontes_selecionadas = [fonte for fonte in fontes_disponiveis if fonte["nome"] in nomes_selecionados]
+        if not fontes_selecionadas:
+            st.warning("Selecione ao menos uma onda da pesquisa na barra lateral.")
+            st.stop()
+
+    # A versão das planilhas (hash do conteúdo) é a chave de todas as etapas em cache
+    with perfil.medir("versão da planilha (hash)"):
+        versao = versao_fontes(fontes_selecionadas)
+    st.session_state["versao_planilha"] = versao
+
+    # Contagens, tabelas, métricas e bitmaps da versão: criados uma única vez no processo e compartilhados,
+    # somente para leitura, por todas as sessões (cada sessão apenas exibe o resultado)
+    with perfil.medir("instantâneo agregado (compartilhado)"):
+        try:
+            instantaneo = obter_repositorio().obter(versao, fontes_selecionadas)
+        except Exception as e:
+            st.error(f"Erro ao ler a planilha: {str(e)}")
+            traceback.print_exc()
+            instantaneo = None
 
-    # Criar um DataFrame para facilitar a visualização
-    df_idades = pd.DataFrame({
-        'Faixa Etária': list(contagem_idades.keys()),
-        'Quantidade': list(contagem_idades.values())
-    })
+    if instantaneo is None or instantaneo.vazio:
+        st.warning(
+            "Não foi possível ler os dados da planilha. Certifique-se de que o arquivo existe ou use os dados de exemplo.")
+        st.stop()
 
-    # Ordenar o DataFrame pelas faixas etárias de forma lógica
-    ordem_faixas = ['18-24 anos', '25-34 anos', '35-44 anos',
-                    '45-54 anos', '55-64 anos', '65 anos ou mais']
+    indice = instantaneo.indice
+    respostas_compactas = instantaneo.respostas
+    filtros = exibir_filtros(indice)
+    with perfil.medir("filtros (AND dos bitmaps)"):
+        selecao = indice.selecionar(filtros)
+
+    # Com e sem filtros, as contagens vêm dos bitmaps (a mesma função e a mesma regra de contagem)
+    with perfil.medir("contagens (bitmaps), tabelas e métricas"):
+        _, tabelas, metricas = instantaneo.tabelas_selecao(selecao)
+    if not tabelas:
+        st.warning("Nenhuma resposta atende aos filtros selecionados.")
+        st.stop()
 
-    # Filtra apenas as faixas que existem nos dados
-    ordem_faixas_filtrada = [faixa for faixa in ordem_faixas if faixa in df_idades['Faixa Etária'].values]
+    if selecao is not None:
+        st.sidebar.caption(f"Respondentes selecionados: {indice.quantidade_selecionada(selecao)} "
+                           f"de {indice.quantidade}")
+        respostas_compactas = respostas_compactas.filtrar(indice.mascara(selecao))
 
-    # Ordena o DataFrame se houver faixas etárias válidas
-    if ordem_faixas_filtrada:
-        df_idades['Faixa Etária'] = pd.Categorical(df_idades['Faixa Etária'],
-                                                   categories=ordem_faixas_filtrada,
-                                                   ordered=True)
-        df_idades = df_idades.sort_values('Faixa Etária')
+    df_idades = tabelas['idade']
+    df_frequencia = tabelas['frequencia']
+    df_produtividade = tabelas['produtividade']
+    df_eficiencia = tabelas['eficiencia']
 
     # Criar layout do dashboard em colunas
     col1, col2 = st.columns(2)
 
-    total_respostas = df_idades['Quantidade'].sum()
-
     # Coluna 1: Tabela de Dados
     with col1:
-        st.title(f"Total de Respostas: {total_respostas}")
+        st.title(f"Total de Respostas: {metricas['total_respostas']}")
         st.header("⏳ Idade")
-        st.image(f"{os.path.dirname(__file__)}\\assets\\idades.png", caption="Idade dos Participantes da Pesquisa")
+        st.image(obter_imagem("idades.png"), caption="Idade dos Participantes da Pesquisa")
         st.subheader("Tabela de Distribuição")
 
-        # Adiciona coluna de percentual
-        df_idades['Percentual'] = df_idades['Quantidade'].apply(lambda x: f"{(x / total_respostas * 100):.1f}%")
-
         # Exibe a tabela formatada
         st.dataframe(
             df_idades,
@@ -275,125 +676,22 @@ def main():
         metricas_col1, metricas_col2, metricas_col3 = st.columns(3)
 
         with metricas_col1:
-            faixa_mais_comum = df_idades.loc[df_idades['Quantidade'].idxmax(), 'Faixa Etária']
-            st.metric("Faixa Etária Mais Comum (Moda)", faixa_mais_comum)
+            st.metric("Faixa Etária Mais Comum (Moda)", metricas['faixa_mais_comum'])
 
         with metricas_col2:
-            maior_quantidade = df_idades['Quantidade'].max()
-            percentual_maior = (maior_quantidade / total_respostas) * 100
-            st.metric("Representação da Faixa Mais Comum", f"{percentual_maior:.1f}%")
+            st.metric("Representação da Faixa Mais Comum", f"{metricas['percentual_faixa_mais_comum']:.1f}%")
 
         with metricas_col3:
-            # Dicionário para mapear cada faixa etária para um valor aproximado
-            valores_medios = {
-                '18-24 anos': 21,
-                '25-34 anos': .5,
-                '35-44 anos': 39.5,
-                '45-54 anos': 49.5,
-                '55-64 anos': 59.5,
-                '65 anos ou mais': 70
-            }
-
-            # Calcular a média ponderada
-            soma_ponderada = 0
-            for i, row in df_idades.iterrows():
-                faixa = row['Faixa Etária']
-                if faixa in valores_medios:
-                    soma_ponderada += valores_medios[faixa] * row['Quantidade']
-
-            media_ponderada = soma_ponderada / total_respostas
-
-            st.metric("Média de Idade (estimada)", f"{media_ponderada:.1f} anos")
+            st.metric("Média de Idade (estimada)", f"{metricas['media_idade']:.1f} anos")
 
     # Coluna 2: Visualizações Gráficas
     with col2:
-        # Tipo de gráfico (com radio buttons)
-        tipo_grafico = st.radio(
-            "Selecione o tipo de gráfico:",
-            ["Gráfico de Barras", "Gráfico de Pizza", "Treemap", "Funil"],
-            horizontal=True
-        )
-
-        if tipo_grafico == "Gráfico de Barras":
-            fig = px.bar(
-                df_idades,
-                x='Faixa Etária',
-                y='Quantidade',
-                text='Quantidade',
-                color='Faixa Etária',
-                title="Distribuição por Faixa Etária",
-                height=400
-            )
-            fig.update_layout(xaxis_title="Faixa Etária", yaxis_title="Quantidade")
-            st.plotly_chart(fig, use_container_width=True)
-
-        elif tipo_grafico == "Gráfico de Pizza":
-            fig = px.pie(
-                df_idades,
-                values='Quantidade',
-                names='Faixa Etária',
-                title="Distribuição por Faixa Etária (%)",
-                height=400
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
-
-        elif tipo_grafico == "Treemap":
-            fig = px.treemap(
-                df_idades,
-                path=['Faixa Etária'],
-                values='Quantidade',
-                title="Distribuição por Faixa Etária",
-                height=400
-            )
-            fig.update_traces(textinfo='label+percent entry')
-            st.plotly_chart(fig, use_container_width=True)
-
-        else:
-            fig = px.funnel(
-                df_idades,
-                x='Quantidade',
-                y='Faixa Etária',
-                title="Distribuição por Faixa Etária",
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Distribuições adicionais e análises
-        st.subheader("Análise Expandida")
-
-        # Mostra os dados brutos se solicitado
-        if st.checkbox("Mostrar dados brutos"):
-            st.write("Lista de todas as idades coletadas:")
-            st.write(valores_idade)
+        grafico_idades(
+            df_idades, functools.partial(exibir_dados_brutos, versao, fontes_selecionadas, filtros, 'idade'))
 
     # Separador
     st.markdown("---")
 
-    # Contagem das frequências de trabalho remoto
-    contagem_frequencia = Counter(valores_frequencia_classificados)
-
-    # Criar um DataFrame para facilitar a visualização
-    df_frequencia = pd.DataFrame({
-        'Frequência': list(contagem_frequencia.keys()),
-        'Quantidade': list(contagem_frequencia.values())
-    })
-
-    # Ordenar o DataFrame por frequência de trabalho remoto de forma lógica
-    ordem_frequencia = ['Trabalho 100% remoto', 'Trabalho em regime híbrido (parte presencial, parte remoto)',
-                        'Trabalho principalmente presencial, mas ocasionalmente remoto',
-                        'Trabalho exclusivamente presencial', 'Outra']
-
-    # Filtra apenas as frequências que existem nos dados
-    ordem_frequencia_filtrada = [freq for freq in ordem_frequencia if freq in df_frequencia['Frequência'].values]
-
-    # Ordena o DataFrame se houver frequências válidas
-    if ordem_frequencia_filtrada:
-        df_frequencia['Frequência'] = pd.Categorical(df_frequencia['Frequência'],
-                                                     categories=ordem_frequencia_filtrada,
-                                                     ordered=True)
-        df_frequencia = df_frequencia.sort_values('Frequência')
-
     # Criar layout da segunda seção em colunas
     freq_col1, freq_col2 = st.columns(2)
 
@@ -404,15 +702,10 @@ def main():
         st.header("🏠 Frequência de Trabalho Remoto")
 
         # Imagem
-        st.image(f"{os.path.dirname(__file__)}\\assets\\remoto.png", caption="Frequência de Trabalho Remoto")
+        st.image(obter_imagem("remoto.png"), caption="Frequência de Trabalho Remoto")
 
         st.subheader("Tabela de Distribuição")
 
-        # Adiciona coluna de percentual
-        total_respostas_freq = df_frequencia['Quantidade'].sum()
-        df_frequencia['Percentual'] = df_frequencia['Quantidade'].apply(
-            lambda x: f"{(x / total_respostas_freq * 100):.1f}%")
-
         # Exibe a tabela formatada
         st.dataframe(
             df_frequencia,
@@ -428,110 +721,26 @@ def main():
         freq_metricas_col1, freq_metricas_col2 = st.columns(2)
 
         with freq_metricas_col1:
-            freq_mais_comum = df_frequencia.loc[df_frequencia['Quantidade'].idxmax(), 'Frequência']
-            st.metric("Frequência Mais Comum", freq_mais_comum)
+            st.metric("Frequência Mais Comum", metricas['frequencia_mais_comum'])
 
         with freq_metricas_col2:
-            maior_quant_freq = df_frequencia['Quantidade'].max()
-            percentual_maior_freq = (maior_quant_freq / total_respostas_freq) * 100
-            st.metric("Representação", f"{percentual_maior_freq:.1f}%")
+            st.metric("Representação", f"{metricas['percentual_frequencia_mais_comum']:.1f}%")
 
     # Coluna 2: Visualizações Gráficas de Frequência
     with freq_col2:
-        # Tipo de gráfico (com radio buttons)
-        tipo_grafico_freq = st.radio(
-            "Selecione o tipo de gráfico:",
-            ["Gráfico de Barras", "Gráfico de Pizza", "Treemap", "Funil"],
-            horizontal=True,
-            key="grafico_frequencia"  # Chave única para este componente
-        )
-
-        if tipo_grafico_freq == "Gráfico de Barras":
-            fig = px.bar(
-                df_frequencia,
-                x='Frequência',
-                y='Quantidade',
-                text='Quantidade',
-                color='Frequência',
-                title="Distribuição por Frequência de Trabalho Remoto",
-                height=400
-            )
-            fig.update_layout(xaxis_title="Frequência de Trabalho Remoto", yaxis_title="Quantidade")
-            st.plotly_chart(fig, use_container_width=True)
-
-        elif tipo_grafico_freq == "Gráfico de Pizza":
-            fig = px.pie(
-                df_frequencia,
-                values='Quantidade',
-                names='Frequência',
-                title="Distribuição por Frequência de Trabalho Remoto (%)",
-                height=400
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
-
-        elif tipo_grafico_freq == "Treemap":
-            fig = px.treemap(
-                df_frequencia,
-                path=['Frequência'],
-                values='Quantidade',
-                title="Distribuição por Frequência de Trabalho Remoto",
-                height=400
-            )
-            fig.update_traces(textinfo='label+percent entry')
-            st.plotly_chart(fig, use_container_width=True)
-
-        else:  # Funil
-            fig = px.funnel(
-                df_frequencia,
-                x='Quantidade',
-                y='Frequência',
-                title="Distribuição por Frequência de Trabalho Remoto",
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Análise adicional
-        st.subheader("Análise Expandida")
-
-        # Mostra os dados brutos se solicitado
-        if st.checkbox("Mostrar dados brutos", key="mostrar_dados_frequencia"):
-            st.write("Lista de todas as frequências coletadas:")
-            st.write(valores_frequencia)
+        grafico_frequencia(
+            df_frequencia, functools.partial(exibir_dados_brutos, versao, fontes_selecionadas, filtros, 'frequencia'))
 
     st.markdown("---")
     st.header("📈 Produtividade")
 
-    # Cria DataFrame com contagem das respostas (valores de 1 a 5)
-    contagem_produtividade = Counter(valores_produtividade)
-    df_produtividade = pd.DataFrame({
-        'Produtividade': list(contagem_produtividade.keys()),
-        'Quantidade': list(contagem_produtividade.values())
-    })
-
-    # Ordena as classificações de 1 a 5
-    ordem_produtividade = [1, 2, 3, 4, 5]
-    df_produtividade['Produtividade'] = pd.Categorical(
-        df_produtividade['Produtividade'],
-        categories=ordem_produtividade,
-        ordered=True
-    )
-    df_produtividade = df_produtividade.sort_values('Quantidade')
-
-    # Calcula a média geral de produtividade
-    media_produtividade = sum(valores_produtividade) / len(valores_produtividade)
-
     # Cria layout em duas colunas para a seção de produtividade
     prod_col1, prod_col2 = st.columns(2)
 
     with prod_col1:
         # Imagem
-        st.image(f"{os.path.dirname(__file__)}\\assets\\produtividade.png", caption="Produtividade no Trabalho Remoto")
+        st.image(obter_imagem("produtividade.png"), caption="Produtividade no Trabalho Remoto")
         st.subheader("Tabela de Distribuição")
-        total_respostas_prod = df_produtividade['Quantidade'].sum()
-        df_produtividade['Percentual'] = df_produtividade['Quantidade'].apply(
-            lambda x: f"{(x / total_respostas_prod * 100):.1f}%"
-        )
         st.dataframe(
             df_produtividade,
             column_config={"Quantidade": st.column_config.NumberColumn(format="%d")},
@@ -539,91 +748,15 @@ def main():
             hide_index=True
         )
         st.subheader("Métricas")
-        st.metric("Média de Produtividade", f"{media_produtividade:.1f}")
+        st.metric("Média de Produtividade", f"{metricas['media_produtividade']:.1f}")
 
     with prod_col2:
-        st.subheader("Visualização Gráfica")
-        tipo_grafico_prod = st.radio(
-            "Selecione o tipo de gráfico:",
-            ["Gráfico de Barras", "Gráfico de Pizza", "Treemap", "Funil"],
-            horizontal=True,
-            key="grafico_produtividade"
-        )
-        if tipo_grafico_prod == "Gráfico de Barras":
-            fig = px.bar(
-                df_produtividade,
-                x='Produtividade',
-                y='Quantidade',
-                text='Quantidade',
-                color='Produtividade',
-                title="Distribuição de Produtividade",
-                height=400
-            )
-            fig.update_layout(xaxis_title="Classificação", yaxis_title="Quantidade")
-            st.plotly_chart(fig, use_container_width=True)
-        elif tipo_grafico_prod == "Gráfico de Pizza":
-            fig = px.pie(
-                df_produtividade,
-                values='Quantidade',
-                names='Produtividade',
-                title="Distribuição de Produtividade (%)",
-                height=400
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
-        elif tipo_grafico_prod == "Treemap":
-            fig = px.treemap(
-                df_produtividade,
-                path=['Produtividade'],
-                values='Quantidade',
-                title="Distribuição de Produtividade",
-                height=400
-            )
-            fig.update_traces(textinfo='label+percent entry')
-            st.plotly_chart(fig, use_container_width=True)
-        else:  # Gráfico Funil
-            fig = px.funnel(
-                df_produtividade,
-                x='Quantidade',
-                y='Produtividade',
-                title="Distribuição de Produtividade",
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Opção para mostrar os dados brutos
-        if st.checkbox("Mostrar dados brutos de Produtividade", key="mostrar_produtividade"):
-            st.write("Lista de classificações de produtividade:")
-            st.write(valores_produtividade)
+        grafico_produtividade(
+            df_produtividade,
+            functools.partial(exibir_dados_brutos, versao, fontes_selecionadas, filtros, 'produtividade'))
 
     st.markdown("---")
 
-    # Criar um DataFrame para facilitar a visualização
-    df_eficiencia = pd.DataFrame({
-        'Eficiência': list(contagem_eficiencia.keys()),
-        'Quantidade': list(contagem_eficiencia.values())
-    })
-
-    # Ordenar o DataFrame por eficiência
-    ordem_eficiencia = [
-        'Ausência de deslocamento',
-        'Ambiente de trabalho personalizado',
-        'Menos interrupções/distrações',
-        'Horários flexíveis',
-        'Melhor equilíbrio entre vida profissional e pessoal',
-        'Maior autonomia'
-    ]
-
-    # Filtra apenas as eficiência que existem nos dados
-    ordem_eficiencia_filtrada = [efic for efic in ordem_eficiencia if efic in df_eficiencia['Eficiência'].values]
-
-    # Ordena o DataFrame se houver eficiências válidas
-    if ordem_eficiencia_filtrada:
-        df_eficiencia['Eficiência'] = pd.Categorical(df_eficiencia['Eficiência'],
-                                                     categories=ordem_eficiencia_filtrada,
-                                                     ordered=True)
-        df_eficiencia = df_eficiencia.sort_values('Eficiência')
-
     # Criar layout da segunda seção em colunas
     freq_col1, freq_col2 = st.columns(2)
 
@@ -633,15 +766,10 @@ def main():
         st.header("💪🏻 Aspectos da Eficiência")
 
         # Imagem
-        st.image(f"{os.path.dirname(__file__)}\\assets\\eficiencia.jpg", caption="Eficiência")
+        st.image(obter_imagem("eficiencia.jpg"), caption="Eficiência")
 
         st.subheader("Tabela de Distribuição")
 
-        # Adiciona coluna de percentual
-        total_respostas_efic = df_eficiencia['Quantidade'].sum()
-        df_eficiencia['Percentual'] = df_eficiencia['Quantidade'].apply(
-            lambda x: f"{(x / total_respostas_efic * 100):.1f}%")
-
         # Exibe a tabela formatada
         st.dataframe(
             df_eficiencia,
@@ -657,73 +785,37 @@ def main():
         efic_metricas_col1, efic_metricas_col2 = st.columns(2)
 
         with efic_metricas_col1:
-            efic_mais_comum = df_eficiencia.loc[df_eficiencia['Quantidade'].idxmax(), 'Eficiência']
-            st.metric("Frequência Mais Comum", efic_mais_comum)
+            st.metric("Frequência Mais Comum", metricas['eficiencia_mais_comum'])
 
         with efic_metricas_col2:
-            maior_quant_efic = df_eficiencia['Quantidade'].max()
-            percentual_maior_efic = (maior_quant_efic / total_respostas_efic) * 100
-            st.metric("Representação", f"{percentual_maior_efic:.1f}%")
+            st.metric("Representação", f"{metricas['percentual_eficiencia_mais_comum']:.1f}%")
 
     # Coluna 2: Visualizações Gráficas de Eficiência
     with freq_col2:
-        # Tipo de gráfico (com radio buttons)
-        tipo_grafico_efic = st.radio(
-            "Selecione o tipo de gráfico:",
-            ["Gráfico de Barras", "Gráfico de Pizza", "Treemap", "Funil"],
-            horizontal=True,
-            key="grafico_eficiencia"  # Chave única para este componente
-        )
+        grafico_eficiencia(
+            df_eficiencia, functools.partial(exibir_dados_brutos, versao, fontes_selecionadas, filtros, 'eficiencia'))
 
-        if tipo_grafico_efic == "Gráfico de Barras":
-            fig = px.bar(
-                df_eficiencia,
-                x='Eficiência',
-                y='Quantidade',
-                text='Quantidade',
-                color='Eficiência',
-                title="Distribuição por Eficiência de Trabalho Remoto",
-                height=400
-            )
-            fig.update_layout(xaxis_title="Eficiência", yaxis_title="Quantidade")
-            st.plotly_chart(fig, use_container_width=True)
-
-        elif tipo_grafico_efic == "Gráfico de Pizza":
-            fig = px.pie(
-                df_eficiencia,
-                values='Quantidade',
-                names='Eficiência',
-                title="Distribuição por Eficiência de Trabalho Remoto (%)",
-                height=400
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
-
-        elif tipo_grafico_efic == "Treemap":  # Corrigido: estava usando tipo_grafico_freq
-            fig = px.treemap(
-                df_eficiencia,
-                path=['Eficiência'],
-                values='Quantidade',
-                title="Distribuição por Eficiência",
-                height=400
-            )
-            fig.update_traces(textinfo='label+percent entry')
-            st.plotly_chart(fig, use_container_width=True)
-
-        else:  # Funil
-            fig = px.funnel(
-                df_eficiencia,
-                x='Quantidade',
-                y='Eficiência',
-                title="Distribuição por Eficiência de Trabalho Remoto",
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Opção para mostrar os dados brutos
-        if st.checkbox("Mostrar dados brutos de Eficiência", key="mostrar_eficiencia"):
-            st.write("Lista de classificações de eficiencia:")
-            st.write(valores_eficiencia)
+    # Cruzamento das perguntas (ex.: produtividade por faixa etária e frequência de trabalho remoto)
+    st.markdown("---")
+    st.header("🔀 Cruzamento das Respostas")
+    secao_cruzamento(respostas_compactas)
+
+    # Respostas ao longo do tempo (pela hora de conclusão do formulário)
+    st.markdown("---")
+    st.header("📅 Tendências ao Longo do Tempo")
+    if instantaneo.tendencias.vazio:
+        st.info("As planilhas não têm a hora de conclusão das respostas.")
+    else:
+        secao_tendencias(instantaneo.tendencias, selecao is not None)
+
+    # Comparação entre as ondas da pesquisa (somente com mais de uma planilha)
+    if len(fontes_disponiveis) > 1:
+        st.markdown("---")
+        st.header("🌊 Comparação entre as Ondas da Pesquisa")
+        with perfil.medir("instantâneo de todas as ondas (compartilhado)"):
+            tabelas_fontes = obter_repositorio().obter(versao_fontes(fontes_disponiveis),
+                                                       fontes_disponiveis).tabelas_fontes
+        grafico_comparacao(tabelas_fontes)
 
     # Sobre o dashboard
     st.sidebar.markdown("---")
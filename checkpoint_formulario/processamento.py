@@ -0,0 +1,367 @@
+import numpy as np
+import pandas as pd
+from collections import Counter
+from normalizacao import obter_normalizador
+
+# Lista com as frequências esperadas (exceto "Outra")
+frequencias_validas = [
+    'Trabalho 100% remoto',
+    'Trabalho em regime híbrido (parte presencial, parte remoto)',
+    'Trabalho principalmente presencial, mas ocasionalmente remoto',
+    'Trabalho exclusivamente presencial'
+]
+
+# Lista com as eficiências esperadas
+eficiencias_validas = [
+    'Ausência de deslocamento',
+    'Ambiente de trabalho personalizado',
+    'Menos interrupções/distrações',
+    'Horários flexíveis',
+    'Melhor equilíbrio entre vida profissional e pessoal',
+    'Maior autonomia'
+]
+
+# Ordem lógica de exibição de cada pergunta
+ordem_faixas = ['18-24 anos', '25-34 anos', '35-44 anos',
+                '45-54 anos', '55-64 anos', '65 anos ou mais']
+ordem_frequencia = frequencias_validas + ['Outra']
+ordem_produtividade = [1, 2, 3, 4, 5]
+ordem_eficiencia = eficiencias_validas + ['Nenhuma das opções acima']
+
+# Dicionário para mapear cada faixa etária para um valor aproximado
+valores_medios = {
+    '18-24 anos': 21,
+    '25-34 anos': .5,
+    '35-44 anos': 39.5,
+    '45-54 anos': 49.5,
+    '55-64 anos': 59.5,
+    '65 anos ou mais': 70
+}
+
+
+# Função para processar respostas de múltipla escolha
+def processar_multipla_escolha(lista_respostas):
+    # Lista para armazenar todas as opções individuais
+    todas_opcoes = []
+
+    for resposta in lista_respostas:
+        if isinstance(resposta, str):
+            # Divide a string usando ponto-e-vírgula como separador
+            opcoes = resposta.split(';')
+            # Adiciona cada opção individual à lista
+            todas_opcoes.extend([opcao.strip() for opcao in opcoes if opcao.strip()])
+
+    return todas_opcoes
+
+
+def classificar_opcoes(textos, opcoes_validas, opcao_outra):
+    """
+    --> Função para classificar as respostas nas opções esperadas. Os textos distintos fora da lista passam por
+    uma única chamada do normalizador, então o cache em disco é gravado no máximo uma vez por lote
+    :param textos: Respostas coletadas
+    :param opcoes_validas: Lista com as opções esperadas
+    :param opcao_outra: Categoria das respostas que não se parecem com nenhuma opção
+    :return: Dicionário {resposta: opção classificada} com cada resposta distinta
+    """
+    classificacao = {}
+    fora_da_lista = []
+    for texto in dict.fromkeys(textos):
+        if texto in opcoes_validas:
+            classificacao[texto] = texto
+        else:
+            fora_da_lista.append(texto)
+
+    if fora_da_lista:
+        opcoes = obter_normalizador(opcoes_validas).normalizar(fora_da_lista)
+        classificacao.update((texto, opcao or opcao_outra) for texto, opcao in zip(fora_da_lista, opcoes))
+    return classificacao
+
+
+def classificar_frequencia(texto):
+    return classificar_opcoes([texto], frequencias_validas, 'Outra')[texto]
+
+
+def classificar_eficiencia(texto):
+    return classificar_opcoes([texto], eficiencias_validas, 'Nenhuma das opções acima')[texto]
+
+
+def classificar_respostas(valores_frequencia, valores_eficiencia):
+    """
+    --> Função para classificar as respostas de frequência e de eficiência nas opções esperadas
+    :param valores_frequencia: Lista com as frequências coletadas
+    :param valores_eficiencia: Lista com as respostas de eficiência (opções separadas por ';')
+    :return: Tupla com as frequências classificadas e as opções de eficiência classificadas
+    """
+    # Aplica a classificação na lista de frequências coletadas (uma única normalização para todo o lote)
+    classificacao_frequencia = classificar_opcoes(valores_frequencia, frequencias_validas, 'Outra')
+    valores_frequencia_classificados = [classificacao_frequencia[texto] for texto in valores_frequencia]
+
+    # Separa as opções individuais de eficiência e classifica cada uma delas (cada opção é contada no máximo uma
+    # vez por resposta, mesmo quando duas opções digitadas caem na mesma categoria)
+    opcoes_respostas = [processar_multipla_escolha([resposta]) for resposta in valores_eficiencia]
+    classificacao_eficiencia = classificar_opcoes([opcao for opcoes in opcoes_respostas for opcao in opcoes],
+                                                  eficiencias_validas, 'Nenhuma das opções acima')
+    valores_eficiencia_classificadas = []
+    for opcoes in opcoes_respostas:
+        valores_eficiencia_classificadas.extend(dict.fromkeys(classificacao_eficiencia[opcao] for opcao in opcoes))
+
+    return valores_frequencia_classificados, valores_eficiencia_classificadas
+
+
+def contar_respostas(valores_idade, valores_frequencia_classificados, valores_produtividade,
+                     valores_eficiencia_classificadas):
+    """
+    --> Função para contar as respostas de cada pergunta
+    :return: Dicionário com um Counter para cada pergunta (idade, frequencia, produtividade e eficiencia)
+    """
+    return {
+        'idade': Counter(valores_idade),
+        'frequencia': Counter(valores_frequencia_classificados),
+        'produtividade': Counter(valores_produtividade),
+        'eficiencia': Counter(valores_eficiencia_classificadas),
+    }
+
+
+def codificar_opcoes(valores, opcoes_validas):
+    """
+    --> Função para converter as respostas em códigos inteiros de forma vetorizada
+    (índice da opção em opcoes_validas e len(opcoes_validas) para qualquer outra resposta). Respostas
+    digitadas com pequenas diferenças de uma opção recebem o código dela (ver normalizacao.py)
+    :param valores: Series com as respostas (sem células vazias)
+    :param opcoes_validas: Lista com as opções esperadas
+    :return: Array de códigos inteiros
+    """
+    # Classifica apenas os valores distintos e depois espalha os códigos para todas as respostas
+    codigos_valores, valores_distintos = pd.factorize(valores)
+    indice_opcoes = pd.Index(opcoes_validas)
+    codigos_distintos = indice_opcoes.get_indexer(valores_distintos)
+
+    # Somente os valores distintos fora da lista passam pelo normalizador (com cache, quase sempre já conhecidos)
+    fora_da_lista = np.flatnonzero(codigos_distintos == -1)
+    if len(fora_da_lista):
+        opcoes = obter_normalizador(opcoes_validas).normalizar(valores_distintos[fora_da_lista].tolist())
+        codigos_distintos[fora_da_lista] = [len(opcoes_validas) if opcao is None else indice_opcoes.get_loc(opcao)
+                                            for opcao in opcoes]
+    return codigos_distintos[codigos_valores]
+
+
+def separar_multipla_escolha(valores):
+    """
+    --> Versão vetorizada de processar_multipla_escolha: divide as respostas por ';' e
+    devolve as opções individuais (sem espaços nas pontas e sem opções vazias)
+    :param valores: Series com as respostas de múltipla escolha
+    :return: Series com uma opção por linha (o índice aponta para a resposta de origem)
+    """
+    # Valores que não são texto viram NaN no .str e são descartados, como na versão original
+    opcoes = valores.str.split(';').explode().str.strip()
+    return opcoes[opcoes.notna() & (opcoes != '')]
+
+
+def _contagem_por_codigo(codigos, categorias, pesos=None):
+    """
+    --> Função para contar os códigos com np.bincount, mantendo as categorias na ordem em que
+    aparecem pela primeira vez nos dados (a mesma ordem de um Counter)
+    :param codigos: Array de códigos inteiros
+    :param categorias: Categoria correspondente a cada código
+    :param pesos: Quantidade de vezes que cada código deve ser contado (valor padrão: 1)
+    """
+    contagem = np.bincount(codigos, weights=pesos, minlength=len(categorias))
+    # pd.unique devolve os códigos na ordem da primeira ocorrência
+    return Counter({categorias[codigo]: int(contagem[codigo]) for codigo in pd.unique(codigos)})
+
+
+def _contagem_por_valor(valores):
+    """
+    --> Função para contar valores quaisquer (ex.: faixas etárias) de forma vetorizada
+    :param valores: Series com os valores (sem células vazias)
+    """
+    codigos, categorias = pd.factorize(valores)
+    return _contagem_por_codigo(codigos, categorias.tolist())
+
+
+def _contagem_multipla_escolha(valores, opcoes_validas, opcao_outros):
+    """
+    --> Função para contar as opções individuais das respostas de múltipla escolha. Cada resposta
+    distinta é dividida uma única vez e as suas opções são contadas pelo número de repetições dela.
+    Cada categoria é contada no máximo uma vez por resposta (como em RespostasCompactas e IndiceBitmap).
+    :param valores: Series com as respostas (sem células vazias)
+    :param opcoes_validas: Lista com as opções esperadas
+    :param opcao_outros: Nome usado para as opções fora da lista
+    """
+    codigos_valores, valores_distintos = pd.factorize(valores)
+    repeticoes = np.bincount(codigos_valores, minlength=len(valores_distintos))
+
+    # As respostas distintas estão na ordem em que aparecem, então a ordem das opções é preservada
+    opcoes = separar_multipla_escolha(pd.Series(valores_distintos, dtype=object))
+    codigos_opcoes = codificar_opcoes(opcoes, opcoes_validas)
+    origens = opcoes.index.to_numpy(dtype=np.int64)
+
+    # Remove as categorias repetidas dentro da mesma resposta (ex.: uma opção e a mesma opção digitada com erro,
+    # ou duas opções fora da lista), mantendo a ordem da primeira ocorrência
+    _, primeiras = np.unique(origens * (len(opcoes_validas) + 1) + codigos_opcoes, return_index=True)
+    primeiras.sort()
+    return _contagem_por_codigo(codigos_opcoes[primeiras], opcoes_validas + [opcao_outros],
+                                pesos=repeticoes[origens[primeiras]])
+
+
+def contar_respostas_tabela(df_respostas):
+    """
+    --> Versão vetorizada da classificação e da contagem das respostas: produz as mesmas
+    contagens de classificar_respostas + contar_respostas
+    :param df_respostas: DataFrame com as colunas idade, frequencia, produtividade e eficiencia
+    :return: Dicionário com um Counter para cada pergunta
+    """
+    frequencias = df_respostas['frequencia'].dropna()
+
+    return {
+        'idade': _contagem_por_valor(df_respostas['idade'].dropna()),
+        'frequencia': _contagem_por_codigo(codificar_opcoes(frequencias, frequencias_validas),
+                                           frequencias_validas + ['Outra']),
+        'produtividade': _contagem_por_valor(df_respostas['produtividade'].dropna().astype('int64')),
+        'eficiencia': _contagem_multipla_escolha(df_respostas['eficiencia'].dropna(), eficiencias_validas,
+                                                 'Nenhuma das opções acima'),
+    }
+
+
+def _ordenar_tabela(df, coluna, ordem):
+    """
+    --> Função para ordenar a tabela seguindo a ordem lógica das opções existentes nos dados
+    :param df: DataFrame com a contagem
+    :param coluna: Coluna com as opções
+    :param ordem: Ordem lógica das opções
+    """
+    # Filtra apenas as opções que existem nos dados
+    ordem_filtrada = [opcao for opcao in ordem if opcao in df[coluna].values]
+
+    # Ordena o DataFrame se houver opções válidas
+    if ordem_filtrada:
+        df[coluna] = pd.Categorical(df[coluna], categories=ordem_filtrada, ordered=True)
+        df = df.sort_values(coluna)
+    return df
+
+
+def _adicionar_percentual(df):
+    """
+    --> Função para adicionar a coluna de percentual à tabela de distribuição
+    :param df: DataFrame com a coluna Quantidade
+    """
+    total = df['Quantidade'].sum()
+    df['Percentual'] = df['Quantidade'].apply(lambda x: f"{(x / total * 100):.1f}%")
+    return df
+
+
+def montar_tabelas(contagens):
+    """
+    --> Função para montar as tabelas de distribuição (DataFrames) de cada seção do dashboard
+    :param contagens: Dicionário retornado por contar_respostas
+    :return: Dicionário com um DataFrame para cada pergunta
+    """
+    contagem_idades = contagens['idade']
+    df_idades = pd.DataFrame({
+        'Faixa Etária': list(contagem_idades.keys()),
+        'Quantidade': list(contagem_idades.values())
+    })
+    df_idades = _ordenar_tabela(df_idades, 'Faixa Etária', ordem_faixas)
+
+    contagem_frequencia = contagens['frequencia']
+    df_frequencia = pd.DataFrame({
+        'Frequência': list(contagem_frequencia.keys()),
+        'Quantidade': list(contagem_frequencia.values())
+    })
+    df_frequencia = _ordenar_tabela(df_frequencia, 'Frequência', ordem_frequencia)
+
+    # Ordena as classificações de produtividade de 1 a 5
+    contagem_produtividade = contagens['produtividade']
+    df_produtividade = pd.DataFrame({
+        'Produtividade': list(contagem_produtividade.keys()),
+        'Quantidade': list(contagem_produtividade.values())
+    })
+    df_produtividade['Produtividade'] = pd.Categorical(
+        df_produtividade['Produtividade'],
+        categories=ordem_produtividade,
+        ordered=True
+    )
+    df_produtividade = df_produtividade.sort_values('Quantidade')
+
+    contagem_eficiencia = contagens['eficiencia']
+    df_eficiencia = pd.DataFrame({
+        'Eficiência': list(contagem_eficiencia.keys()),
+        'Quantidade': list(contagem_eficiencia.values())
+    })
+    df_eficiencia = _ordenar_tabela(df_eficiencia, 'Eficiência', ordem_eficiencia)
+
+    return {
+        'idade': _adicionar_percentual(df_idades),
+        'frequencia': _adicionar_percentual(df_frequencia),
+        'produtividade': _adicionar_percentual(df_produtividade),
+        'eficiencia': _adicionar_percentual(df_eficiencia),
+    }
+
+
+def montar_tabela_comparacao(tabelas_fontes, pergunta, coluna):
+    """
+    --> Função para juntar as tabelas de distribuição de uma pergunta de várias planilhas (ondas da pesquisa)
+    :param tabelas_fontes: Dicionário {nome da planilha: dicionário retornado por montar_tabelas}
+    :param pergunta: Chave da pergunta (ex.: 'idade')
+    :param coluna: Coluna com as opções (ex.: 'Faixa Etária')
+    :return: DataFrame com as colunas Onda, opção, Quantidade e Percentual (numérico, para comparar ondas
+    com quantidades diferentes de respostas)
+    """
+    partes = []
+    for nome, tabelas in tabelas_fontes.items():
+        df = tabelas[pergunta][[coluna, 'Quantidade']].copy()
+        df[coluna] = df[coluna].astype(str)
+        df['Percentual'] = (df['Quantidade'] / df['Quantidade'].sum() * 100).round(1)
+        df.insert(0, 'Onda', nome)
+        partes.append(df)
+    return pd.concat(partes, ignore_index=True)
+
+
+def _moda(df, coluna):
+    """
+    --> Função para obter a opção mais comum da tabela e o seu percentual
+    :param df: DataFrame com a coluna Quantidade
+    :param coluna: Coluna com as opções
+    """
+    mais_comum = df.loc[df['Quantidade'].idxmax(), coluna]
+    percentual = (df['Quantidade'].max() / df['Quantidade'].sum()) * 100
+    return mais_comum, percentual
+
+
+def calcular_metricas(tabelas, contagens):
+    """
+    --> Função para calcular as métricas exibidas em cada seção do dashboard
+    :param tabelas: Dicionário retornado por montar_tabelas
+    :param contagens: Dicionário retornado por contar_respostas
+    """
+    df_idades = tabelas['idade']
+    total_respostas = df_idades['Quantidade'].sum()
+    faixa_mais_comum, percentual_maior = _moda(df_idades, 'Faixa Etária')
+
+    # Calcular a média ponderada das idades
+    soma_ponderada = 0
+    for i, row in df_idades.iterrows():
+        faixa = row['Faixa Etária']
+        if faixa in valores_medios:
+            soma_ponderada += valores_medios[faixa] * row['Quantidade']
+    media_ponderada = soma_ponderada / total_respostas
+
+    freq_mais_comum, percentual_maior_freq = _moda(tabelas['frequencia'], 'Frequência')
+    efic_mais_comum, percentual_maior_efic = _moda(tabelas['eficiencia'], 'Eficiência')
+
+    # Calcula a média geral de produtividade
+    contagem_produtividade = contagens['produtividade']
+    media_produtividade = (sum(nota * quantidade for nota, quantidade in contagem_produtividade.items())
+                           / sum(contagem_produtividade.values()))
+
+    return {
+        'total_respostas': total_respostas,
+        'faixa_mais_comum': faixa_mais_comum,
+        'percentual_faixa_mais_comum': percentual_maior,
+        'media_idade': media_ponderada,
+        'frequencia_mais_comum': freq_mais_comum,
+        'percentual_frequencia_mais_comum': percentual_maior_freq,
+        'media_produtividade': media_produtividade,
+        'eficiencia_mais_comum': efic_mais_comum,
+        'percentual_eficiencia_mais_comum': percentual_maior_efic,
+    }
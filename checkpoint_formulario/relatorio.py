@@ -0,0 +1,322 @@
+"""
+Relatório do dashboard em um único arquivo HTML, gerado sem o Streamlit (para o cron ou a CI, em máquinas sem
+navegador).
+
+Usa as mesmas etapas do dashboard (cache colunar, contagens incrementais e instantâneo agregado) e escreve, para
+cada seção, a tabela de distribuição, as métricas e os quatro tipos de gráfico, além do cruzamento das respostas,
+das tendências semanais e da comparação entre as ondas. Os gráficos de todas as seções são criados ao mesmo tempo
+em processos separados e o plotly.js vai embutido no arquivo (abre sem internet).
+
+Uso:
+    python relatorio.py --saida relatorio.html
+    python relatorio.py --fontes fontes.json --saida relatorio.html --baixar
+    python relatorio.py --processos 1 --plotlyjs cdn    (sem processos extras, com o plotly.js da CDN)
+"""
+import os
+import sys
+import html
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from fontes import CAMINHO_FONTES, MAXIMO_PARALELO, carregar_fontes, versao_fontes
+from instantaneo import InstantaneoAgregado
+from graficos import (criar_grafico, criar_grafico_comparacao, criar_mapa_calor, criar_grafico_respostas_periodo,
+                      criar_grafico_tendencia, tipos_grafico)
+from tendencias import perguntas_tendencia
+from processamento import montar_tabela_comparacao
+from tabulacao_cruzada import (dimensoes, tabela_contingencia, produtividade_por_grupo, teste_qui_quadrado,
+                               percentual_por_linha)
+
+# Arquivo gerado quando --saida não é informado
+CAMINHO_RELATORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "relatorio.html")
+
+# Seções do relatório (as mesmas do dashboard): (chave das tabelas, cabeçalho, coluna, título do gráfico,
+# título do eixo x, título do treemap e métricas exibidas como (rótulo, chave das métricas, formato))
+secoes_relatorio = [
+    ('idade', "⏳ Idade", 'Faixa Etária', "Distribuição por Faixa Etária", "Faixa Etária", None, [
+        ("Faixa Etária Mais Comum (Moda)", 'faixa_mais_comum', "{}"),
+        ("Representação da Faixa Mais Comum", 'percentual_faixa_mais_comum', "{:.1f}%"),
+        ("Média de Idade (estimada)", 'media_idade', "{:.1f} anos"),
+    ]),
+    ('frequencia', "🏠 Frequência de Trabalho Remoto", 'Frequência', "Distribuição por Frequência de Trabalho Remoto",
+     "Frequência de Trabalho Remoto", None, [
+         ("Frequência Mais Comum", 'frequencia_mais_comum', "{}"),
+         ("Representação", 'percentual_frequencia_mais_comum', "{:.1f}%"),
+     ]),
+    ('produtividade', "📈 Produtividade", 'Produtividade', "Distribuição de Produtividade", "Classificação", None, [
+        ("Média de Produtividade", 'media_produtividade', "{:.1f}"),
+    ]),
+    ('eficiencia', "💪🏻 Aspectos da Eficiência", 'Eficiência', "Distribuição por Eficiência de Trabalho Remoto",
+     "Eficiência", "Distribuição por Eficiência", [
+         ("Frequência Mais Comum", 'eficiencia_mais_comum', "{}"),
+         ("Representação", 'percentual_eficiencia_mais_comum', "{:.1f}%"),
+     ]),
+]
+
+# Cruzamento exibido no relatório (o mesmo que o dashboard abre por padrão)
+DIMENSOES_CRUZAMENTO = ['idade', 'frequencia']
+COLUNA_CRUZAMENTO = 'produtividade'
+
+# Tendências exibidas no relatório: período e janela móvel (em períodos)
+PERIODO_TENDENCIAS = "Semana"
+JANELA_TENDENCIAS = 4
+
+# Perguntas da comparação entre as ondas: (chave das tabelas, coluna, nome da pergunta, título do eixo x)
+perguntas_comparacao = [
+    ('idade', 'Faixa Etária', "Idade", "Faixa Etária"),
+    ('frequencia', 'Frequência', "Frequência", "Frequência de Trabalho Remoto"),
+    ('produtividade', 'Produtividade', "Produtividade", "Classificação"),
+    ('eficiencia', 'Eficiência', "Eficiência", "Eficiência"),
+]
+
+ESTILO = """
+body { font-family: "Source Sans Pro", Arial, sans-serif; margin: 2rem auto; max-width: 1400px; color: #262730; }
+h1 { margin-bottom: 0; }
+section { border-top: 1px solid #ddd; margin-top: 2rem; padding-top: 1rem; }
+.colunas { display: grid; grid-template-columns: 2fr 3fr; gap: 2rem; align-items: start; }
+.graficos { display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; }
+.metricas { display: flex; flex-wrap: wrap; gap: 2rem; margin: 1rem 0; }
+.metrica span { display: block; font-size: 0.85rem; color: #666; }
+.metrica strong { font-size: 1.6rem; font-weight: 400; }
+table { border-collapse: collapse; font-size: 0.9rem; }
+th, td { border: 1px solid #e6e6e6; padding: 0.3rem 0.6rem; text-align: left; }
+th { background: #f7f7f9; }
+.nota { font-size: 0.85rem; color: #666; }
+"""
+
+
+def _figura_html(criar, *args, **kwargs):
+    """
+    --> Função (executada em um processo separado) para criar um gráfico e convertê-lo em HTML
+    :param criar: Função de graficos.py que cria a figura
+    :return: Trecho HTML com a <div> e o script do gráfico (sem o plotly.js)
+    """
+    return criar(*args, **kwargs).to_html(full_html=False, include_plotlyjs=False)
+
+
+def _pedidos_graficos(instantaneo):
+    """
+    --> Função para listar os gráficos do relatório
+    :param instantaneo: Objeto InstantaneoAgregado
+    :return: Lista de tuplas (identificador, função, argumentos)
+    """
+    pedidos = []
+    for chave, _, coluna, titulo, titulo_eixo_x, titulo_treemap, _ in secoes_relatorio:
+        pedidos.extend(((chave, tipo), criar_grafico,
+                        (instantaneo.tabelas[chave], coluna, tipo, titulo, titulo_eixo_x, titulo_treemap))
+                       for tipo in tipos_grafico)
+
+    nomes_grupo = [dimensoes[dimensao] for dimensao in DIMENSOES_CRUZAMENTO]
+    df_medias = produtividade_por_grupo(instantaneo.respostas, DIMENSOES_CRUZAMENTO)
+    pedidos.append((('cruzamento', 'medias'), criar_mapa_calor,
+                    (df_medias, nomes_grupo[0], nomes_grupo[1], 'Média',
+                     f"Média de Produtividade por {' x '.join(nomes_grupo)}", "Média")))
+
+    tendencias = instantaneo.tendencias
+    if not tendencias.vazio:
+        pedidos.append((('tendencias', 'respostas'), criar_grafico_respostas_periodo,
+                        (tendencias.respostas_por_periodo(PERIODO_TENDENCIAS, JANELA_TENDENCIAS),
+                         f"Respostas Recebidas por {PERIODO_TENDENCIAS}")))
+        for pergunta, coluna in perguntas_tendencia.items():
+            pedidos.append((('tendencias', pergunta), criar_grafico_tendencia,
+                            (tendencias.distribuicao(pergunta, PERIODO_TENDENCIAS, JANELA_TENDENCIAS), coluna,
+                             f"{coluna} por {PERIODO_TENDENCIAS} (janela móvel de {JANELA_TENDENCIAS})")))
+
+    if instantaneo.tabelas_fontes:
+        for chave, coluna, pergunta, titulo_eixo_x in perguntas_comparacao:
+            pedidos.append((('comparacao', chave), criar_grafico_comparacao,
+                            (montar_tabela_comparacao(instantaneo.tabelas_fontes, chave, coluna), coluna,
+                             f"{pergunta} por Onda da Pesquisa", titulo_eixo_x)))
+    return pedidos
+
+
+def criar_graficos(pedidos, processos=MAXIMO_PARALELO):
+    """
+    --> Função para criar os gráficos de todas as seções ao mesmo tempo em processos separados
+    (a criação das figuras e a conversão para JSON são limitadas pelo GIL)
+    :param pedidos: Lista retornada por _pedidos_graficos
+    :param processos: Quantidade máxima de processos (1 cria os gráficos no processo atual)
+    :return: Dicionário {identificador: trecho HTML do gráfico}
+    """
+    if processos <= 1 or len(pedidos) == 1:
+        return {identificador: _figura_html(criar, *argumentos) for identificador, criar, argumentos in pedidos}
+
+    # O primeiro gráfico é criado antes dos processos: a primeira figura do Plotly carrega os validadores e
+    # o template (~0,2 s), e os processos criados com fork já começam com eles carregados
+    (identificador, criar, argumentos), *restantes = pedidos
+    graficos = {identificador: _figura_html(criar, *argumentos)}
+
+    with ProcessPoolExecutor(max_workers=min(processos, len(restantes))) as executor:
+        futuros = {identificador: executor.submit(_figura_html, criar, *argumentos)
+                   for identificador, criar, argumentos in restantes}
+        graficos.update((identificador, futuro.result()) for identificador, futuro in futuros.items())
+    return graficos
+
+
+def _tabela_html(df):
+    """
+    --> Função para converter um DataFrame em uma tabela HTML
+    :param df: DataFrame exibido
+    """
+    return df.to_html(index=False, border=0, na_rep="-")
+
+
+def _metricas_html(metricas):
+    """
+    --> Função para montar o bloco de métricas
+    :param metricas: Lista de tuplas (rótulo, valor já formatado)
+    """
+    itens = "".join(f'<div class="metrica"><span>{html.escape(rotulo)}</span><strong>{html.escape(valor)}</strong>'
+                    f'</div>' for rotulo, valor in metricas)
+    return f'<div class="metricas">{itens}</div>'
+
+
+def _secao_cruzamento(instantaneo, graficos):
+    """
+    --> Função para montar a seção do cruzamento das respostas (médias por grupo, contingência e qui-quadrado)
+    :param instantaneo: Objeto InstantaneoAgregado
+    :param graficos: Dicionário retornado por criar_graficos
+    """
+    df_medias = produtividade_por_grupo(instantaneo.respostas, DIMENSOES_CRUZAMENTO)
+    tabela = tabela_contingencia(instantaneo.respostas, DIMENSOES_CRUZAMENTO, COLUNA_CRUZAMENTO)
+    tabela_exibida = percentual_por_linha(tabela).rename(columns=str).reset_index()
+
+    partes = ['<section><h2>🔀 Cruzamento das Respostas</h2>', graficos[('cruzamento', 'medias')],
+              '<details><summary>Médias por grupo</summary>', _tabela_html(df_medias), '</details>',
+              f'<h3>Tabela de Contingência ({html.escape(dimensoes[COLUNA_CRUZAMENTO])}, % por linha)</h3>',
+              _tabela_html(tabela_exibida)]
+
+    resultado = teste_qui_quadrado(tabela)
+    if resultado is not None:
+        partes.append(_metricas_html([
+            ("Qui-quadrado", f"{resultado['qui_quadrado']:.1f} ({resultado['graus_liberdade']} graus de liberdade)"),
+            ("p-valor", f"{resultado['p_valor']:.4f}"),
+            ("V de Cramér", f"{resultado['v_cramer']:.3f}"),
+        ]))
+        if resultado['percentual_esperado_baixo'] > 20:
+            partes.append(f'<p class="nota">⚠️ {resultado["percentual_esperado_baixo"]:.0f}% das células têm '
+                          f'frequência esperada menor que 5: o resultado do teste pode não ser confiável.</p>')
+    partes.append('</section>')
+    return "".join(partes)
+
+
+def montar_relatorio(instantaneo, graficos, plotlyjs="embutido"):
+    """
+    --> Função para montar o documento HTML do relatório
+    :param instantaneo: Objeto InstantaneoAgregado
+    :param graficos: Dicionário retornado por criar_graficos
+    :param plotlyjs: "embutido" (arquivo independente) ou "cdn" (arquivo menor, precisa de internet)
+    :return: Texto do HTML
+    """
+    if plotlyjs == "cdn":
+        import plotly
+        script_plotly = f'<script src="https://cdn.plot.ly/plotly-{plotly.__version__}.min.js"></script>'
+    else:
+        from plotly.offline import get_plotlyjs
+        script_plotly = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+
+    partes = [
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">',
+        '<title>Relatório - Trabalho Remoto</title>', f'<style>{ESTILO}</style>', script_plotly, '</head><body>',
+        '<h1>📊 Relatório Trabalho Remoto</h1>',
+        f'<p class="nota">Gerado em {datetime.now():%d/%m/%Y %H:%M:%S} · Planilhas: '
+        f'{html.escape(", ".join(instantaneo.nomes_fontes))} · Versão: {html.escape(instantaneo.versao)}</p>',
+        f'<h2>Total de Respostas: {instantaneo.metricas["total_respostas"]}</h2>',
+    ]
+
+    for chave, cabecalho, _, _, _, _, metricas in secoes_relatorio:
+        partes += [
+            f'<section><h2>{html.escape(cabecalho)}</h2><div class="colunas"><div>',
+            '<h3>Tabela de Distribuição</h3>', _tabela_html(instantaneo.tabelas[chave]),
+            '<h3>Métricas</h3>',
+            _metricas_html([(rotulo, formato.format(instantaneo.metricas[chave_metrica]))
+                            for rotulo, chave_metrica, formato in metricas]),
+            '</div><div class="graficos">',
+            *(graficos[(chave, tipo)] for tipo in tipos_grafico),
+            '</div></div></section>',
+        ]
+
+    partes.append(_secao_cruzamento(instantaneo, graficos))
+
+    if not instantaneo.tendencias.vazio:
+        partes.append('<section><h2>📅 Tendências ao Longo do Tempo</h2>')
+        partes.append(graficos[('tendencias', 'respostas')])
+        partes.append('<div class="graficos">')
+        partes += [graficos[('tendencias', pergunta)] for pergunta in perguntas_tendencia]
+        partes.append('</div>')
+        if instantaneo.tendencias.sem_data:
+            partes.append(f'<p class="nota">{instantaneo.tendencias.sem_data} respostas sem a hora de conclusão não '
+                          f'aparecem nas tendências.</p>')
+        partes.append('</section>')
+
+    if instantaneo.tabelas_fontes:
+        partes.append('<section><h2>🌊 Comparação entre as Ondas da Pesquisa</h2><div class="graficos">')
+        partes += [graficos[('comparacao', chave)] for chave, _, _, _ in perguntas_comparacao]
+        partes.append('</div></section>')
+
+    partes.append('</body></html>')
+    return "\n".join(partes)
+
+
+def gerar_relatorio(fontes, caminho_saida=CAMINHO_RELATORIO, processos=MAXIMO_PARALELO, plotlyjs="embutido"):
+    """
+    --> Função para gerar o relatório HTML das planilhas disponíveis
+    :param fontes: Lista de planilhas retornada por fontes.carregar_fontes
+    :param caminho_saida: Caminho do arquivo HTML
+    :param processos: Quantidade máxima de processos usados nos gráficos
+    :param plotlyjs: "embutido" ou "cdn"
+    :return: Dicionário com o tempo (em segundos) de cada etapa
+    """
+    fontes_disponiveis = [fonte for fonte in fontes if os.path.exists(fonte["arquivo"])]
+    if not fontes_disponiveis:
+        raise FileNotFoundError("Nenhuma planilha encontrada: baixe as planilhas antes (--baixar)")
+
+    tempos = {}
+    inicio = time.perf_counter()
+    instantaneo = InstantaneoAgregado(versao_fontes(fontes_disponiveis), fontes_disponiveis)
+    if instantaneo.vazio:
+        raise ValueError("As planilhas não têm respostas para todas as perguntas")
+    tempos["leitura e agregação"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    graficos = criar_graficos(_pedidos_graficos(instantaneo), processos)
+    tempos["gráficos"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    documento = montar_relatorio(instantaneo, graficos, plotlyjs)
+    with open(caminho_saida, "w", encoding="utf-8") as f:
+        f.write(documento)
+    tempos["montagem do HTML"] = time.perf_counter() - inicio
+    return tempos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório HTML do dashboard (sem o Streamlit)")
+    parser.add_argument("--saida", default=CAMINHO_RELATORIO, help="Arquivo HTML gerado")
+    parser.add_argument("--fontes", default=CAMINHO_FONTES, help="Arquivo de configuração das planilhas")
+    parser.add_argument("--baixar", action="store_true", help="Baixa as planilhas alteradas antes do relatório")
+    parser.add_argument("--processos", type=int, default=MAXIMO_PARALELO,
+                        help="Processos usados nos gráficos (1 = sem processos extras)")
+    parser.add_argument("--plotlyjs", choices=["embutido", "cdn"], default="embutido",
+                        help="Embute o plotly.js no arquivo ou usa a CDN")
+    argumentos = parser.parse_args()
+
+    fontes_relatorio = carregar_fontes(argumentos.fontes)
+    if argumentos.baixar:
+        # Mesma atualização executada em segundo plano pelo dashboard (credenciais no .env)
+        from agendador import AtualizadorPlanilha
+        atualizador = AtualizadorPlanilha(fontes_relatorio)
+        atualizador.atualizar()
+        if atualizador.ultimo_erro is not None:
+            print(f"Erro ao baixar as planilhas: {atualizador.ultimo_erro}", file=sys.stderr)
+
+    try:
+        tempos_etapas = gerar_relatorio(fontes_relatorio, argumentos.saida, argumentos.processos, argumentos.plotlyjs)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Erro ao gerar o relatório: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for etapa, tempo in tempos_etapas.items():
+        print(f"{etapa}: {tempo:.2f} s")
+    print(f'Relatório gerado: "{argumentos.saida}"')
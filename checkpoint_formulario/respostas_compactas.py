@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+from collections import Counter
+from processamento import (frequencias_validas, eficiencias_validas, ordem_faixas, codificar_opcoes,
+                           separar_multipla_escolha)
+
+# Código usado para respostas em branco nas colunas de escolha única
+CODIGO_AUSENTE = 255
+
+# Bits do byte de eficiência: bits 0 a 5 são as opções de eficiencias_validas,
+# o bit 6 indica alguma opção fora da lista ("Outra") e o bit 7 indica que a pergunta foi respondida
+BIT_OUTRA = 1 << len(eficiencias_validas)
+BIT_RESPONDIDA = 1 << 7
+
+# Categorias de cada coluna de escolha única (o código é o índice na lista)
+categorias_frequencia = frequencias_validas + ['Outra']
+categorias_eficiencia = eficiencias_validas + ['Nenhuma das opções acima']
+
+# Tabela com os bits ligados de cada valor possível de um byte (256 x 8), usada na contagem
+bits_por_byte = ((np.arange(256)[:, None] >> np.arange(8)) & 1).astype(np.int64)
+
+
+def _codificar_coluna(valores, categorias):
+    """
+    --> Função para converter uma coluna de escolha única em códigos uint8
+    :param valores: Series com as respostas (pode conter células vazias)
+    :param categorias: Lista de categorias conhecidas (o índice é o código)
+    """
+    codigos = np.full(len(valores), CODIGO_AUSENTE, dtype=np.uint8)
+    preenchidos = valores.notna().to_numpy()
+    codigos[preenchidos] = pd.Index(categorias).get_indexer(valores[preenchidos])
+    return codigos
+
+
+def _codificar_eficiencia(valores):
+    """
+    --> Função para converter as respostas de eficiência (opções separadas por ';') em um byte por resposta
+    :param valores: Series com as respostas (pode conter células vazias)
+    """
+    mascaras = np.zeros(len(valores), dtype=np.uint8)
+    preenchidos = valores.notna().to_numpy()
+
+    # Cada resposta distinta é dividida uma única vez e a máscara dela é espalhada para as repetições
+    codigos_valores, valores_distintos = pd.factorize(valores[preenchidos])
+    opcoes = separar_multipla_escolha(pd.Series(valores_distintos, dtype=object))
+    mascaras_distintas = np.full(len(valores_distintos), BIT_RESPONDIDA, dtype=np.uint8)
+    np.bitwise_or.at(mascaras_distintas, opcoes.index.to_numpy(dtype=np.int64),
+                     np.left_shift(1, codificar_opcoes(opcoes, eficiencias_validas)).astype(np.uint8))
+
+    mascaras[preenchidos] = mascaras_distintas[codigos_valores]
+    return mascaras
+
+
+class RespostasCompactas:
+    """
+    --> Classe com a tabela de respostas compactada: uma linha por respondente, com um byte por pergunta
+    (códigos uint8 nas perguntas de escolha única e uma máscara de bits nas opções de eficiência)
+    """
+
+    def __init__(self, idade, frequencia, produtividade, eficiencia, categorias_idade):
+        """
+        :param idade: Códigos das faixas etárias (índice em categorias_idade)
+        :param frequencia: Códigos das frequências (índice em categorias_frequencia)
+        :param produtividade: Notas de produtividade
+        :param eficiencia: Máscaras de bits das opções de eficiência
+        :param categorias_idade: Faixas etárias correspondentes aos códigos de idade
+        """
+        self.idade = idade
+        self.frequencia = frequencia
+        self.produtividade = produtividade
+        self.eficiencia = eficiencia
+        self.categorias_idade = categorias_idade
+
+    @classmethod
+    def de_tabela(cls, df_respostas):
+        """
+        --> Função para compactar a tabela de respostas
+        :param df_respostas: DataFrame com as colunas idade, frequencia, produtividade e eficiencia
+        """
+        # Faixas etárias conhecidas primeiro e depois qualquer outro valor encontrado na planilha
+        idades_encontradas = pd.unique(df_respostas['idade'].dropna())
+        categorias_idade = ordem_faixas + [idade for idade in idades_encontradas if idade not in ordem_faixas]
+        if len(categorias_idade) >= CODIGO_AUSENTE:
+            raise ValueError("Quantidade de faixas etárias distintas excede o limite de um byte")
+
+        # Frequências fora da lista recebem o código de "Outra"
+        frequencia = np.full(len(df_respostas), CODIGO_AUSENTE, dtype=np.uint8)
+        frequencias_preenchidas = df_respostas['frequencia'].notna().to_numpy()
+        frequencia[frequencias_preenchidas] = codificar_opcoes(
+            df_respostas['frequencia'][frequencias_preenchidas], frequencias_validas)
+
+        # Notas fora do intervalo de um byte são tratadas como ausentes
+        notas = df_respostas['produtividade'].astype('float64').to_numpy()
+        notas_validas = ~np.isnan(notas) & (notas >= 0) & (notas < CODIGO_AUSENTE)
+        produtividade = np.full(len(df_respostas), CODIGO_AUSENTE, dtype=np.uint8)
+        produtividade[notas_validas] = notas[notas_validas]
+
+        return cls(
+            idade=_codificar_coluna(df_respostas['idade'], categorias_idade),
+            frequencia=frequencia,
+            produtividade=produtividade,
+            eficiencia=_codificar_eficiencia(df_respostas['eficiencia']),
+            categorias_idade=categorias_idade,
+        )
+
+    def __len__(self):
+        return len(self.idade)
+
+    @property
+    def nbytes(self):
+        """
+        --> Memória ocupada pelas colunas compactadas (em bytes)
+        """
+        return self.idade.nbytes + self.frequencia.nbytes + self.produtividade.nbytes + self.eficiencia.nbytes
+
+    def filtrar(self, mascara):
+        """
+        --> Função para obter apenas os respondentes selecionados
+        :param mascara: Array booleano (ou de índices) com os respondentes selecionados
+        """
+        return RespostasCompactas(self.idade[mascara], self.frequencia[mascara], self.produtividade[mascara],
+                                  self.eficiencia[mascara], self.categorias_idade)
+
+    @staticmethod
+    def _contar_codigos(codigos, categorias):
+        """
+        --> Função para contar os códigos de uma coluna de escolha única (ignorando respostas em branco)
+        :param codigos: Array de códigos uint8
+        :param categorias: Categoria correspondente a cada código
+        """
+        contagem = np.bincount(codigos, minlength=256)
+        return Counter({categoria: int(contagem[codigo]) for codigo, categoria in enumerate(categorias)
+                        if contagem[codigo]})
+
+    def contar_bits_eficiencia(self):
+        """
+        --> Função para contar quantos respondentes marcaram cada bit da máscara de eficiência
+        (conta os 256 valores possíveis do byte e soma os bits ligados de cada valor)
+        :return: Array com a contagem dos 8 bits
+        """
+        return np.bincount(self.eficiencia, minlength=256) @ bits_por_byte
+
+    def contagens(self):
+        """
+        --> Função para contar as respostas de cada pergunta diretamente nos arrays compactados.
+        Na eficiência cada opção é contada no máximo uma vez por respondente.
+        :return: Dicionário com um Counter para cada pergunta (mesmo formato de contar_respostas_tabela)
+        """
+        contagem_notas = np.bincount(self.produtividade, minlength=256)
+        contagem_bits = self.contar_bits_eficiencia()
+        return {
+            'idade': self._contar_codigos(self.idade, self.categorias_idade),
+            'frequencia': self._contar_codigos(self.frequencia, categorias_frequencia),
+            'produtividade': Counter({nota: int(contagem_notas[nota]) for nota in range(CODIGO_AUSENTE)
+                                      if contagem_notas[nota]}),
+            'eficiencia': Counter({categoria: int(contagem_bits[bit]) for bit, categoria in
+                                   enumerate(categorias_eficiencia) if contagem_bits[bit]}),
+        }
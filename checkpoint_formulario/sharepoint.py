@@ -0,0 +1,375 @@
+import os
+import ssl
+import json
+import time
+import zlib
+import hashlib
+import zipfile
+import threading
+import urllib3
+import requests
+from requests.adapters import HTTPAdapter
+from shareplum import Office365
+
+# URL da Planilha do Excel no Sharepoint atualizada pelo Microsoft Forms
+# (podem ser substituídas por variáveis de ambiente, ex.: para usar um servidor local de testes)
+sharepoint_url = os.getenv("SHAREPOINT_URL", "https://fiapcom-my.sharepoint.com")
+site_url = os.getenv("SHAREPOINT_SITE_URL", "https://fiapcom-my.sharepoint.com/personal/rm554497_fiap_com_br")
+
+# Caminho do Arquivo dentro do Sharepoint
+caminho_arquivo = "Documents/Impacto do Trabalho Remoto na Eficiência do Trabalhador.xlsx"
+
+# Tempo de validade dos cookies de autenticação quando o SharePoint não informa a expiração
+VALIDADE_AUTENTICACAO_MINUTOS = float(os.getenv("VALIDADE_AUTENTICACAO_MINUTOS", "60"))
+
+# Tamanho de cada bloco gravado em disco durante o download e quantidade de tentativas (retomadas)
+TAMANHO_BLOCO_DOWNLOAD = 64 * 1024
+
+# Quantidade de bytes lidos da conexão por vez (em uma queda de conexão, apenas a leitura em andamento é perdida;
+# o que já foi recebido é gravado e o download é retomado a partir dali)
+TAMANHO_LEITURA_DOWNLOAD = 8 * 1024
+TENTATIVAS_DOWNLOAD = int(os.getenv("TENTATIVAS_DOWNLOAD", "3"))
+
+# Situações possíveis ao sincronizar a planilha
+BAIXADO = "baixado"
+INALTERADO = "inalterado"
+
+
+def configurar_ssl():
+    """
+    --> Função para aplicar as configurações do certificado SSL (Firewall da FIAP)
+    """
+    urllib3.disable_warnings()  # Desabilita os avisos do certificado SSL
+    ssl._create_default_https_context = ssl._create_unverified_context  # Criando um contexto que não verifica a certificação SSL
+
+
+def autenticar(usuario, senha):
+    """
+    --> Função para realizar a autenticação no Microsoft 365
+    :param usuario: Usuário do Microsoft 365
+    :param senha: Senha do Microsoft 365
+    :return: Cookies de autenticação
+    """
+    return Office365(sharepoint_url, username=usuario, password=senha).GetCookies()
+
+
+class SessaoSharePoint:
+    """
+    --> Classe que mantém uma sessão autenticada no SharePoint: guarda os cookies de autenticação até
+    expirarem, reaproveita as conexões HTTP (keep-alive) entre as requisições e só autentica novamente
+    quando os cookies expiram ou o servidor responde 401/403
+    """
+
+    def __init__(self, usuario, senha, url_site=None, autenticador=autenticar,
+                 validade_minutos=VALIDADE_AUTENTICACAO_MINUTOS):
+        """
+        :param usuario: Usuário do Microsoft 365
+        :param senha: Senha do Microsoft 365
+        :param url_site: URL do site (valor padrão: site_url)
+        :param autenticador: Função (usuario, senha) que devolve os cookies de autenticação
+        (valor padrão: autenticar, ou seja, login do Office365)
+        :param validade_minutos: Validade dos cookies que não informam a expiração
+        """
+        self.usuario = usuario
+        self.senha = senha
+        self.url_site = url_site or site_url
+        self.autenticador = autenticador
+        self.validade_minutos = validade_minutos
+        self.quantidade_autenticacoes = 0
+        self._expira_em = 0
+        self._trava = threading.Lock()
+
+        # Conexões reaproveitadas entre as chamadas de pasta e de arquivo
+        self._sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self._sessao.mount("https://", adaptador)
+        self._sessao.mount("http://", adaptador)
+
+    def autenticar(self, autenticacoes_vistas=None):
+        """
+        --> Função para autenticar novamente (substitui os cookies da sessão)
+        :param autenticacoes_vistas: Valor de quantidade_autenticacoes visto por quem pediu a autenticação;
+        se outra thread já autenticou desde então, os cookies novos são reaproveitados (valor padrão: None)
+        """
+        with self._trava:
+            if autenticacoes_vistas is not None and autenticacoes_vistas != self.quantidade_autenticacoes:
+                return
+            cookies = self.autenticador(self.usuario, self.senha)
+            self._sessao.cookies.clear()
+            self._sessao.cookies.update(cookies)
+            self.quantidade_autenticacoes += 1
+
+            # Usa a expiração informada nos cookies (a menor delas) ou a validade padrão
+            expiracoes = [cookie.expires for cookie in self._sessao.cookies if cookie.expires]
+            self._expira_em = min(expiracoes + [time.time() + self.validade_minutos * 60])
+
+    def autenticado(self):
+        """
+        --> Função para verificar se a sessão possui cookies de autenticação ainda válidos
+        """
+        return time.time() < self._expira_em
+
+    def get(self, url, **kwargs):
+        """
+        --> Função para fazer uma requisição GET autenticada (autentica novamente uma única vez em caso de 401/403)
+        :param url: URL requisitada
+        :param kwargs: Parâmetros repassados ao requests (ex.: headers, timeout, stream)
+        :return: Resposta do requests
+        """
+        # Várias threads podem usar a mesma sessão (downloads simultâneos): apenas uma delas autentica
+        autenticacoes_vistas = self.quantidade_autenticacoes
+        if not self.autenticado():
+            self.autenticar(autenticacoes_vistas)
+
+        autenticacoes_vistas = self.quantidade_autenticacoes
+        resposta = self._sessao.get(url, **kwargs)
+        if resposta.status_code in (401, 403):
+            # Cookies revogados ou expirados antes do previsto
+            resposta.close()
+            self.autenticar(autenticacoes_vistas)
+            resposta = self._sessao.get(url, **kwargs)
+        return resposta
+
+    def fechar(self):
+        """
+        --> Função para encerrar as conexões abertas
+        """
+        self._sessao.close()
+
+
+class DownloadInvalido(Exception):
+    """
+    --> Exceção para arquivos baixados que não passam na verificação (tamanho ou conteúdo do .xlsx)
+    """
+
+
+def url_arquivo(caminho=caminho_arquivo, url_site=None):
+    """
+    --> Função para montar a URL da API REST do SharePoint para o arquivo
+    (os mesmos endpoints usados pelo shareplum em Folder.get_file)
+    :param caminho: Caminho do arquivo dentro do SharePoint ("Pasta/arquivo.xlsx")
+    :param url_site: URL do site (valor padrão: site_url)
+    """
+    pasta, nome_arquivo = caminho.rsplit('/', 1)
+    return f"{url_site or site_url}/_api/web/GetFolderByServerRelativeUrl('{pasta}')/Files('{nome_arquivo}')"
+
+
+def obter_metadados_remotos(sessao, caminho=caminho_arquivo, url_site=None):
+    """
+    --> Função para consultar a versão do arquivo no SharePoint sem baixar o seu conteúdo
+    :param sessao: Objeto SessaoSharePoint
+    :param caminho: Caminho do arquivo dentro do SharePoint
+    :param url_site: URL do site (valor padrão: o site da sessão)
+    :return: Dicionário com o ETag, a data de modificação e o tamanho do arquivo
+    """
+    resposta = sessao.get(url_arquivo(caminho, url_site or sessao.url_site),
+                          headers={"Accept": "application/json;odata=verbose"}, timeout=30)
+    resposta.raise_for_status()
+    dados = resposta.json()["d"]
+    return {
+        "etag": dados.get("ETag") or dados.get("__metadata", {}).get("etag"),
+        "modificado": dados.get("TimeLastModified"),
+        "tamanho": int(dados["Length"]) if dados.get("Length") is not None else None,
+    }
+
+
+def _caminho_metadados(caminho_planilha):
+    """
+    --> Função para obter o caminho do arquivo com os metadados da cópia local da planilha
+    :param caminho_planilha: Caminho da planilha local
+    """
+    return f"{caminho_planilha}.json"
+
+
+def ler_metadados_locais(caminho_planilha):
+    """
+    --> Função para ler os metadados do SharePoint salvos no último download
+    :param caminho_planilha: Caminho da planilha local
+    :return: Dicionário com os metadados ou None se não houver download anterior
+    """
+    if not os.path.exists(caminho_planilha) or not os.path.exists(_caminho_metadados(caminho_planilha)):
+        return None
+    try:
+        with open(_caminho_metadados(caminho_planilha), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def salvar_metadados_locais(caminho_planilha, metadados):
+    """
+    --> Função para salvar os metadados do SharePoint junto à cópia local da planilha
+    :param caminho_planilha: Caminho da planilha local
+    :param metadados: Dicionário com os metadados
+    """
+    caminho_metadados = _caminho_metadados(caminho_planilha)
+    with open(f"{caminho_metadados}.tmp", "w", encoding="utf-8") as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=2)
+    os.replace(f"{caminho_metadados}.tmp", caminho_metadados)
+
+
+def arquivo_inalterado(metadados_locais, metadados_remotos):
+    """
+    --> Função para verificar se a cópia local corresponde à versão atual do SharePoint
+    (compara o ETag e, na falta dele, a data de modificação e o tamanho)
+    :param metadados_locais: Metadados salvos no último download
+    :param metadados_remotos: Metadados atuais do SharePoint
+    """
+    if not metadados_locais:
+        return False
+    if metadados_locais.get("etag") and metadados_remotos.get("etag"):
+        return metadados_locais["etag"] == metadados_remotos["etag"]
+    return (metadados_remotos.get("modificado") is not None
+            and metadados_locais.get("modificado") == metadados_remotos.get("modificado")
+            and metadados_locais.get("tamanho") == metadados_remotos.get("tamanho"))
+
+
+def _caminho_parcial(caminho_destino):
+    """
+    --> Função para obter o caminho do download em andamento (mantém a extensão, exigida pelo openpyxl
+    caso o arquivo seja lido antes de substituir a planilha)
+    :param caminho_destino: Caminho da planilha local
+    """
+    nome_base, extensao = os.path.splitext(caminho_destino)
+    return f"{nome_base}.parcial{extensao}"
+
+
+def _remover_download_parcial(caminho_parcial):
+    """
+    --> Função para remover um download parcial e os seus metadados
+    :param caminho_parcial: Caminho do download parcial
+    """
+    for caminho in (caminho_parcial, _caminho_metadados(caminho_parcial)):
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+
+def _sincronizar_diretorio(diretorio):
+    """
+    --> Função para gravar em disco a renomeação de um arquivo (fsync do diretório, quando suportado)
+    :param diretorio: Diretório do arquivo renomeado
+    """
+    if os.name == "nt":
+        return  # O Windows não permite abrir diretórios para fsync
+    descritor = os.open(diretorio or ".", os.O_RDONLY)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+
+def baixar_arquivo(sessao, caminho_parcial, metadados_remotos, caminho=caminho_arquivo, url_site=None,
+                   tentativas=TENTATIVAS_DOWNLOAD, tamanho_bloco=TAMANHO_BLOCO_DOWNLOAD):
+    """
+    --> Função para baixar o arquivo em blocos para o disco (memória limitada ao tamanho do bloco),
+    retomando downloads interrompidos com requisições HTTP Range
+    :param sessao: Objeto SessaoSharePoint
+    :param caminho_parcial: Caminho onde o arquivo é gravado durante o download
+    :param metadados_remotos: Metadados da versão que está sendo baixada (ETag, data e tamanho)
+    :param caminho: Caminho do arquivo dentro do SharePoint
+    :param url_site: URL do site (valor padrão: o site da sessão)
+    :param tentativas: Quantidade de tentativas em caso de falha de conexão (valor padrão: TENTATIVAS_DOWNLOAD)
+    :param tamanho_bloco: Quantidade de bytes gravados em disco por vez (valor padrão: 64 KB; a conexão é lida
+    em trechos de TAMANHO_LEITURA_DOWNLOAD)
+    """
+    # Só retoma um download parcial da mesma versão do arquivo
+    if os.path.exists(caminho_parcial) and not arquivo_inalterado(ler_metadados_locais(caminho_parcial),
+                                                                   metadados_remotos):
+        _remover_download_parcial(caminho_parcial)
+    salvar_metadados_locais(caminho_parcial, metadados_remotos)
+
+    url = f"{url_arquivo(caminho, url_site or sessao.url_site)}/$value"
+    for tentativa in range(1, tentativas + 1):
+        inicio = os.path.getsize(caminho_parcial) if os.path.exists(caminho_parcial) else 0
+        cabecalhos = {}
+        if inicio:
+            cabecalhos["Range"] = f"bytes={inicio}-"
+            # Se o arquivo mudou no SharePoint, o servidor devolve o arquivo inteiro (200) em vez do trecho
+            if metadados_remotos.get("etag"):
+                cabecalhos["If-Range"] = metadados_remotos["etag"]
+
+        try:
+            with sessao.get(url, headers=cabecalhos, stream=True, timeout=120) as resposta:
+                # O trecho pedido começa no fim do arquivo: o download anterior já estava completo
+                if resposta.status_code == 416 and inicio == metadados_remotos.get("tamanho"):
+                    return
+                resposta.raise_for_status()
+
+                continuar = (resposta.status_code == 206
+                             and resposta.headers.get("Content-Range", "").startswith(f"bytes {inicio}-"))
+                with open(caminho_parcial, "ab" if continuar else "wb", buffering=tamanho_bloco) as f:
+                    try:
+                        for trecho in resposta.iter_content(min(TAMANHO_LEITURA_DOWNLOAD, tamanho_bloco)):
+                            f.write(trecho)
+                    finally:
+                        # Grava o que já foi recebido mesmo quando a conexão cai (a retomada começa depois dele)
+                        f.flush()
+                        os.fsync(f.fileno())
+            return
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            if tentativa == tentativas:
+                raise
+            print(f"Download interrompido ({e}). Retomando (tentativa {tentativa + 1} de {tentativas})...")
+
+
+def verificar_arquivo(caminho_arquivo_baixado, tamanho_esperado=None):
+    """
+    --> Função para verificar o arquivo baixado antes de ele substituir a planilha
+    (tamanho informado pelo SharePoint e integridade do .xlsx, que é um arquivo zip com CRC de cada parte)
+    :param caminho_arquivo_baixado: Caminho do arquivo baixado
+    :param tamanho_esperado: Tamanho informado pelo SharePoint (None para não verificar)
+    :return: Hash SHA-256 do arquivo
+    """
+    tamanho = os.path.getsize(caminho_arquivo_baixado)
+    if tamanho_esperado is not None and tamanho != tamanho_esperado:
+        raise DownloadInvalido(f"Tamanho do arquivo baixado ({tamanho} bytes) diferente do informado pelo "
+                               f"SharePoint ({tamanho_esperado} bytes)")
+
+    try:
+        with zipfile.ZipFile(caminho_arquivo_baixado) as arquivo_zip:
+            parte_corrompida = arquivo_zip.testzip()
+    except (zipfile.BadZipFile, zlib.error) as e:
+        raise DownloadInvalido(f"O arquivo baixado não é uma planilha válida: {e}")
+    if parte_corrompida is not None:
+        raise DownloadInvalido(f"O arquivo baixado está corrompido ({parte_corrompida})")
+
+    sha256 = hashlib.sha256()
+    with open(caminho_arquivo_baixado, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO_DOWNLOAD), b""):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def sincronizar_planilha(caminho_destino, sessao, caminho=caminho_arquivo, preparar=None, url_site=None):
+    """
+    --> Função para baixar a planilha do SharePoint somente se ela mudou desde o último download
+    :param caminho_destino: Caminho onde a planilha deve ser salva
+    :param sessao: Objeto SessaoSharePoint (autenticada sob demanda)
+    :param caminho: Caminho do arquivo dentro do SharePoint
+    :param preparar: Função opcional chamada com o caminho do arquivo baixado antes de ele substituir
+    a planilha atual (ex.: para gerar o cache da nova versão)
+    :param url_site: URL do site (valor padrão: o site da sessão)
+    :return: BAIXADO ou INALTERADO
+    """
+    # Consulta apenas os metadados (ETag / data de modificação) antes de baixar
+    metadados_remotos = obter_metadados_remotos(sessao, caminho, url_site)
+    if arquivo_inalterado(ler_metadados_locais(caminho_destino), metadados_remotos):
+        return INALTERADO
+
+    # Baixa para um arquivo parcial, verifica e só depois substitui a planilha de uma vez
+    # (leitores nunca veem um arquivo pela metade)
+    # (em caso de falha de conexão, o arquivo parcial é mantido para ser retomado na próxima sincronização)
+    caminho_parcial = _caminho_parcial(caminho_destino)
+    baixar_arquivo(sessao, caminho_parcial, metadados_remotos, caminho, url_site)
+
+    try:
+        metadados_remotos["sha256"] = verificar_arquivo(caminho_parcial, metadados_remotos.get("tamanho"))
+        if preparar is not None:
+            preparar(caminho_parcial)
+        os.replace(caminho_parcial, caminho_destino)
+        _sincronizar_diretorio(os.path.dirname(caminho_destino))
+    finally:
+        _remover_download_parcial(caminho_parcial)
+    salvar_metadados_locais(caminho_destino, metadados_remotos)
+
+    return BAIXADO
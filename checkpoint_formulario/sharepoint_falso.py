@@ -0,0 +1,256 @@
+"""
+Servidor HTTP local que imita os endpoints de arquivo do SharePoint usados pelo dashboard,
+para testar o download sem acessar o Microsoft 365.
+
+Uso:
+    python sharepoint_falso.py --pasta ./arquivos_teste --porta 8000 --exigir-autenticacao
+
+Cada arquivo em --pasta é servido como "Documents/<nome do arquivo>". Com --exigir-autenticacao, as
+requisições precisam do cookie FedAuth emitido em POST /_forms/default.aspx (a mesma etapa final do
+login do shareplum) e recebem 403 quando o cookie expira ou é revogado. Nos testes, use
+SessaoSharePoint(..., url_site=<servidor>/personal/teste, autenticador=autenticador_local(<servidor>)).
+O conteúdo aceita requisições Range/If-Range e --interromper-apos simula quedas de conexão no download.
+"""
+import os
+import re
+import json
+import uuid
+import time
+import argparse
+import threading
+import requests
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Endpoints da API REST: .../GetFolderByServerRelativeUrl('<pasta>')/Files('<arquivo>')[/$value]
+padrao_endpoint = re.compile(r"/_api/web/GetFolderByServerRelativeUrl\('(?P<pasta>[^']+)'\)"
+                             r"/Files\('(?P<arquivo>[^']+)'\)(?P<conteudo>/\$value)?$")
+
+
+class ManipuladorSharePoint(BaseHTTPRequestHandler):
+    """
+    --> Manipulador das requisições de login, de metadados e de conteúdo dos arquivos
+    """
+    # HTTP/1.1 mantém a conexão aberta entre as requisições (keep-alive), como o SharePoint
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        if self.server.exibir_log:
+            super().log_message(formato, *args)
+
+    def setup(self):
+        super().setup()
+        with self.server.trava:
+            self.server.estatisticas["conexoes"] += 1
+
+    def _autenticado(self):
+        """
+        --> Função para verificar se a requisição possui um cookie FedAuth válido
+        """
+        if not self.server.exigir_autenticacao:
+            return True
+        cookies = SimpleCookie(self.headers.get("Cookie", ""))
+        token = cookies["FedAuth"].value if "FedAuth" in cookies else None
+        with self.server.trava:
+            expiracao = self.server.tokens.get(token)
+        return expiracao is not None and time.time() < expiracao
+
+    def do_POST(self):
+        # Última etapa do login do Office365: troca o token de segurança pelos cookies de autenticação
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.startswith("/_forms/default.aspx"):
+            self.send_error(404, "Endpoint não encontrado")
+            return
+
+        token = uuid.uuid4().hex
+        with self.server.trava:
+            self.server.tokens[token] = time.time() + self.server.validade_cookie
+            self.server.estatisticas["autenticacoes"] += 1
+
+        self.send_response(200)
+        self.send_header("Set-Cookie", f"FedAuth={token}; Path=/; HttpOnly")
+        self.send_header("Set-Cookie", f"rtFa={uuid.uuid4().hex}; Path=/; HttpOnly")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _localizar_arquivo(self):
+        """
+        --> Função para localizar o arquivo local correspondente à URL requisitada
+        :return: Tupla (caminho do arquivo, requisição de conteúdo) ou (None, False)
+        """
+        correspondencia = padrao_endpoint.search(unquote(self.path))
+        if not correspondencia:
+            return None, False
+        caminho = os.path.join(self.server.pasta_arquivos, os.path.basename(correspondencia.group("arquivo")))
+        if not os.path.isfile(caminho):
+            return None, False
+        return caminho, correspondencia.group("conteudo") is not None
+
+    def _metadados(self, caminho):
+        """
+        --> Função para montar os metadados do arquivo no formato OData do SharePoint
+        :param caminho: Caminho do arquivo local
+        """
+        info = os.stat(caminho)
+        etag = f'"{{{info.st_mtime_ns:x}}},{info.st_size}"'
+        modificado = datetime.fromtimestamp(info.st_mtime, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {"d": {
+            "__metadata": {"etag": etag},
+            "ETag": etag,
+            "Name": os.path.basename(caminho),
+            "Length": str(info.st_size),
+            "TimeLastModified": modificado,
+        }}
+
+    def do_GET(self):
+        with self.server.trava:
+            self.server.estatisticas["requisicoes"] += 1
+        if not self._autenticado():
+            self.send_error(403, "Cookie de autenticação ausente ou expirado")
+            return
+
+        caminho, conteudo = self._localizar_arquivo()
+        if caminho is None:
+            self.send_error(404, "Arquivo não encontrado")
+            return
+
+        if conteudo:
+            self._enviar_conteudo(caminho)
+            return
+
+        corpo = json.dumps(self._metadados(caminho)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json;odata=verbose")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _enviar_conteudo(self, caminho, tamanho_bloco=64 * 1024):
+        """
+        --> Função para enviar o conteúdo do arquivo, inteiro ou apenas o trecho pedido no cabeçalho Range
+        (respeitando o If-Range) e, se configurado, interrompendo a conexão no meio da transferência
+        :param caminho: Caminho do arquivo local
+        :param tamanho_bloco: Quantidade de bytes enviados por vez
+        """
+        tamanho = os.path.getsize(caminho)
+        inicio, fim, status = 0, tamanho - 1, 200
+
+        intervalo = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        etag = self._metadados(caminho)["d"]["ETag"]
+        if intervalo and self.headers.get("If-Range", etag) == etag:
+            inicio = int(intervalo.group(1))
+            fim = min(int(intervalo.group(2)), tamanho - 1) if intervalo.group(2) else tamanho - 1
+            if inicio >= tamanho:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{tamanho}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(fim - inicio + 1))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{tamanho}")
+        self.end_headers()
+
+        # Simula uma queda de conexão nas primeiras respostas (interrupcoes)
+        limite = None
+        with self.server.trava:
+            if self.server.interrupcoes > 0 and self.server.interromper_apos is not None:
+                self.server.interrupcoes -= 1
+                limite = self.server.interromper_apos
+
+        restante = fim - inicio + 1 if limite is None else min(limite, fim - inicio + 1)
+        with open(caminho, "rb") as f:
+            f.seek(inicio)
+            while restante > 0:
+                bloco = f.read(min(tamanho_bloco, restante))
+                self.wfile.write(bloco)
+                restante -= len(bloco)
+                with self.server.trava:
+                    self.server.estatisticas["bytes_enviados"] += len(bloco)
+
+        if limite is not None:
+            self.close_connection = True
+
+
+class ServidorSharePointFalso(ThreadingHTTPServer):
+    """
+    --> Servidor local com os arquivos, os cookies emitidos e a contagem de conexões, logins e requisições
+    """
+    daemon_threads = True
+
+    def __init__(self, endereco, pasta_arquivos, exigir_autenticacao=False, validade_cookie=3600, exibir_log=True,
+                 interromper_apos=None, interrupcoes=1):
+        """
+        :param endereco: Tupla (host, porta)
+        :param pasta_arquivos: Pasta com os arquivos servidos como "Documents/<arquivo>"
+        :param exigir_autenticacao: Exige o cookie FedAuth nas requisições GET
+        :param validade_cookie: Validade dos cookies emitidos em segundos
+        :param exibir_log: Exibe cada requisição no terminal
+        :param interromper_apos: Fecha a conexão após enviar essa quantidade de bytes do arquivo (None não interrompe)
+        :param interrupcoes: Quantidade de downloads interrompidos
+        """
+        super().__init__(endereco, ManipuladorSharePoint)
+        self.pasta_arquivos = pasta_arquivos
+        self.exigir_autenticacao = exigir_autenticacao
+        self.validade_cookie = validade_cookie
+        self.exibir_log = exibir_log
+        self.tokens = {}
+        self.interromper_apos = interromper_apos
+        self.interrupcoes = interrupcoes
+        self.estatisticas = {"conexoes": 0, "autenticacoes": 0, "requisicoes": 0, "bytes_enviados": 0}
+        self.trava = threading.Lock()
+
+    def revogar_cookies(self):
+        """
+        --> Função para invalidar todos os cookies emitidos (as próximas requisições recebem 403)
+        """
+        with self.trava:
+            self.tokens.clear()
+
+
+def iniciar_servidor(pasta_arquivos, porta=8000, host="127.0.0.1", **opcoes):
+    """
+    --> Função para criar o servidor local (use serve_forever() para atender as requisições)
+    :param pasta_arquivos: Pasta com os arquivos servidos como "Documents/<arquivo>"
+    :param porta: Porta do servidor (0 escolhe uma porta livre)
+    :param host: Endereço do servidor
+    :param opcoes: Opções repassadas ao ServidorSharePointFalso (ex.: exigir_autenticacao=True)
+    """
+    return ServidorSharePointFalso((host, porta), pasta_arquivos, **opcoes)
+
+
+def autenticador_local(url_servidor):
+    """
+    --> Função para criar um autenticador (usado pela SessaoSharePoint) que faz login no servidor local
+    :param url_servidor: URL do servidor local (ex.: http://127.0.0.1:8000)
+    """
+    def autenticar(usuario, senha):
+        resposta = requests.post(f"{url_servidor}/_forms/default.aspx?wa=wsignin1.0",
+                                 data=f"token de {usuario}", timeout=30)
+        resposta.raise_for_status()
+        return resposta.cookies
+    return autenticar
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita os endpoints de arquivo do SharePoint")
+    parser.add_argument("--pasta", default=".", help="Pasta com os arquivos servidos")
+    parser.add_argument("--porta", type=int, default=8000, help="Porta do servidor")
+    parser.add_argument("--exigir-autenticacao", action="store_true", help="Exige o cookie FedAuth nas requisições")
+    parser.add_argument("--validade-cookie", type=int, default=3600, help="Validade dos cookies em segundos")
+    parser.add_argument("--interromper-apos", type=int, help="Interrompe os downloads após essa quantidade de bytes")
+    parser.add_argument("--interrupcoes", type=int, default=1, help="Quantidade de downloads interrompidos")
+    argumentos = parser.parse_args()
+
+    servidor = iniciar_servidor(argumentos.pasta, argumentos.porta, exigir_autenticacao=argumentos.exigir_autenticacao,
+                                validade_cookie=argumentos.validade_cookie, interromper_apos=argumentos.interromper_apos,
+                                interrupcoes=argumentos.interrupcoes)
+    print(f"SharePoint local em http://127.0.0.1:{servidor.server_address[1]}/personal/teste")
+    servidor.serve_forever()
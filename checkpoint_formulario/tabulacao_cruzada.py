@@ -0,0 +1,194 @@
+import math
+import numpy as np
+import pandas as pd
+from respostas_compactas import CODIGO_AUSENTE, BIT_RESPONDIDA, categorias_frequencia, categorias_eficiencia, \
+    bits_por_byte
+
+# Perguntas que podem ser cruzadas e o nome exibido de cada uma
+# (a eficiência é de múltipla escolha, então só pode ser usada nas colunas da tabela)
+dimensoes = {
+    'idade': 'Faixa Etária',
+    'frequencia': 'Frequência',
+    'produtividade': 'Produtividade',
+    'eficiencia': 'Eficiência',
+}
+
+# Valores possíveis das notas de produtividade (a nota é o próprio código)
+_notas = np.arange(CODIGO_AUSENTE)
+
+
+def _codigos_dimensao(respostas, dimensao):
+    """
+    --> Função para obter os códigos uint8 de uma pergunta de escolha única e as suas categorias
+    :param respostas: Objeto RespostasCompactas
+    :param dimensao: 'idade', 'frequencia' ou 'produtividade'
+    :return: Tupla (códigos, categorias); códigos maiores ou iguais a len(categorias) são respostas em branco
+    """
+    if dimensao == 'idade':
+        return respostas.idade, list(respostas.categorias_idade)
+    if dimensao == 'frequencia':
+        return respostas.frequencia, categorias_frequencia
+    if dimensao == 'produtividade':
+        return respostas.produtividade, _notas.tolist()
+    raise ValueError(f"A pergunta '{dimensao}' não pode ser usada para agrupar as respostas")
+
+
+def codificar_grupos(respostas, dimensoes_grupo):
+    """
+    --> Função para combinar os códigos de uma ou mais perguntas em um único código inteiro por respondente
+    (ex.: faixa etária x frequência vira idade * quantidade de frequências + frequência)
+    :param respostas: Objeto RespostasCompactas
+    :param dimensoes_grupo: Lista de perguntas de escolha única (ex.: ['idade', 'frequencia'])
+    :return: Tupla (códigos, grupos); o código len(grupos) indica respondentes com alguma resposta em branco
+    """
+    codigos = np.zeros(len(respostas), dtype=np.int64)
+    em_branco = np.zeros(len(respostas), dtype=bool)
+    grupos = [()]
+    for dimensao in dimensoes_grupo:
+        codigos_dimensao, categorias = _codigos_dimensao(respostas, dimensao)
+        em_branco |= codigos_dimensao >= len(categorias)
+        codigos = codigos * len(categorias) + codigos_dimensao
+        grupos = [grupo + (categoria,) for grupo in grupos for categoria in categorias]
+
+    codigos[em_branco] = len(grupos)
+    return codigos, grupos
+
+
+def _indice_grupos(grupos, dimensoes_grupo):
+    """
+    --> Função para criar o índice do DataFrame com os grupos (um nível para cada pergunta)
+    :param grupos: Lista de tuplas com a categoria de cada pergunta
+    :param dimensoes_grupo: Perguntas que formam os grupos
+    """
+    nomes = [dimensoes[dimensao] for dimensao in dimensoes_grupo]
+    if len(dimensoes_grupo) == 1:
+        return pd.Index([grupo[0] for grupo in grupos], name=nomes[0])
+    return pd.MultiIndex.from_tuples(grupos, names=nomes)
+
+
+def tabela_contingencia(respostas, dimensoes_grupo, dimensao_coluna):
+    """
+    --> Função para montar a tabela de contingência (quantidade de respondentes em cada combinação) com um
+    único np.bincount sobre os códigos combinados de grupo e coluna. Grupos e colunas sem respostas são removidos.
+    Na eficiência, cada respondente é contado em todas as opções que marcou.
+    :param respostas: Objeto RespostasCompactas
+    :param dimensoes_grupo: Perguntas das linhas (ex.: ['idade', 'frequencia'])
+    :param dimensao_coluna: Pergunta das colunas (ex.: 'produtividade' ou 'eficiencia')
+    :return: DataFrame com a quantidade de respondentes
+    """
+    codigos_grupo, grupos = codificar_grupos(respostas, dimensoes_grupo)
+    quantidade_grupos = len(grupos) + 1
+
+    if dimensao_coluna == 'eficiencia':
+        # Conta os 256 valores possíveis do byte por grupo e depois soma os bits ligados de cada valor
+        contagem = np.bincount(codigos_grupo * 256 + respostas.eficiencia,
+                               minlength=quantidade_grupos * 256).reshape(quantidade_grupos, 256)
+        # Somente respondentes que responderam à pergunta (bit 7 ligado)
+        contagem[:, :BIT_RESPONDIDA] = 0
+        tabela = (contagem @ bits_por_byte)[:-1, :len(categorias_eficiencia)]
+        categorias = categorias_eficiencia
+    else:
+        codigos_coluna, categorias = _codigos_dimensao(respostas, dimensao_coluna)
+        quantidade_colunas = len(categorias) + 1
+        codigos_coluna = np.minimum(codigos_coluna, len(categorias))
+        tabela = np.bincount(codigos_grupo * quantidade_colunas + codigos_coluna,
+                             minlength=quantidade_grupos * quantidade_colunas
+                             ).reshape(quantidade_grupos, quantidade_colunas)[:-1, :-1]
+
+    linhas = np.flatnonzero(tabela.sum(axis=1))
+    colunas = np.flatnonzero(tabela.sum(axis=0))
+    return pd.DataFrame(
+        tabela[np.ix_(linhas, colunas)],
+        index=_indice_grupos([grupos[linha] for linha in linhas], dimensoes_grupo),
+        columns=pd.Index([categorias[coluna] for coluna in colunas], name=dimensoes[dimensao_coluna])
+    )
+
+
+def produtividade_por_grupo(respostas, dimensoes_grupo):
+    """
+    --> Função para calcular a média da nota de produtividade (1 a 5) de cada grupo a partir do histograma das
+    notas por grupo (um único np.bincount), com desvio padrão e intervalo de confiança de 95% da média
+    :param respostas: Objeto RespostasCompactas
+    :param dimensoes_grupo: Perguntas que formam os grupos (ex.: ['idade', 'frequencia'])
+    :return: DataFrame com as colunas das perguntas, Respondentes, Média, Desvio Padrão e Margem IC 95%
+    """
+    codigos_grupo, grupos = codificar_grupos(respostas, dimensoes_grupo)
+    quantidade_grupos = len(grupos) + 1
+
+    histograma = np.bincount(codigos_grupo * 256 + respostas.produtividade,
+                             minlength=quantidade_grupos * 256).reshape(quantidade_grupos, 256)[:-1, :CODIGO_AUSENTE]
+    respondentes = histograma.sum(axis=1)
+    linhas = np.flatnonzero(respondentes)
+    histograma, respondentes = histograma[linhas], respondentes[linhas]
+
+    media = (histograma @ _notas) / respondentes
+    soma_quadrados = histograma @ (_notas ** 2) - respondentes * media ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        desvio = np.sqrt(np.maximum(soma_quadrados, 0) / (respondentes - 1))
+    margem = 1.96 * desvio / np.sqrt(respondentes)
+
+    df = pd.DataFrame({
+        'Respondentes': respondentes,
+        'Média': media.round(2),
+        'Desvio Padrão': desvio.round(2),
+        'Margem IC 95%': margem.round(2),
+    }, index=_indice_grupos([grupos[linha] for linha in linhas], dimensoes_grupo))
+    return df.reset_index()
+
+
+def _p_valor_qui_quadrado(estatistica, graus_liberdade):
+    """
+    --> Função para calcular P(X >= estatistica) da distribuição qui-quadrado (fórmula fechada da função gama
+    incompleta para graus de liberdade inteiros, sem depender do SciPy)
+    :param estatistica: Valor da estatística qui-quadrado
+    :param graus_liberdade: Graus de liberdade (inteiro positivo)
+    """
+    metade = estatistica / 2
+    if metade <= 0:
+        return 1.0
+
+    if graus_liberdade % 2 == 0:
+        # Soma de e^(-x) * x^i / i! para i = 0 .. k/2 - 1
+        termos = range(graus_liberdade // 2)
+        return min(1.0, sum(math.exp(-metade + i * math.log(metade) - math.lgamma(i + 1)) for i in termos))
+
+    # Graus ímpares: erfc(raiz de x) + soma de e^(-x) * x^(i - 1/2) / Γ(i + 1/2) para i = 1 .. (k - 1) / 2
+    termos = range(1, (graus_liberdade + 1) // 2)
+    return min(1.0, math.erfc(math.sqrt(metade)) + sum(
+        math.exp(-metade + (i - 0.5) * math.log(metade) - math.lgamma(i + 0.5)) for i in termos))
+
+
+def teste_qui_quadrado(tabela):
+    """
+    --> Função para testar a independência entre as linhas e as colunas da tabela de contingência
+    (teste qui-quadrado de Pearson e V de Cramér). Só é válido quando cada respondente aparece em uma única
+    coluna, ou seja, não se aplica à eficiência (múltipla escolha).
+    :param tabela: DataFrame retornado por tabela_contingencia (sem linhas ou colunas vazias)
+    :return: Dicionário com qui_quadrado, graus_liberdade, p_valor, v_cramer e percentual_esperado_baixo
+    (percentual de células com frequência esperada menor que 5, quando o teste perde a confiabilidade)
+    """
+    observado = tabela.to_numpy(dtype=np.float64)
+    total = observado.sum()
+    quantidade_linhas, quantidade_colunas = observado.shape
+    if total == 0 or quantidade_linhas < 2 or quantidade_colunas < 2:
+        return None
+
+    esperado = np.outer(observado.sum(axis=1), observado.sum(axis=0)) / total
+    estatistica = float(((observado - esperado) ** 2 / esperado).sum())
+    graus_liberdade = (quantidade_linhas - 1) * (quantidade_colunas - 1)
+
+    return {
+        'qui_quadrado': estatistica,
+        'graus_liberdade': graus_liberdade,
+        'p_valor': _p_valor_qui_quadrado(estatistica, graus_liberdade),
+        'v_cramer': math.sqrt(estatistica / (total * (min(quantidade_linhas, quantidade_colunas) - 1))),
+        'percentual_esperado_baixo': float((esperado < 5).mean() * 100),
+    }
+
+
+def percentual_por_linha(tabela):
+    """
+    --> Função para converter a tabela de contingência em percentuais de cada linha (grupo)
+    :param tabela: DataFrame retornado por tabela_contingencia
+    """
+    return (tabela.div(tabela.sum(axis=1), axis=0) * 100).round(1)
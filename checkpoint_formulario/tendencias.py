@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from processamento import ordem_faixas, ordem_frequencia, ordem_produtividade, ordem_eficiencia
+from respostas_compactas import (RespostasCompactas, CODIGO_AUSENTE, BIT_RESPONDIDA, categorias_frequencia,
+                                 categorias_eficiencia, bits_por_byte)
+
+# Perguntas acompanhadas ao longo do tempo e o nome exibido de cada uma
+perguntas_tendencia = {
+    'idade': "Faixa Etária",
+    'frequencia': "Frequência",
+    'produtividade': "Produtividade",
+    'eficiencia': "Eficiência",
+}
+
+# Períodos de agrupamento (semanas de segunda a domingo, identificadas pela segunda-feira)
+periodos_tendencia = {"Dia": "D", "Semana": "W-MON"}
+
+# Ordem de exibição das opções de cada pergunta
+_ordens = {
+    'idade': ordem_faixas,
+    'frequencia': ordem_frequencia,
+    'produtividade': ordem_produtividade,
+    'eficiencia': ordem_eficiencia,
+}
+
+
+def contar_por_dia(df_respostas):
+    """
+    --> Função para contar as respostas de cada pergunta por dia de conclusão, com um único np.bincount por
+    pergunta sobre os códigos combinados (dia x opção). Na eficiência cada opção é contada no máximo uma vez
+    por respondente, como em RespostasCompactas
+    :param df_respostas: DataFrame com as colunas idade, frequencia, produtividade, eficiencia e conclusao
+    :return: Tupla (dicionário {dia 'AAAA-MM-DD': contagens do dia}, quantidade de respostas sem data)
+    """
+    datas = pd.to_datetime(df_respostas['conclusao'])
+    com_data = datas.notna().to_numpy()
+    codigos_dia, dias = pd.factorize(datas[com_data].dt.normalize())
+    quantidade_dias = len(dias)
+    sem_data = int((~com_data).sum())
+    if quantidade_dias == 0:
+        return {}, sem_data
+
+    respostas = RespostasCompactas.de_tabela(df_respostas[com_data])
+    codigos_dia = codigos_dia.astype(np.int64) * 256
+
+    def contar(codigos):
+        return np.bincount(codigos_dia + codigos, minlength=quantidade_dias * 256).reshape(quantidade_dias, 256)
+
+    contagens = {
+        'idade': (contar(respostas.idade)[:, :len(respostas.categorias_idade)], respostas.categorias_idade),
+        'frequencia': (contar(respostas.frequencia)[:, :len(categorias_frequencia)], categorias_frequencia),
+        'produtividade': (contar(respostas.produtividade)[:, :CODIGO_AUSENTE], list(range(CODIGO_AUSENTE))),
+    }
+    # Eficiência: contagem dos valores do byte de cada dia convertida na contagem de cada bit
+    bytes_eficiencia = contar(respostas.eficiencia)
+    bytes_eficiencia[:, :BIT_RESPONDIDA] = 0
+    contagens['eficiencia'] = ((bytes_eficiencia @ bits_por_byte)[:, :len(categorias_eficiencia)],
+                               categorias_eficiencia)
+
+    quantidades = np.bincount(codigos_dia // 256, minlength=quantidade_dias)
+    buckets = {}
+    for indice, dia in enumerate(dias):
+        bucket = {'respostas': int(quantidades[indice])}
+        for pergunta, (contagem, categorias) in contagens.items():
+            linha = contagem[indice]
+            bucket[pergunta] = {categorias[codigo]: int(linha[codigo]) for codigo in np.flatnonzero(linha)}
+        buckets[f"{dia:%Y-%m-%d}"] = bucket
+    return buckets, sem_data
+
+
+def juntar_buckets(destino, novos):
+    """
+    --> Função para somar as contagens diárias novas às existentes (somente os dias recebidos são alterados,
+    normalmente apenas o último)
+    :param destino: Dicionário {dia: contagens do dia} alterado no lugar
+    :param novos: Dicionário {dia: contagens do dia} com as respostas novas
+    """
+    for dia, bucket in novos.items():
+        atual = destino.setdefault(dia, {'respostas': 0, **{pergunta: {} for pergunta in perguntas_tendencia}})
+        atual['respostas'] += bucket['respostas']
+        for pergunta in perguntas_tendencia:
+            contagem = atual[pergunta]
+            for opcao, quantidade in bucket[pergunta].items():
+                contagem[opcao] = contagem.get(opcao, 0) + quantidade
+    return destino
+
+
+class SeriesTemporais:
+    """
+    --> Classe com as séries diárias das respostas (quantidade por dia e contagem de cada opção por dia),
+    montadas a partir das contagens diárias mantidas pela agregação incremental. Semanas e médias móveis são
+    calculadas sobre os dias (poucas linhas), sem percorrer as respostas.
+    """
+
+    def __init__(self, buckets_fontes, sem_data=0):
+        """
+        :param buckets_fontes: Lista de dicionários {dia: contagens do dia} (um por planilha)
+        :param sem_data: Quantidade de respostas sem a hora de conclusão
+        """
+        buckets = {}
+        for buckets_fonte in buckets_fontes:
+            juntar_buckets(buckets, buckets_fonte)
+        dias = sorted(buckets)
+        indice = pd.DatetimeIndex(dias, name='Dia')
+
+        self.sem_data = sem_data
+        self.respostas = pd.Series([buckets[dia]['respostas'] for dia in dias], index=indice, dtype='int64')
+        self.distribuicoes = {}
+        for pergunta in perguntas_tendencia:
+            df = pd.DataFrame.from_records([buckets[dia][pergunta] for dia in dias], index=indice).fillna(0)
+            ordem = [opcao for opcao in _ordens[pergunta] if opcao in df.columns]
+            self.distribuicoes[pergunta] = df[ordem + [opcao for opcao in df.columns if opcao not in ordem]] \
+                .astype('int64')
+
+    @property
+    def vazio(self):
+        """
+        --> Indica se nenhuma resposta tem a hora de conclusão
+        """
+        return self.respostas.empty
+
+    @property
+    def nbytes(self):
+        """
+        --> Memória ocupada pelas séries (em bytes)
+        """
+        return int(self.respostas.memory_usage(deep=True)
+                   + sum(df.memory_usage(deep=True).sum() for df in self.distribuicoes.values()))
+
+    def respostas_por_periodo(self, periodo="Dia", janela=1):
+        """
+        --> Função para obter a quantidade de respostas recebidas em cada período (períodos sem respostas
+        aparecem com zero)
+        :param periodo: Um dos valores de periodos_tendencia
+        :param janela: Quantidade de períodos da média móvel
+        :return: DataFrame com as colunas Período, Respostas e Média Móvel
+        """
+        respostas = self.respostas.resample(periodos_tendencia[periodo], label='left', closed='left').sum()
+        return pd.DataFrame({
+            'Período': respostas.index,
+            'Respostas': respostas.to_numpy(),
+            'Média Móvel': respostas.rolling(janela, min_periods=1).mean().round(1).to_numpy(),
+        })
+
+    def distribuicao(self, pergunta, periodo="Dia", janela=1):
+        """
+        --> Função para obter a distribuição de uma pergunta em cada período, somando os últimos períodos da
+        janela (distribuição móvel). Na eficiência o percentual é sobre o total de marcações
+        :param pergunta: Uma das chaves de perguntas_tendencia
+        :param periodo: Um dos valores de periodos_tendencia
+        :param janela: Quantidade de períodos somados em cada ponto
+        :return: DataFrame com as colunas Período, nome da pergunta, Quantidade e Percentual (uma linha por opção)
+        """
+        contagens = self.distribuicoes[pergunta].resample(periodos_tendencia[periodo], label='left',
+                                                           closed='left').sum()
+        contagens = contagens.rolling(janela, min_periods=1).sum()
+        totais = contagens.sum(axis=1)
+        contagens = contagens[totais > 0]
+        percentuais = contagens.div(totais[totais > 0], axis=0) * 100
+
+        coluna = perguntas_tendencia[pergunta]
+        df = contagens.rename_axis(columns=coluna).stack().rename('Quantidade').reset_index()
+        df['Percentual'] = percentuais.stack().round(1).to_numpy()
+        return df.rename(columns={'Dia': 'Período'}).astype({'Quantidade': 'int64'})
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Os testes usam um cache temporário (não alteram o cache do dashboard) e importam os módulos da pasta do projeto
+os.environ["DIRETORIO_CACHE"] = tempfile.mkdtemp(prefix="testes_planilha_cache_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
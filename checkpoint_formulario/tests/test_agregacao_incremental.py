@@ -0,0 +1,72 @@
+import pyarrow as pa
+import pytest
+from agregacao_incremental import atualizar_estado, assinatura_linhas
+from processamento import contar_respostas_tabela
+
+QUANTIDADE = 1000
+
+
+def _tabela(quantidade=QUANTIDADE, produtividade_editada=None):
+    produtividade = [linha % 5 + 1 for linha in range(quantidade)]
+    if produtividade_editada is not None:
+        posicao, nota = produtividade_editada
+        produtividade[posicao] = nota
+    return pa.table({
+        'idade': [['18-24 anos', '25-34 anos', '35-44 anos'][linha % 3] for linha in range(quantidade)],
+        'frequencia': ['Trabalho 100% remoto'] * quantidade,
+        'produtividade': produtividade,
+        'eficiencia': ['Maior autonomia;'] * quantidade,
+        'conclusao': pa.array([None] * quantidade, pa.timestamp('s')),
+    })
+
+
+@pytest.fixture
+def caminho_estado(tmp_path):
+    return str(tmp_path / "agregado.json")
+
+
+def _contagens_completas(tabela):
+    return contar_respostas_tabela(tabela.to_pandas())
+
+
+def test_assinatura_nao_depende_da_divisao_das_linhas():
+    tabela = _tabela()
+    partes = (assinatura_linhas(tabela, 0, 300) + assinatura_linhas(tabela, 300, 700)) % 2 ** 64
+    assert partes == assinatura_linhas(tabela, 0, QUANTIDADE)
+
+
+def test_respostas_novas_sao_somadas(caminho_estado):
+    atualizar_estado(_tabela(QUANTIDADE - 100), caminho_estado)
+    estado = atualizar_estado(_tabela(), caminho_estado)
+    assert estado["linhas_processadas"] == QUANTIDADE
+    assert estado["contagens"] == _contagens_completas(_tabela())
+    assert estado["assinatura"] == assinatura_linhas(_tabela(), 0, QUANTIDADE)
+
+
+def test_exclusao_reconstroi_as_contagens(caminho_estado):
+    atualizar_estado(_tabela(), caminho_estado)
+    # Remove a primeira linha: todas as linhas seguintes mudam de posição
+    tabela = _tabela().slice(1)
+    assert atualizar_estado(tabela, caminho_estado)["contagens"] == _contagens_completas(tabela)
+
+
+def test_edicao_recente_reconstroi_as_contagens(caminho_estado):
+    atualizar_estado(_tabela(), caminho_estado)
+    tabela = _tabela(produtividade_editada=(QUANTIDADE - 10, 1))
+    assert atualizar_estado(tabela, caminho_estado)["contagens"] == _contagens_completas(tabela)
+
+
+def test_edicao_antiga_e_detectada_em_cada_nova_versao(caminho_estado):
+    atualizar_estado(_tabela(), caminho_estado, versao="v1")
+    # No mesmo processo, uma nova versão com a primeira resposta editada e respostas novas
+    tabela = _tabela(QUANTIDADE + 10, produtividade_editada=(0, 1))
+    assert atualizar_estado(tabela, caminho_estado, versao="v2")["contagens"] == _contagens_completas(tabela)
+
+    tabela = _tabela(QUANTIDADE + 10, produtividade_editada=(1, 1))
+    assert atualizar_estado(tabela, caminho_estado, versao="v3")["contagens"] == _contagens_completas(tabela)
+
+
+def test_mesma_versao_usa_o_estado_salvo(caminho_estado):
+    estado = atualizar_estado(_tabela(), caminho_estado, versao="v1")
+    # Com a mesma versão a tabela nem é conferida
+    assert atualizar_estado(_tabela(10), caminho_estado, versao="v1") == estado
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processamento import (classificar_respostas, contar_respostas, contar_respostas_tabela, ordem_faixas,
+                           frequencias_validas, eficiencias_validas)
+from respostas_compactas import RespostasCompactas
+from indice_bitmap import IndiceBitmap
+from tendencias import contar_por_dia
+
+# Respostas digitadas: variantes de opções (associadas pela normalização) e textos livres
+digitadas_frequencia = ["trabalho 100% remto", "Trabalho remoto às sextas"]
+digitadas_eficiencia = ["horarios flexiveis", "Maior autonmia", "Academia no horário", "Nenhuma"]
+
+
+@pytest.fixture(scope="module")
+def df_respostas():
+    gerador = np.random.default_rng(7)
+    quantidade = 2000
+    opcoes_eficiencia = eficiencias_validas + digitadas_eficiencia
+    eficiencia = [
+        ";".join(gerador.choice(opcoes_eficiencia, size=gerador.integers(1, 5))) + ";"
+        if gerador.random() > 0.05 else None
+        for _ in range(quantidade)
+    ]
+    return pd.DataFrame({
+        'idade': gerador.choice(ordem_faixas, size=quantidade),
+        'frequencia': gerador.choice(frequencias_validas + digitadas_frequencia, size=quantidade),
+        'produtividade': gerador.integers(1, 6, size=quantidade),
+        'eficiencia': eficiencia,
+        'conclusao': pd.Timestamp("2025-03-01") + pd.to_timedelta(gerador.integers(0, 60, size=quantidade),
+                                                                   unit="D"),
+    })
+
+
+def test_filtro_sem_efeito_nao_muda_as_contagens(df_respostas):
+    contagens = contar_respostas_tabela(df_respostas)
+    indice = IndiceBitmap.de_respostas(RespostasCompactas.de_tabela(df_respostas))
+
+    # Todas as faixas etárias selecionadas: a seleção é igual a todos os respondentes
+    selecao = indice.selecionar({'idade': indice.categorias['idade']})
+    assert indice.quantidade_selecionada(selecao) == len(df_respostas)
+    assert indice.contagens(selecao) == contagens
+    # Sem filtros (caminho usado pelo instantâneo do dashboard) as contagens são as mesmas
+    assert indice.contagens(None) == contagens
+
+
+def test_opcao_repetida_na_resposta_e_contada_uma_vez():
+    df = pd.DataFrame({
+        'idade': ['25-34 anos'],
+        'frequencia': ['Trabalho 100% remoto'],
+        'produtividade': [4],
+        'eficiencia': ["Maior autonomia;Maior autonmia;Academia;Nenhuma;"],
+    })
+    assert contar_respostas_tabela(df)['eficiencia'] == {'Maior autonomia': 1, 'Nenhuma das opções acima': 1}
+
+
+def test_todas_as_contagens_seguem_a_mesma_regra(df_respostas):
+    contagens = contar_respostas_tabela(df_respostas)
+    assert RespostasCompactas.de_tabela(df_respostas).contagens() == contagens
+
+    # Versão com listas (usada no benchmark)
+    frequencias, eficiencias = classificar_respostas(df_respostas['frequencia'].tolist(),
+                                                     df_respostas['eficiencia'].tolist())
+    assert contar_respostas(df_respostas['idade'].tolist(), frequencias, df_respostas['produtividade'].tolist(),
+                            eficiencias) == contagens
+
+    # Tendências: a soma das contagens diárias é igual às contagens totais
+    buckets, sem_data = contar_por_dia(df_respostas)
+    assert sem_data == 0
+    for pergunta in ('idade', 'frequencia', 'produtividade', 'eficiencia'):
+        total = pd.DataFrame.from_records([bucket[pergunta] for bucket in buckets.values()]).sum()
+        assert {opcao: int(quantidade) for opcao, quantidade in total.items()} == dict(contagens[pergunta])
+
+
+def test_contagens_de_um_intervalo_de_linhas(df_respostas):
+    indice = IndiceBitmap.de_respostas(RespostasCompactas.de_tabela(df_respostas))
+    # Ex.: a segunda planilha ocupa as linhas 700 a 1299 da tabela juntada
+    selecao = indice.selecionar_linhas(700, 1300)
+    assert indice.quantidade_selecionada(selecao) == 600
+    assert indice.contagens(selecao) == contar_respostas_tabela(df_respostas.iloc[700:1300])
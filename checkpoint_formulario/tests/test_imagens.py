@@ -0,0 +1,25 @@
+import io
+import os
+from PIL import Image
+import cache_planilha
+from imagens import otimizar_imagem, hash_arquivo
+
+
+def test_versao_otimizada_acompanha_a_imagem_original(tmp_path):
+    caminho_imagem = str(tmp_path / "cabecalho.png")
+    diretorio_cache = str(tmp_path / "cache")
+    Image.new("RGB", (1600, 400), "white").save(caminho_imagem)
+
+    with Image.open(io.BytesIO(otimizar_imagem(caminho_imagem, 800, 80, diretorio_cache))) as imagem:
+        assert (imagem.format, imagem.size) == ("WEBP", (800, 200))
+    variantes = os.listdir(os.path.join(diretorio_cache, "imagens"))
+    assert variantes == [f"cabecalho-800w-q80-{hash_arquivo(caminho_imagem)[:16]}.webp"]
+
+    # A chave não depende do cache das planilhas
+    assert not any(chave[0] == caminho_imagem for chave in cache_planilha._hashes_calculados)
+
+    # Original alterada: nova versão otimizada e a anterior é removida
+    Image.new("RGB", (1600, 400), "black").save(caminho_imagem)
+    otimizar_imagem(caminho_imagem, 800, 80, diretorio_cache)
+    assert os.listdir(os.path.join(diretorio_cache, "imagens")) == [
+        f"cabecalho-800w-q80-{hash_arquivo(caminho_imagem)[:16]}.webp"]
@@ -0,0 +1,49 @@
+import openpyxl
+import leitura_planilha
+from leitura_planilha import contar_linhas_preenchidas
+
+
+def _criar_planilha(caminho, quantidade_linhas, ultima_linha_formatada=None, linhas_formatadas=1):
+    objeto_workbook = openpyxl.Workbook()
+    objeto_planilha = objeto_workbook.active
+    objeto_planilha.append(["ID", "Hora de início", "Hora de conclusão"])
+    for numero in range(1, quantidade_linhas):
+        objeto_planilha.append([numero, None, "2025-03-01 10:00:00"])
+    # Linha vazia apenas formatada: aumenta a dimensão gravada no arquivo
+    if ultima_linha_formatada is not None:
+        for numero_linha in range(ultima_linha_formatada - linhas_formatadas + 1, ultima_linha_formatada + 1):
+            objeto_planilha.cell(row=numero_linha, column=10).number_format = "0.00"
+    objeto_workbook.save(caminho)
+
+
+def test_conta_as_linhas_preenchidas(tmp_path):
+    caminho = str(tmp_path / "planilha.xlsx")
+    _criar_planilha(caminho, 150)
+    assert contar_linhas_preenchidas(caminho) == 150
+
+
+def test_ignora_linhas_vazias_da_dimensao(tmp_path):
+    caminho = str(tmp_path / "planilha.xlsx")
+    _criar_planilha(caminho, 150, ultima_linha_formatada=50_000)
+
+    objeto_workbook = openpyxl.load_workbook(caminho, read_only=True)
+    assert objeto_workbook.active.max_row == 50_000
+    objeto_workbook.close()
+
+    assert contar_linhas_preenchidas(caminho) == 150
+
+
+def test_linhas_vazias_alem_do_trecho_final_leem_a_planilha_inteira(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "planilha.xlsx")
+    _criar_planilha(caminho, 150, ultima_linha_formatada=1000, linhas_formatadas=500)
+
+    # Trecho final pequeno: só contém linhas formatadas, sem valores
+    monkeypatch.setattr(leitura_planilha, "TAMANHO_BLOCO_XML", 1024)
+    monkeypatch.setattr(leitura_planilha, "BLOCOS_FINAIS_XML", 1)
+    assert contar_linhas_preenchidas(caminho) == 150
+
+
+def test_planilha_vazia(tmp_path):
+    caminho = str(tmp_path / "planilha.xlsx")
+    openpyxl.Workbook().save(caminho)
+    assert contar_linhas_preenchidas(caminho) == 0
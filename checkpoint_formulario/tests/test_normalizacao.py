@@ -0,0 +1,72 @@
+import uuid
+import pytest
+from normalizacao import NormalizadorOpcoes
+from processamento import frequencias_validas, eficiencias_validas, classificar_respostas
+
+
+@pytest.fixture
+def normalizar(tmp_path):
+    def normalizar(texto, opcoes_validas):
+        return NormalizadorOpcoes(opcoes_validas, diretorio_cache=str(tmp_path)).normalizar([texto])[0]
+    return normalizar
+
+
+@pytest.mark.parametrize("texto, opcao", [
+    ("  trabalho 100% REMOTO ", 'Trabalho 100% remoto'),
+    ("Trabalho 100% remto", 'Trabalho 100% remoto'),
+    ("Trabalho em regime hibrido (parte presencial,parte remoto)",
+     'Trabalho em regime híbrido (parte presencial, parte remoto)'),
+])
+def test_variantes_de_digitacao_da_frequencia(normalizar, texto, opcao):
+    assert normalizar(texto, frequencias_validas) == opcao
+
+
+@pytest.mark.parametrize("texto, opcao", [
+    ("Maior autonmia", 'Maior autonomia'),
+    ("horarios flexiveis", 'Horários flexíveis'),
+    ("Ambiente de trabalho personalisado", 'Ambiente de trabalho personalizado'),
+])
+def test_variantes_de_digitacao_da_eficiencia(normalizar, texto, opcao):
+    assert normalizar(texto, eficiencias_validas) == opcao
+
+
+@pytest.mark.parametrize("texto", [
+    "Trabalho principalmente remoto, mas ocasionalmente presencial",
+    "Trabalho exclusivamente remoto",
+    "Trabalho 100% presencial",
+])
+def test_frequencias_de_sentido_oposto_nao_sao_associadas(normalizar, texto):
+    assert normalizar(texto, frequencias_validas) is None
+
+
+@pytest.mark.parametrize("texto", [
+    "Mais interrupções/distrações",
+    "Menor autonomia",
+    "Pior equilíbrio entre vida profissional e pessoal",
+    "Presença de deslocamento",
+])
+def test_eficiencias_de_sentido_oposto_nao_sao_associadas(normalizar, texto):
+    assert normalizar(texto, eficiencias_validas) is None
+
+
+def test_cache_limitado_e_persistente(tmp_path):
+    normalizador = NormalizadorOpcoes(['Sim', 'Não'], tamanho_maximo=2, diretorio_cache=str(tmp_path))
+    assert normalizador.normalizar(['sim ', 'nao', 'talvez']) == ['Sim', 'Não', None]
+    assert len(normalizador) == 2
+
+    # Outra instância (ex.: depois de reiniciar o dashboard) lê as entradas mais recentes do disco
+    recarregado = NormalizadorOpcoes(['Sim', 'Não'], tamanho_maximo=2, diretorio_cache=str(tmp_path))
+    assert list(recarregado._cache.items()) == [('nao', 'Não'), ('talvez', None)]
+
+
+def test_lote_grava_o_cache_uma_unica_vez(monkeypatch):
+    gravacoes = []
+    salvar_cache = NormalizadorOpcoes._salvar_cache
+    monkeypatch.setattr(NormalizadorOpcoes, "_salvar_cache", lambda self: gravacoes.append(self) or salvar_cache(self))
+
+    # Respostas digitadas ainda desconhecidas pelo cache (uma gravação por pergunta, não uma por resposta)
+    novas = [f"Resposta digitada {uuid.uuid4().hex}" for _ in range(20)]
+    frequencias, eficiencias = classificar_respostas(novas, [";".join(novas[:10]) + ";", ";".join(novas[10:])])
+    assert frequencias == ['Outra'] * 20
+    assert eficiencias == ['Nenhuma das opções acima'] * 2
+    assert len(gravacoes) == 2
@@ -0,0 +1,99 @@
+import os
+import threading
+import openpyxl
+import pytest
+import requests
+from sharepoint import (SessaoSharePoint, baixar_arquivo, obter_metadados_remotos, sincronizar_planilha,
+                        caminho_arquivo, BAIXADO, INALTERADO)
+from sharepoint_falso import iniciar_servidor, autenticador_local
+
+TAMANHO_ARQUIVO = 200_000
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    pasta = tmp_path / "sharepoint"
+    pasta.mkdir()
+    (pasta / os.path.basename(caminho_arquivo)).write_bytes(os.urandom(TAMANHO_ARQUIVO))
+    servidor = iniciar_servidor(str(pasta), 0, exibir_log=False)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def servidor_autenticado(tmp_path):
+    pasta = tmp_path / "sharepoint"
+    pasta.mkdir()
+    objeto_workbook = openpyxl.Workbook()
+    objeto_workbook.active.append(["ID", "Hora de início", "Hora de conclusão"])
+    objeto_workbook.save(str(pasta / os.path.basename(caminho_arquivo)))
+    servidor = iniciar_servidor(str(pasta), 0, exibir_log=False, exigir_autenticacao=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _sessao(servidor):
+    url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    return SessaoSharePoint("usuario", "senha", url_site=f"{url}/personal/teste", autenticador=autenticador_local(url))
+
+
+def test_planilha_inalterada_consulta_apenas_os_metadados(servidor_autenticado, tmp_path):
+    sessao = _sessao(servidor_autenticado)
+    caminho_destino = str(tmp_path / "planilha.xlsx")
+    assert sincronizar_planilha(caminho_destino, sessao) == BAIXADO
+    estatisticas = dict(servidor_autenticado.estatisticas)
+
+    # Mesmo ETag e tamanho: uma única requisição (metadados), sem pedir o conteúdo ($value)
+    assert sincronizar_planilha(caminho_destino, sessao) == INALTERADO
+    assert servidor_autenticado.estatisticas["requisicoes"] == estatisticas["requisicoes"] + 1
+    assert servidor_autenticado.estatisticas["bytes_enviados"] == estatisticas["bytes_enviados"]
+    assert servidor_autenticado.estatisticas["autenticacoes"] == 1
+    sessao.fechar()
+
+
+def test_cookies_revogados_autenticam_uma_unica_vez(servidor_autenticado, tmp_path):
+    sessao = _sessao(servidor_autenticado)
+    caminho_destino = str(tmp_path / "planilha.xlsx")
+    assert sincronizar_planilha(caminho_destino, sessao) == BAIXADO
+    assert servidor_autenticado.estatisticas["autenticacoes"] == 1
+
+    # Cookies revogados antes de expirarem e planilha modificada no SharePoint
+    servidor_autenticado.revogar_cookies()
+    caminho_remoto = os.path.join(servidor_autenticado.pasta_arquivos, os.path.basename(caminho_arquivo))
+    os.utime(caminho_remoto, ns=(os.stat(caminho_remoto).st_atime_ns, os.stat(caminho_remoto).st_mtime_ns + 10**9))
+    requisicoes = servidor_autenticado.estatisticas["requisicoes"]
+
+    # Metadados recusados (403), nova autenticação e as mesmas requisições com os cookies novos
+    assert sincronizar_planilha(caminho_destino, sessao) == BAIXADO
+    assert servidor_autenticado.estatisticas["autenticacoes"] == 2
+    assert sessao.quantidade_autenticacoes == 2
+    assert servidor_autenticado.estatisticas["requisicoes"] == requisicoes + 3
+    sessao.fechar()
+
+
+def test_queda_no_primeiro_bloco_mantem_os_bytes_recebidos(servidor, tmp_path):
+    url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    sessao = SessaoSharePoint("usuario", "senha", url_site=f"{url}/personal/teste",
+                              autenticador=autenticador_local(url))
+    metadados = obter_metadados_remotos(sessao)
+    caminho_parcial = str(tmp_path / "planilha.parcial.xlsx")
+
+    # A conexão cai antes de completar o primeiro bloco de 64 KB
+    servidor.interromper_apos = 50_000
+    servidor.interrupcoes = 1
+    with pytest.raises((requests.ConnectionError, requests.exceptions.ChunkedEncodingError)):
+        baixar_arquivo(sessao, caminho_parcial, metadados, tentativas=1)
+    recebidos = os.path.getsize(caminho_parcial)
+    assert recebidos > 40_000
+
+    # A retomada pede somente o restante do arquivo
+    servidor.estatisticas["bytes_enviados"] = 0
+    baixar_arquivo(sessao, caminho_parcial, metadados)
+    assert servidor.estatisticas["bytes_enviados"] == TAMANHO_ARQUIVO - recebidos
+    with open(caminho_parcial, "rb") as f, open(os.path.join(servidor.pasta_arquivos,
+                                                             os.path.basename(caminho_arquivo)), "rb") as original:
+        assert f.read() == original.read()
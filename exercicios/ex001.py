@@ -1,28 +1,270 @@
-import pandas as pd
+"""
+Moda, média e mediana das colunas numéricas de um CSV.
+
+No modo padrão o arquivo é lido em lotes (pd.read_csv com chunksize), sem carregar o dataset inteiro e sem
+ordenar as colunas: a média e a moda são calculadas em uma única passagem. A mediana é exata enquanto a coluna
+tiver poucos valores distintos (idades, horas, notas), a partir do histograma de contagens. Colunas contínuas
+passam a usar um esboço de quantis com memória limitada.
+
+Uso:
+    python ex001.py /content/dataset_estudo.csv --tamanho-lote 100000
+    python ex001.py /content/dataset_estudo.csv --memoria    (lê tudo com pandas, para conferência)
+"""
+import math
+import argparse
 import numpy as np
+import pandas as pd
+from collections import Counter
+
+# Arquivo padrão do exercício (Google Colab)
+CAMINHO_DATASET = '/content/dataset_estudo.csv'
+
+# Quantidade de linhas lidas por vez
+TAMANHO_LOTE = 100_000
+
+# Quantidade máxima de valores distintos contados exatamente em cada coluna (acima disso, usa o esboço)
+LIMITE_VALORES_DISTINTOS = 100_000
+
+# Quantidade de valores guardados em cada nível do esboço de quantis (maior = mais preciso)
+CAPACIDADE_ESBOCO = 4096
+
+# Nome exibido das colunas do exercício (na ordem do arquivo)
+rotulos_colunas = ["Idades", "Horas de Estudo", "Notas"]
+
+
+class EsbocoQuantis:
+    """
+    --> Esboço de quantis com memória limitada (compactadores em níveis, como no KLL): cada valor do nível h
+    representa 2^h valores originais. Quando um nível enche, ele é ordenado e metade dos valores (posições pares
+    ou ímpares, sorteadas) sobe para o nível seguinte.
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_ESBOCO, semente=None):
+        """
+        :param capacidade: Quantidade máxima de valores em cada nível
+        :param semente: Semente do sorteio das compactações (valor padrão: aleatória)
+        """
+        self.capacidade = capacidade
+        self.niveis = [[]]
+        self._aleatorio = np.random.default_rng(semente)
+
+    def adicionar(self, valores, nivel=0):
+        """
+        --> Função para adicionar valores ao esboço
+        :param valores: Array com os valores
+        :param nivel: Nível onde os valores entram (cada valor representa 2^nivel valores originais)
+        """
+        while len(self.niveis) <= nivel:
+            self.niveis.append([])
+        self.niveis[nivel].append(np.asarray(valores, dtype=np.float64))
+        self._compactar(nivel)
+
+    def adicionar_contagens(self, valores, contagens):
+        """
+        --> Função para adicionar valores repetidos: cada valor entra nos níveis dos bits ligados da sua contagem
+        (ex.: contagem 5 = 101 em binário, entra nos níveis 0 e 2)
+        :param valores: Array com os valores distintos
+        :param contagens: Array com a quantidade de cada valor
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        contagens = np.asarray(contagens, dtype=np.int64)
+        for nivel in range(int(contagens.max()).bit_length() if len(contagens) else 0):
+            selecionados = (contagens >> nivel) & 1 == 1
+            if selecionados.any():
+                self.adicionar(valores[selecionados], nivel)
+
+    def _compactar(self, nivel):
+        """
+        --> Função para compactar os níveis cheios, a partir de um nível
+        :param nivel: Primeiro nível verificado
+        """
+        while nivel < len(self.niveis):
+            valores = np.concatenate(self.niveis[nivel]) if self.niveis[nivel] else np.empty(0)
+            if len(valores) <= self.capacidade:
+                self.niveis[nivel] = [valores]
+                return
+
+            valores.sort()
+            # Quantidade par é compactada; um valor que sobrar fica no nível atual
+            quantidade = len(valores) - len(valores) % 2
+            inicio = int(self._aleatorio.integers(2))
+            if len(self.niveis) == nivel + 1:
+                self.niveis.append([])
+            self.niveis[nivel + 1].append(valores[inicio:quantidade:2])
+            self.niveis[nivel] = [valores[quantidade:]]
+            nivel += 1
+
+    def quantil(self, q):
+        """
+        --> Função para estimar um quantil (interpolação linear entre os dois valores centrais, como no pandas)
+        :param q: Quantil entre 0 e 1 (ex.: 0.5 para a mediana)
+        """
+        valores = np.concatenate([parte for nivel in self.niveis for parte in nivel])
+        pesos = np.concatenate([np.full(sum(len(parte) for parte in nivel), 2 ** h, dtype=np.int64)
+                                for h, nivel in enumerate(self.niveis)])
+        if len(valores) == 0:
+            return math.nan
+
+        ordem = np.argsort(valores, kind="stable")
+        valores, acumulado = valores[ordem], np.cumsum(pesos[ordem])
+        posicao = q * (acumulado[-1] - 1)
+        inferior = valores[np.searchsorted(acumulado, math.floor(posicao), side="right")]
+        superior = valores[np.searchsorted(acumulado, math.ceil(posicao), side="right")]
+        return inferior + (superior - inferior) * (posicao - math.floor(posicao))
+
+
+class EstatisticasColuna:
+    """
+    --> Classe que acumula, lote a lote, a quantidade, a soma e as contagens de uma coluna numérica
+    """
+
+    def __init__(self, limite_distintos=LIMITE_VALORES_DISTINTOS, capacidade_esboco=CAPACIDADE_ESBOCO):
+        """
+        :param limite_distintos: Quantidade máxima de valores distintos no histograma exato
+        :param capacidade_esboco: Capacidade de cada nível do esboço de quantis
+        """
+        self.limite_distintos = limite_distintos
+        self.capacidade_esboco = capacidade_esboco
+        self.quantidade = 0
+        self.soma_inteiros = 0
+        self.somas_parciais = []
+        self.contagens = Counter()
+        self.esboco = None
+
+    def atualizar(self, valores):
+        """
+        --> Função para acumular um lote de valores
+        :param valores: Series com os valores do lote (células vazias são ignoradas)
+        """
+        valores = pd.to_numeric(valores, errors="coerce").dropna().to_numpy(dtype=np.float64)
+        if len(valores) == 0:
+            return
+        self.quantidade += len(valores)
+
+        # Soma exata: inteiros com o int do Python e os demais valores com math.fsum
+        inteiros = (np.abs(valores) < 2 ** 53) & (valores == np.floor(valores))
+        self.soma_inteiros += int(valores[inteiros].astype(np.int64).sum())
+        if not inteiros.all():
+            self.somas_parciais.append(math.fsum(valores[~inteiros]))
+
+        if self.esboco is not None:
+            self.esboco.adicionar(valores)
+            return
+
+        distintos, repeticoes = np.unique(valores, return_counts=True)
+        self.contagens.update(dict(zip(distintos.tolist(), repeticoes.tolist())))
+
+        # Muitos valores distintos (coluna contínua): o histograma vira o esboço de quantis
+        if len(self.contagens) > self.limite_distintos:
+            self.esboco = EsbocoQuantis(self.capacidade_esboco)
+            self.esboco.adicionar_contagens(list(self.contagens.keys()), list(self.contagens.values()))
+            self.contagens = None
+
+    @property
+    def exata(self):
+        """
+        --> Indica se a mediana e a moda são exatas (histograma completo)
+        """
+        return self.esboco is None
+
+    def media(self):
+        """
+        --> Função para calcular a média
+        """
+        if self.quantidade == 0:
+            return math.nan
+        return (self.soma_inteiros + math.fsum(self.somas_parciais)) / self.quantidade
+
+    def moda(self):
+        """
+        --> Função para obter a moda (o menor valor em caso de empate, como o pandas). Só é calculada enquanto
+        o histograma é exato: em colunas contínuas os valores quase não se repetem.
+        """
+        if not self.exata or not self.contagens:
+            return None
+        maior = max(self.contagens.values())
+        return min(valor for valor, contagem in self.contagens.items() if contagem == maior)
+
+    def mediana(self):
+        """
+        --> Função para obter a mediana: exata pelo histograma ordenado ou estimada pelo esboço de quantis
+        """
+        if not self.exata:
+            return self.esboco.quantil(0.5)
+        if not self.contagens:
+            return math.nan
+
+        valores = np.array(sorted(self.contagens))
+        acumulado = np.cumsum([self.contagens[valor] for valor in valores])
+        # Valores nas posições centrais (iguais quando a quantidade é ímpar)
+        inferior = valores[np.searchsorted(acumulado, (self.quantidade - 1) // 2, side="right")]
+        superior = valores[np.searchsorted(acumulado, self.quantidade // 2, side="right")]
+        return (inferior + superior) / 2
+
+
+def estatisticas_em_lotes(caminho, tamanho_lote=TAMANHO_LOTE, limite_distintos=LIMITE_VALORES_DISTINTOS):
+    """
+    --> Função para calcular as estatísticas lendo o CSV em lotes (memória limitada ao lote e aos histogramas)
+    :param caminho: Caminho do arquivo CSV
+    :param tamanho_lote: Quantidade de linhas lidas por vez
+    :param limite_distintos: Quantidade máxima de valores distintos no histograma exato de cada coluna
+    :return: Dicionário {coluna: EstatisticasColuna}
+    """
+    # As colunas numéricas são identificadas pelas primeiras linhas e só elas são lidas do arquivo
+    amostra = pd.read_csv(caminho, nrows=1000)
+    colunas = amostra.select_dtypes(include=["number"]).columns.tolist()
+
+    estatisticas = {coluna: EstatisticasColuna(limite_distintos) for coluna in colunas}
+    for lote in pd.read_csv(caminho, usecols=colunas, chunksize=tamanho_lote):
+        for coluna in colunas:
+            estatisticas[coluna].atualizar(lote[coluna])
+    return estatisticas
+
+
+def estatisticas_em_memoria(caminho):
+    """
+    --> Função para calcular as estatísticas com o dataset inteiro na memória (conferência do modo em lotes)
+    :param caminho: Caminho do arquivo CSV
+    :return: Dicionário {coluna: (moda, média, mediana)}
+    """
+    dataset = pd.read_csv(caminho).select_dtypes(include=["number"])
+    moda = dataset.mode()
+    return {coluna: (moda[coluna].iloc[0], dataset[coluna].mean(), dataset[coluna].median())
+            for coluna in dataset.columns}
 
-dataset = pd.read_csv('/content/dataset_estudo.csv')
-datasetOrdenado = dataset.transform(np.sort)
 
-# Selecionando todos os valores númericos das colunas ordenadas
-moda = datasetOrdenado.select_dtypes(include=["number"]).mode()
-media = datasetOrdenado.select_dtypes(include=["number"]).mean()
-mediana = datasetOrdenado.select_dtypes(include=["number"]).median()
+def exibir_estatisticas(resultados):
+    """
+    --> Função para exibir a moda, a média e a mediana de cada coluna
+    :param resultados: Dicionário {coluna: (moda, média, mediana, mediana exata)}
+    """
+    rotulos = {coluna: rotulos_colunas[i] if i < len(rotulos_colunas) else coluna
+               for i, coluna in enumerate(resultados)}
 
-print("--- Moda, Média e Mediana ---")
-print(datasetOrdenado)
+    print("--- Moda, Média e Mediana ---")
+    for indice, nome in enumerate(("Moda", "Média", "Mediana")):
+        print()  # Quebra de linha
+        for coluna, valores in resultados.items():
+            valor = valores[indice]
+            if valor is None:
+                valor = "indisponível (valores contínuos)"
+            elif nome == "Mediana" and not valores[3]:
+                valor = f"{valor} (estimada)"
+            print(f"{nome} das {rotulos[coluna]}: {valor}")
 
-print() # Quebra de linha
-print(f"Moda das Idades: {moda.iloc[0, 0]}")
-print(f"Moda das Horas de Estudo: {moda.iloc[0, 1]}")
-print(f"Moda das Notas: {moda.iloc[0, 2]}")
 
-print() # Quebra de linha
-print(f"Média das Idades: {media.iloc[0]}")
-print(f"Média das Horas de Estudo: {media.iloc[1]}")
-print(f"Média das Notas: {media.iloc[2]}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Moda, média e mediana das colunas numéricas de um CSV")
+    parser.add_argument("caminho", nargs="?", default=CAMINHO_DATASET, help="Arquivo CSV")
+    parser.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE, help="Linhas lidas por vez")
+    parser.add_argument("--memoria", action="store_true", help="Lê o arquivo inteiro com pandas (conferência)")
+    argumentos = parser.parse_args()
 
-print() # Quebra de linha
-print(f"Mediana das Idades: {mediana.iloc[0]}")
-print(f"Mediana das Horas de Estudo: {mediana.iloc[1]}")
-print(f"Mediana das Notas: {mediana.iloc[2]}")
+    if argumentos.memoria:
+        resultados = {coluna: (*valores, True)
+                      for coluna, valores in estatisticas_em_memoria(argumentos.caminho).items()}
+    else:
+        resultados = {coluna: (estatistica.moda(), estatistica.media(), estatistica.mediana(), estatistica.exata)
+                      for coluna, estatistica in
+                      estatisticas_em_lotes(argumentos.caminho, argumentos.tamanho_lote).items()}
+    exibir_estatisticas(resultados)
@@ -1,27 +1,265 @@
+"""
+Histograma de um dataset em lotes: as contagens de cada intervalo (bordas fixas) são acumuladas lote a lote,
+com o arquivo mapeado em memória (.npy ou binário) ou a partir de um gerador, e o gráfico é desenhado a partir
+das contagens já calculadas (plt.stairs). A memória usada depende do tamanho do lote, e não do dataset.
+
+Uso:
+    python ex002.py                                        (exemplo: 100 números aleatórios de 1 a 99)
+    python ex002.py --gerar 1000000000 dados.npy           (cria um arquivo de teste em lotes)
+    python ex002.py dados.npy --intervalos 10 --processos 4
+    python ex002.py dados.bin --dtype int32 --minimo 1 --maximo 99 --salvar histograma.png
+"""
+import os
+import argparse
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
+# Quantidade de valores lidos por vez (4M valores de 8 bytes = 32 MB por lote)
+TAMANHO_LOTE = 1 << 22
+
+
+def formato_arquivo(caminho, dtype=None):
+    """
+    --> Função para obter o tipo dos valores, a posição do primeiro valor e a quantidade de valores do arquivo
+    :param caminho: Arquivo .npy ou binário (valores sem cabeçalho)
+    :param dtype: Tipo dos valores do arquivo binário (ignorado no .npy, que guarda o tipo no cabeçalho)
+    :return: Tupla (dtype, deslocamento em bytes, quantidade de valores)
+    """
+    if not caminho.endswith(".npy"):
+        dtype = np.dtype(dtype or "float64")
+        return dtype, 0, os.path.getsize(caminho) // dtype.itemsize
+
+    with open(caminho, "rb") as f:
+        versao = np.lib.format.read_magic(f)
+        if versao == (1, 0):
+            formato, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            formato, _, dtype = np.lib.format.read_array_header_2_0(f)
+        return dtype, f.tell(), int(np.prod(formato))
+
+
+def lotes_arquivo(caminho, dtype=None, inicio=0, fim=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    --> Função geradora que mapeia em memória um lote do arquivo por vez. Cada lote é desmapeado antes do
+    próximo, então as páginas já lidas não se acumulam na memória do processo.
+    :param caminho: Arquivo .npy ou binário
+    :param dtype: Tipo dos valores do arquivo binário
+    :param inicio: Posição do primeiro valor lido
+    :param fim: Posição seguinte ao último valor lido (valor padrão: fim do arquivo)
+    :param tamanho_lote: Quantidade de valores por lote
+    """
+    dtype, deslocamento, quantidade = formato_arquivo(caminho, dtype)
+    fim = quantidade if fim is None else fim
+    for posicao in range(inicio, fim, tamanho_lote):
+        lote = np.memmap(caminho, dtype=dtype, mode="r", offset=deslocamento + posicao * dtype.itemsize,
+                         shape=(min(tamanho_lote, fim - posicao),))
+        yield lote
+        del lote
+
+
+def contar_intervalos(valores, bordas):
+    """
+    --> Função para contar os valores de um lote em cada intervalo de bordas igualmente espaçadas
+    (calcula o índice do intervalo diretamente e conta com np.bincount, sem ordenar). Os intervalos são
+    fechados à esquerda, exceto o último, e valores fora das bordas são ignorados, como no np.histogram.
+    :param valores: Array com os valores do lote
+    :param bordas: Array com as bordas dos intervalos
+    """
+    quantidade_intervalos = len(bordas) - 1
+    minimo, maximo = bordas[0], bordas[-1]
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[(valores >= minimo) & (valores <= maximo)]
+
+    indices = ((valores - minimo) * (quantidade_intervalos / (maximo - minimo))).astype(np.intp)
+    indices[indices == quantidade_intervalos] -= 1
+
+    # Corrige os valores que o arredondamento colocou no intervalo vizinho (mesma correção do np.histogram)
+    indices[valores < bordas[indices]] -= 1
+    indices[(valores >= bordas[indices + 1]) & (indices != quantidade_intervalos - 1)] += 1
+    return np.bincount(indices, minlength=quantidade_intervalos)
+
+
+def _contar_trecho(caminho, dtype, inicio, fim, bordas, tamanho_lote):
+    """
+    --> Função (executada em um processo separado) para contar um trecho do arquivo, lote a lote
+    :param caminho: Arquivo .npy ou binário
+    :param dtype: Tipo dos valores do arquivo binário
+    :param inicio: Posição do primeiro valor do trecho
+    :param fim: Posição seguinte ao último valor do trecho
+    :param bordas: Bordas dos intervalos
+    :param tamanho_lote: Quantidade de valores lidos por vez
+    """
+    return histograma_lotes(lotes_arquivo(caminho, dtype, inicio, fim, tamanho_lote), bordas)
+
+
+def _limites_trecho(caminho, dtype, inicio, fim, tamanho_lote):
+    """
+    --> Função (executada em um processo separado) para obter o menor e o maior valor de um trecho do arquivo
+    """
+    limites = [(float(np.nanmin(lote)), float(np.nanmax(lote)))
+               for lote in lotes_arquivo(caminho, dtype, inicio, fim, tamanho_lote)]
+    return min(limite[0] for limite in limites), max(limite[1] for limite in limites)
+
+
+def _trechos(quantidade_valores, quantidade_trechos):
+    """
+    --> Função para dividir o arquivo em trechos contíguos (um por tarefa do pool de processos)
+    :param quantidade_valores: Quantidade de valores do arquivo
+    :param quantidade_trechos: Quantidade de trechos
+    """
+    divisoes = np.linspace(0, quantidade_valores, quantidade_trechos + 1).astype(np.int64)
+    return [(int(inicio), int(fim)) for inicio, fim in zip(divisoes[:-1], divisoes[1:]) if fim > inicio]
+
+
+def _executar_trechos(funcao, caminho, dtype, processos, tamanho_lote, *argumentos):
+    """
+    --> Função para executar uma função de trecho em todo o arquivo (em processos separados se processos > 1)
+    :return: Lista com o resultado de cada trecho
+    """
+    _, _, quantidade_valores = formato_arquivo(caminho, dtype)
+    # Mais trechos que processos para equilibrar a carga entre eles
+    trechos = _trechos(quantidade_valores, processos * 4 if processos > 1 else 1)
+    if processos <= 1:
+        return [funcao(caminho, dtype, inicio, fim, *argumentos, tamanho_lote) for inicio, fim in trechos]
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [executor.submit(funcao, caminho, dtype, inicio, fim, *argumentos, tamanho_lote)
+                   for inicio, fim in trechos]
+        return [futuro.result() for futuro in futuros]
+
+
+def limites_arquivo(caminho, dtype=None, processos=1, tamanho_lote=TAMANHO_LOTE):
+    """
+    --> Função para obter o menor e o maior valor do arquivo (uma passagem em lotes)
+    :param caminho: Arquivo .npy ou binário
+    :param dtype: Tipo dos valores do arquivo binário
+    :param processos: Quantidade de processos
+    :param tamanho_lote: Quantidade de valores lidos por vez
+    """
+    limites = _executar_trechos(_limites_trecho, caminho, dtype, processos, tamanho_lote)
+    return min(limite[0] for limite in limites), max(limite[1] for limite in limites)
+
+
+def histograma_arquivo(caminho, bordas, dtype=None, processos=1, tamanho_lote=TAMANHO_LOTE):
+    """
+    --> Função para calcular o histograma de um arquivo mapeado em memória, lote a lote (memória constante)
+    :param caminho: Arquivo .npy ou binário
+    :param bordas: Bordas dos intervalos (igualmente espaçadas)
+    :param dtype: Tipo dos valores do arquivo binário
+    :param processos: Quantidade de processos (cada um conta trechos diferentes do arquivo)
+    :param tamanho_lote: Quantidade de valores lidos por vez
+    :return: Array com a contagem de cada intervalo
+    """
+    return sum(_executar_trechos(_contar_trecho, caminho, dtype, processos, tamanho_lote, bordas))
+
+
+def histograma_lotes(lotes, bordas):
+    """
+    --> Função para calcular o histograma de valores recebidos em lotes (ex.: um gerador)
+    :param lotes: Iterável de arrays com os valores
+    :param bordas: Bordas dos intervalos (igualmente espaçadas)
+    :return: Array com a contagem de cada intervalo
+    """
+    contagens = np.zeros(len(bordas) - 1, dtype=np.int64)
+    for lote in lotes:
+        contagens += contar_intervalos(lote, bordas)
+    return contagens
+
+
+def gerar_arquivo(caminho, quantidade, tamanho_lote=TAMANHO_LOTE, semente=42):
+    """
+    --> Função para criar um arquivo .npy de teste com números inteiros aleatórios (1 a 99), gravado em lotes
+    :param caminho: Arquivo .npy que será criado
+    :param quantidade: Quantidade de valores
+    :param tamanho_lote: Quantidade de valores gerados por vez
+    :param semente: Semente dos números aleatórios
+    """
+    gerador = np.random.default_rng(semente)
+    dados = np.lib.format.open_memmap(caminho, mode="w+", dtype=np.int32, shape=(quantidade,))
+    for posicao in range(0, quantidade, tamanho_lote):
+        fim = min(posicao + tamanho_lote, quantidade)
+        dados[posicao:fim] = gerador.integers(1, 100, fim - posicao, dtype=np.int32)
+    dados.flush()
+    del dados
+
+
+def plotar_histograma(contagens, bordas, titulo, caminho_figura=None):
+    """
+    --> Função para desenhar o histograma a partir das contagens já calculadas
+    :param contagens: Contagem de cada intervalo
+    :param bordas: Bordas dos intervalos
+    :param titulo: Título do gráfico
+    :param caminho_figura: Arquivo onde a figura é salva (valor padrão: exibe a janela do gráfico)
+    """
+    plt.figure(figsize=(8, 5))
+    plt.stairs(contagens, bordas, fill=True, alpha=0.7)
+    # Contorno de cada barra, como no plt.hist com edgecolor
+    plt.bar(bordas[:-1], contagens, width=np.diff(bordas), align="edge", fill=False, edgecolor='black')
+    plt.xlabel('Intervalo de Valores')
+    plt.ylabel('Frequência')
+    plt.title(titulo)
+    plt.grid(axis="y", linestyle='--', alpha=0.7)
+    if caminho_figura:
+        plt.savefig(caminho_figura, bbox_inches="tight")
+    else:
+        plt.show()
+
+
+def exemplo():
+    """
+    --> Exemplo do exercício: 100 números aleatórios (1 a 99) exibidos em uma tabela 10x10
+    """
+    # Gerar 100 números aleatórios (1 a 99)
+    np.random.seed(42)
+    dados = np.random.randint(1, 100, 100)
+
+    # Criar uma tabela 10x10
+    df_tabela = pd.DataFrame(dados.reshape(10, 10))
+
+    # Exibindo o dataset
+    print("\nDataset - 100 Números Aleatórios (Tabela 10x10):")
+    print(df_tabela)
+
+    # Mesmos intervalos do plt.hist(bins=10): 10 intervalos entre o menor e o maior valor
+    bordas = np.linspace(dados.min(), dados.max(), 11)
+    contagens = histograma_lotes(np.array_split(dados, 4), bordas)
+    plotar_histograma(contagens, bordas, "Histograma do Dataset - 100 Números Aleatórios")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Histograma em lotes de um arquivo mapeado em memória")
+    parser.add_argument("caminho", nargs="?", help="Arquivo .npy ou binário (sem arquivo: exemplo do exercício)")
+    parser.add_argument("--gerar", type=int, metavar="QUANTIDADE", help="Cria o arquivo com valores aleatórios")
+    parser.add_argument("--dtype", help="Tipo dos valores do arquivo binário (ex.: int32, float64)")
+    parser.add_argument("--intervalos", type=int, default=10, help="Quantidade de intervalos do histograma")
+    parser.add_argument("--minimo", type=float, help="Primeira borda (valor padrão: menor valor do arquivo)")
+    parser.add_argument("--maximo", type=float, help="Última borda (valor padrão: maior valor do arquivo)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1, help="Quantidade de processos")
+    parser.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE, help="Valores lidos por vez")
+    parser.add_argument("--salvar", help="Salva a figura neste arquivo em vez de exibir a janela")
+    argumentos = parser.parse_args()
+
+    if argumentos.caminho is None:
+        exemplo()
+    elif argumentos.gerar:
+        gerar_arquivo(argumentos.caminho, argumentos.gerar, argumentos.tamanho_lote)
+        print(f"Arquivo criado: {argumentos.caminho} ({argumentos.gerar} valores)")
+    else:
+        minimo, maximo = argumentos.minimo, argumentos.maximo
+        if minimo is None or maximo is None:
+            limites = limites_arquivo(argumentos.caminho, argumentos.dtype, argumentos.processos,
+                                      argumentos.tamanho_lote)
+            minimo = limites[0] if minimo is None else minimo
+            maximo = limites[1] if maximo is None else maximo
+        if minimo == maximo:
+            # Todos os valores iguais: um intervalo de largura 1 em volta do valor (como o np.histogram)
+            minimo, maximo = minimo - 0.5, maximo + 0.5
 
-# Gerar 100 números aleatórios (1 a 99)
-np.random.seed(42)
-dados = np.random.randint(1, 100, 100)
-
-# Dataframe
-df = pd.DataFrame(dados, columns=['Valores'])
-
-# Criar uma tabela 10x10
-df_tabela = df.values.reshape(10, 10)
-df_tabela = pd.DataFrame(df_tabela)
-
-# Exibindo o dataset
-print("\nDataset - 100 Números Aleatórios (Tabela 10x10):")
-print(df_tabela)
-
-# Criar m histograma
-plt.figure(figsize=(8, 5))
-plt.hist(df['Valores'], bins=10, edgecolor='black', alpha=0.7)
-plt.xlabel('Intervalo de Valores')
-plt.ylabel('Frequência')
-plt.title("Histograma do Dataset - 100 Números Aleatórios")
-plt.grid(axis="y", linestyle='--', alpha=0.7)
-plt.show()
+        bordas = np.linspace(minimo, maximo, argumentos.intervalos + 1)
+        contagens = histograma_arquivo(argumentos.caminho, bordas, argumentos.dtype, argumentos.processos,
+                                       argumentos.tamanho_lote)
+        print(pd.DataFrame({"Início": bordas[:-1], "Fim": bordas[1:], "Frequência": contagens}))
+        plotar_histograma(contagens, bordas, f"Histograma do Dataset - {contagens.sum()} Valores",
+                          argumentos.salvar)